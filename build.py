@@ -1,4 +1,6 @@
-from pybuilder.core import use_plugin, init
+from pybuilder.core import use_plugin, init, task
+from pybuilder.errors import BuildFailedException
+import subprocess
 import sys
 import os
 
@@ -16,6 +18,29 @@ def set_properties(project):
     project.set_property("dir_source_unittest_python", "src/unittest/python")
     project.set_property("unittest_module_glob", "test_*")
     project.set_property("coverage_source_paths", ["uc3m_money"])
+    project.depends_on("numpy")
+    # run_benchmarks task: data sizes, and previous results to check for regressions
+    project.set_property("benchmark_sizes", [10 ** 3, 10 ** 4, 10 ** 5])
+    project.set_property("benchmark_baseline", None)
 
     # Inject source path for imports
     sys.path.insert(0, os.path.abspath("src/main/python"))
+
+
+@task("run_benchmarks", description="Runs the benchmark suite, writing target/reports/benchmarks.json")
+def run_benchmarks(project, logger):
+    """Runs src/benchmark/python/benchmark_suite.py; not part of the default build"""
+    sizes = project.get_property("benchmark_sizes")
+    if isinstance(sizes, str):
+        # given on the command line, e.g. -P benchmark_sizes=1000,10000000
+        sizes = sizes.split(",")
+    output = project.expand_path("$dir_reports", "benchmarks.json")
+    command = [sys.executable, project.expand_path("src/benchmark/python/benchmark_suite.py"),
+               "--output", output, "--sizes"] + [str(size) for size in sizes]
+    baseline = project.get_property("benchmark_baseline")
+    if baseline:
+        command += ["--compare", baseline]
+    logger.info("Running benchmarks for sizes %s", ", ".join(str(size) for size in sizes))
+    if subprocess.call(command, cwd=project.basedir) != 0:
+        raise BuildFailedException("Benchmarks regressed against %s" % baseline)
+    logger.info("Benchmark results written to %s", output)
@@ -0,0 +1,62 @@
+"""Summation of transaction amounts as floats against integer cents"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from uc3m_money.amount_cents import parse_cents
+from uc3m_money.batch_validation import parse_amounts
+
+
+def make_amounts(count):
+    """Returns count synthetic amount strings like the ones in transactions.json"""
+    return [f"{'+' if i % 2 else '-'}{(i * 7919) % 10000}.{i % 100:02d}" for i in range(count)]
+
+
+def sum_floats(amounts):
+    """Parses and sums the amounts as floats, like every calculate_balance() call used to"""
+    total = 0.0
+    for amount in amounts:
+        total += float(amount)
+    return total
+
+
+def to_cents(amounts):
+    """Parses the amounts into cents once, like the balance ledger does on ingestion"""
+    return [parse_cents(amount) for amount in amounts]
+
+
+def sum_cents(cents):
+    """Sums amounts already held as cents"""
+    return sum(cents) / 100
+
+
+def sum_numpy(amounts):
+    """Parses and sums the amounts with the vectorised parser"""
+    cents, _ = parse_amounts(amounts)
+    return int(cents.sum()) / 100
+
+
+def best_time(function):
+    """Best wall time of three runs"""
+    return min(timeit.repeat(function, number=1, repeat=3))
+
+
+def main(sizes=(10 ** 4, 10 ** 5, 10 ** 6)):
+    """Prints, for each size, the time of every summation and the float drift"""
+    print(f"{'amounts':>10} {'float(str)':>11} {'parse once':>11} {'sum cents':>11} "
+          f"{'numpy':>11} {'float drift':>12}")
+    for size in sizes:
+        amounts = make_amounts(size)
+        cents = to_cents(amounts)
+        drift = sum_floats(amounts) - sum_cents(cents)
+        print(f"{size:>10} {best_time(lambda: sum_floats(amounts)):>11.4f} "
+              f"{best_time(lambda: to_cents(amounts)):>11.4f} "
+              f"{best_time(lambda: sum_cents(cents)):>11.4f} "
+              f"{best_time(lambda: sum_numpy(amounts)):>11.4f} {drift:>12.3e}")
+
+
+if __name__ == "__main__":
+    main()
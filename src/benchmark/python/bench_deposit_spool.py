@@ -0,0 +1,70 @@
+"""Files/sec of deposit files ingested one by one and through a DepositSpool"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from uc3m_money.account_deposit import deposit_into_account
+from uc3m_money.deposit_spool import DepositSpool
+from uc3m_money.storage import JsonStorage
+
+IBANS = [f"ES{number:022d}" for number in range(1000)]
+
+
+def drop_files(inbox, count):
+    """Writes count deposit files into inbox; one in ten is rejected"""
+    os.makedirs(inbox, exist_ok=True)
+    for number in range(count):
+        amount = "EUR 5.00" if number % 10 == 9 else f"EUR {10 + number % 9990}.00"
+        with open(os.path.join(inbox, f"deposit_{number:08d}.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({"IBAN": IBANS[number % len(IBANS)], "AMOUNT": amount}, f)
+
+
+def one_by_one(directory, count):
+    """Returns the files/sec of deposit_into_account() called for every file"""
+    inbox = os.path.join(directory, "inbox")
+    drop_files(inbox, count)
+    storage = JsonStorage.create(os.path.join(directory, "ledger"))
+    start = time.perf_counter()
+    for name in sorted(os.listdir(inbox)):
+        try:
+            deposit_into_account(os.path.join(inbox, name), storage)
+        except Exception:  # pylint: disable=broad-except
+            pass
+    elapsed = time.perf_counter() - start
+    storage.close()
+    return count / elapsed
+
+
+def spooled(directory, count, workers, batch_size):
+    """Returns the files/sec reported by a DepositSpool"""
+    inbox = os.path.join(directory, "inbox")
+    drop_files(inbox, count)
+    storage = JsonStorage.create(os.path.join(directory, "ledger"))
+    with DepositSpool(inbox, storage=storage, workers=workers, batch_size=batch_size) as spool:
+        spool.process_once()
+        stats = spool.stats()
+    storage.close()
+    return stats["files_per_sec"]
+
+
+def main(counts=(1000, 10000)):
+    """Prints the files/sec of each ingestion mode for each number of files"""
+    print(f"{'files':>8} {'mode':>28} {'files/s':>10}")
+    for count in counts:
+        modes = (("deposit_into_account", lambda d: one_by_one(d, count)),
+                 ("spool, 1 thread, batch 256", lambda d: spooled(d, count, 1, 256)),
+                 ("spool, 4 threads, batch 256", lambda d: spooled(d, count, 4, 256)),
+                 ("spool, 4 threads, batch 4096", lambda d: spooled(d, count, 4, 4096)))
+        for name, run in modes:
+            with tempfile.TemporaryDirectory() as directory:
+                print(f"{count:>8} {name:>28} {run(directory):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
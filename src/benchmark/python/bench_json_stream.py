@@ -0,0 +1,58 @@
+"""Peak memory of json.load against the streaming reader over transactions.json"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from uc3m_money.json_stream import iter_json_array
+
+
+def write_transactions(path, count):
+    """Writes a synthetic transactions file with count entries"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"IBAN": f"ES{i % 1000:022d}", "amount": f"{(i % 9000) - 4500}.25"}
+                   for i in range(count)], f, indent=4)
+
+
+def sum_with_json_load(path):
+    """Sums every amount after loading the whole array"""
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(float(t["amount"]) for t in json.load(f))
+
+
+def sum_with_stream(path):
+    """Sums every amount reading one element at a time"""
+    return sum(float(t["amount"]) for _, t in iter_json_array(path))
+
+
+def measure(function, path):
+    """Returns (seconds, peak bytes) of a call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(sizes=(10 ** 3, 10 ** 4, 10 ** 5)):
+    """Prints the time and peak memory of both readers for each size"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "transactions.json")
+        print(f"{'entries':>10} {'reader':>10} {'seconds':>10} {'peak KiB':>10}")
+        for size in sizes:
+            write_transactions(path, size)
+            for name, function in (("json.load", sum_with_json_load),
+                                   ("stream", sum_with_stream)):
+                elapsed, peak = measure(function, path)
+                print(f"{size:>10} {name:>10} {elapsed:>10.3f} {peak // 1024:>10}")
+
+
+if __name__ == "__main__":
+    main()
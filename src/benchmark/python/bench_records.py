@@ -0,0 +1,137 @@
+"""Memory and throughput of the deposit and transfer record representations"""
+import gc
+import hashlib
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from uc3m_money.account_deposit import AccountDeposit
+from uc3m_money.account_manager import AccountManager
+from uc3m_money.amount_cents import cents_to_float, float_to_cents
+from uc3m_money.record_columns import DepositColumns, TransferColumns
+from uc3m_money.transfer_request import TransferRequest
+
+IBANS = [f"ES{number:022d}" for number in range(1000)]
+
+
+class LegacyAccountDeposit:
+    """AccountDeposit before __slots__: one __dict__ per deposit and the SHA-256
+    signature computed again on every access"""
+
+    def __init__(self, to_iban, deposit_amount):
+        if not AccountManager.validate_iban(to_iban):
+            raise ValueError(to_iban)
+        self.__alg = "SHA-256"
+        self.__type = "DEPOSIT"
+        self.__to_iban = to_iban
+        self.__deposit_cents = float_to_cents(deposit_amount)
+        self.__deposit_date = datetime.timestamp(datetime.now(timezone.utc))
+
+    def to_json(self):
+        """returns the object data in json format"""
+        return {"alg": self.__alg, "type": self.__type, "to_iban": self.__to_iban,
+                "deposit_amount": cents_to_float(self.__deposit_cents),
+                "deposit_date": self.__deposit_date,
+                "deposit_signature": self.deposit_signature}
+
+    @property
+    def deposit_signature(self):
+        """Returns the sha256 signature of the date"""
+        return hashlib.sha256(("{alg:" + self.__alg + ",typ:" + self.__type + ",iban:" +
+                               self.__to_iban + ",amount:" +
+                               str(cents_to_float(self.__deposit_cents)) + ",deposit_date:" +
+                               str(self.__deposit_date) + "}").encode()).hexdigest()
+
+
+class LegacyTransferRequest:
+    """TransferRequest before __slots__"""
+
+    def __init__(self, from_iban, to_iban, transfer_concept, transfer_type, transfer_date,
+                 transfer_amount):
+        self.from_iban = from_iban
+        self.to_iban = to_iban
+        self.transfer_concept = transfer_concept
+        self.transfer_type = transfer_type
+        self.transfer_date = transfer_date
+        self.transfer_amount = transfer_amount
+        self.transfer_amount_cents = round(transfer_amount * 100)
+        self.__time_stamp = datetime.timestamp(datetime.now(timezone.utc))
+        self.__transfer_code = hashlib.md5(
+            f"{from_iban}{to_iban}{transfer_concept}{transfer_type}{transfer_date}"
+            f"{transfer_amount}".encode()).hexdigest()
+
+    def to_json(self):
+        """returns the object data in json format"""
+        return {"from_iban": self.from_iban, "to_iban": self.to_iban,
+                "transfer_concept": self.transfer_concept, "transfer_type": self.transfer_type,
+                "transfer_date": self.transfer_date, "transfer_amount": self.transfer_amount,
+                "time_stamp": self.__time_stamp, "transfer_code": self.__transfer_code}
+
+
+def make_deposits(cls, count):
+    """Creates count deposits and reads them like deposit_into_account() does:
+    the signature for the caller and to_json() for the file"""
+    deposits = []
+    for number in range(count):
+        deposit = cls(IBANS[number % len(IBANS)], 10.0 + number % 9990)
+        _ = deposit.deposit_signature
+        deposit.to_json()
+        deposits.append(deposit)
+    return deposits
+
+
+def make_transfers(cls, count):
+    """Creates count transfers and serializes them once"""
+    transfers = []
+    for number in range(count):
+        transfer = cls(IBANS[number % len(IBANS)], IBANS[(number + 1) % len(IBANS)],
+                       f"transfer number {number}", "ORDINARY", "01/01/2050",
+                       10.0 + number % 9990)
+        transfer.to_json()
+        transfers.append(transfer)
+    return transfers
+
+
+def measure(build):
+    """Returns (seconds, bytes held by the result) of build()"""
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, held
+
+
+def main(sizes=(10 ** 4, 10 ** 5)):
+    """Prints records/sec and bytes per record of every representation for each size"""
+    print(f"{'records':>10} {'representation':>26} {'records/s':>12} {'bytes/record':>13}")
+    for size in sizes:
+        deposits = make_deposits(AccountDeposit, size)
+        transfers = make_transfers(TransferRequest, size)
+        candidates = (
+            ("legacy AccountDeposit", lambda: make_deposits(LegacyAccountDeposit, size)),
+            ("slotted AccountDeposit", lambda: make_deposits(AccountDeposit, size)),
+            ("deposit dicts", lambda: [deposit.to_json() for deposit in deposits]),
+            ("DepositColumns", lambda: DepositColumns(deposits)),
+            ("legacy TransferRequest", lambda: make_transfers(LegacyTransferRequest, size)),
+            ("slotted TransferRequest", lambda: make_transfers(TransferRequest, size)),
+            ("transfer dicts", lambda: [transfer.to_json() for transfer in transfers]),
+            ("TransferColumns", lambda: TransferColumns(transfers)),
+        )
+        for name, build in candidates:
+            elapsed, held = measure(build)
+            print(f"{size:>10} {name:>26} {size / elapsed:>12.0f} {held / size:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
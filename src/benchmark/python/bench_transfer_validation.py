@@ -0,0 +1,108 @@
+"""Per-request cost of the validation of transfer requests, before and after TransferValidator"""
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.account_manager import AccountManager
+from uc3m_money.amount_cents import float_to_cents
+from uc3m_money.transfer_validator import TransferValidator
+
+IBANS = [f"ES{number:022d}" for number in range(1000)]
+
+
+def legacy_check_transfer(from_iban, to_iban, concept, transfer_type, date, amount):
+    # pylint: disable=too-many-arguments,too-many-branches
+    """The checks of transfer_request() before TransferValidator: patterns looked up
+    in the re cache, a regular expression and strptime() for the date and
+    datetime.now() on every call"""
+    if not isinstance(from_iban, str):
+        raise AccountManagementException("from_iban must be a string")
+    if not AccountManager.validate_iban(from_iban):
+        raise AccountManagementException("From IBAN is not valid")
+    if not isinstance(to_iban, str):
+        raise AccountManagementException("to_iban must be a string")
+    if not AccountManager.validate_iban(to_iban):
+        raise AccountManagementException("To IBAN is not valid")
+    if not isinstance(concept, str):
+        raise AccountManagementException("Concept must be a string")
+    if not (10 <= len(concept) <= 30 and re.search(r"\b\w+\b.*\b\w+\b", concept)):
+        raise AccountManagementException(
+            "Invalid concept. Must be 10-30 chars with at least two words.")
+    if not re.fullmatch(r"[a-zA-Z0-9 ]+", concept):
+        raise AccountManagementException("Concept must not contain special characters.")
+    if not isinstance(transfer_type, str):
+        raise AccountManagementException("transfer_type must be a string")
+    if transfer_type not in {"ORDINARY", "URGENT", "IMMEDIATE"}:
+        raise AccountManagementException(f"Invalid transfer type: {transfer_type}.")
+    if not isinstance(date, str):
+        raise AccountManagementException("Date must be a string")
+    if not re.fullmatch(r"\d{2}/\d{2}/\d{4}", date):
+        raise AccountManagementException(
+            "Invalid date format. Must be DD/MM/YYYY with two-digit day and month.")
+    try:
+        date_obj = datetime.strptime(date, "%d/%m/%Y")
+        if not 2025 <= date_obj.year <= 2050:
+            raise AccountManagementException("Year must be between 2025 and 2050.")
+        if date_obj.date() < datetime.now().date():
+            raise AccountManagementException("Transfer date must be today or in the future.")
+    except ValueError as exc:
+        raise AccountManagementException("Invalid date. Must be a valid calendar date.") from exc
+    if not isinstance(amount, float):
+        raise AccountManagementException("Amount must be a float")
+    try:
+        cents = float_to_cents(amount)
+    except ValueError as exc:
+        raise AccountManagementException("Amount must have up to two decimal places.") from exc
+    if not 1000 <= cents <= 1000000:
+        raise AccountManagementException(
+            "Amount is not within the allowed range (10.00 to 10000.00).")
+
+
+def make_transfers(count, invalid_every=0):
+    """Returns count transfer argument tuples; with invalid_every=n, every n-th
+    one has a date in the past"""
+    transfers = []
+    for number in range(count):
+        date = "01/01/2025" if invalid_every and number % invalid_every == 0 \
+            else f"{1 + number % 28:02d}/{1 + number % 12:02d}/2050"
+        transfers.append((IBANS[number % len(IBANS)], IBANS[(number + 1) % len(IBANS)],
+                          f"transfer number {number % 10000}", "ORDINARY", date,
+                          10.0 + number % 9990 + (number % 100) / 100))
+    return transfers
+
+
+def per_request(check, transfers, repeat=5):
+    """Returns the best mean seconds per call of check over transfers"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for transfer in transfers:
+            try:
+                check(*transfer)
+            except AccountManagementException:
+                pass
+        best = min(best, (time.perf_counter() - start) / len(transfers))
+    return best
+
+
+def main(count=100000):
+    """Prints the validation cost per request of both implementations"""
+    validator = TransferValidator()
+    print(f"{'transfers':>16} {'implementation':>18} {'us/request':>11} {'speedup':>8}")
+    for name, transfers in (("valid", make_transfers(count)),
+                            ("10% past dates", make_transfers(count, 10))):
+        before = per_request(legacy_check_transfer, transfers)
+        after = per_request(validator.check, transfers)
+        print(f"{name:>16} {'legacy':>18} {before * 1e6:>11.2f} {'':>8}")
+        print(f"{name:>16} {'TransferValidator':>18} {after * 1e6:>11.2f} "
+              f"{before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Benchmark suite of the uc3m_money hot paths, writing results comparable between runs
+
+Every benchmark runs against a temporary data directory filled with synthetic
+data of the given size (number of transactions, deposits or past transfers),
+so the results show how each operation scales with the size of the files.
+The results are a JSON document; --compare reports (and exits with status 1
+on) the benchmarks whose median latency grew over a threshold since a previous
+run.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from uc3m_money.account_balance import balance_cache, calculate_balance
+from uc3m_money.account_deposit import deposit_into_account
+from uc3m_money.account_manager import AccountManager
+from uc3m_money.storage import JsonStorage, get_storage, set_storage
+from uc3m_money.transfer_request import transfer_request
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5)
+DEFAULT_OPS = 200
+DEFAULT_THRESHOLD = 0.2
+ACCOUNTS = 1000
+WRITE_BATCH = 10000
+
+
+def make_iban(number):
+    """Returns a synthetic Spanish IBAN with valid check digits"""
+    bban = f"{number:020d}"
+    # "ES" is 14 28 in the mod 97 check
+    check = 98 - int(bban + "142800") % 97
+    return f"ES{check:02d}{bban}"
+
+
+def write_json_array(path, records):
+    """Writes an iterable of records as an indented JSON array, one at a time"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        separator = "\n"
+        for record in records:
+            f.write(separator)
+            f.write(json.dumps(record, indent=4))
+            separator = ",\n"
+        f.write("\n]")
+
+
+def generate_transactions(count, accounts=ACCOUNTS):
+    """Yields count transactions spread over accounts IBANs"""
+    ibans = [make_iban(number) for number in range(accounts)]
+    for number in range(count):
+        cents = (number * 7919) % 1000000 - 500000
+        yield {"IBAN": ibans[number % accounts],
+               "amount": f"{'+' if cents >= 0 else '-'}{abs(cents) // 100}.{abs(cents) % 100:02d}"}
+
+
+def generate_deposits(count, accounts=ACCOUNTS):
+    """Yields count records shaped like the ones deposit_into_account() stores"""
+    ibans = [make_iban(number) for number in range(accounts)]
+    for number in range(count):
+        yield {"alg": "SHA-256", "type": "DEPOSIT", "to_iban": ibans[number % accounts],
+               "deposit_amount": float(10 + number % 9990), "deposit_date": 1742942110.0 + number,
+               "deposit_signature": hashlib.sha256(f"deposit {number}".encode()).hexdigest()}
+
+
+def generate_transfers(count, accounts=ACCOUNTS):
+    """Yields count records shaped like the ones transfer_request() stores"""
+    ibans = [make_iban(number) for number in range(accounts)]
+    for number in range(count):
+        yield {"from_iban": ibans[number % accounts], "to_iban": ibans[(number + 1) % accounts],
+               "transfer_concept": f"history transfer {number}", "transfer_type": "ORDINARY",
+               "transfer_date": "01/01/2050", "transfer_amount": float(10 + number % 9990),
+               "time_stamp": 1742942110.0 + number,
+               "transfer_code": hashlib.md5(f"transfer {number}".encode()).hexdigest()}
+
+
+def _batches(records, size=WRITE_BATCH):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_data(data_dir, transactions=0, deposits=0):
+    write_json_array(os.path.join(data_dir, JsonStorage.TRANSACTIONS_FILE),
+                     generate_transactions(transactions))
+    write_json_array(os.path.join(data_dir, JsonStorage.DEPOSITS_FILE), generate_deposits(deposits))
+    write_json_array(os.path.join(data_dir, JsonStorage.BALANCES_FILE), [])
+
+
+# Every benchmark fills data_dir for a size and returns (operation, samples,
+# batch): operation(sample) runs batch operations and is timed samples times.
+
+def bench_validate_iban(data_dir, size, ops):  # pylint: disable=unused-argument
+    """AccountManager.validate_iban() called size times, over a pool of synthetic IBANs"""
+    ibans = [make_iban(number) for number in range(min(size, 1000))]
+
+    def operation(sample):  # pylint: disable=unused-argument
+        for iban in ibans:
+            AccountManager.validate_iban(iban)
+    return operation, max(1, size // len(ibans)), len(ibans)
+
+
+def bench_deposit_into_account(data_dir, size, ops):
+    """deposit_into_account() appending to a deposits file of size entries"""
+    _write_data(data_dir, deposits=size)
+    input_file = os.path.join(data_dir, "deposit_input.json")
+    with open(input_file, "w", encoding="utf-8") as f:
+        json.dump({"IBAN": make_iban(1), "AMOUNT": "EUR 100.00"}, f)
+
+    def operation(sample):  # pylint: disable=unused-argument
+        deposit_into_account(input_file)
+    return operation, ops, 1
+
+
+def bench_transfer_request(data_dir, size, ops):
+    """transfer_request() checked against a history of size past transfers"""
+    _write_data(data_dir)
+    storage = get_storage()
+    for batch in _batches(generate_transfers(size)):
+        storage.add_transfers(batch)
+
+    def operation(sample):
+        transfer_request(make_iban(1), make_iban(2), f"benchmark transfer {sample}",
+                         "ORDINARY", "01/01/2050", 10.0 + sample % 9990)
+    return operation, ops, 1
+
+
+def bench_calculate_balance(data_dir, size, ops):
+    """calculate_balance() of different IBANs over size transactions, ledger up to date"""
+    _write_data(data_dir, transactions=size)
+    calculate_balance(make_iban(0))
+
+    def operation(sample):
+        balance_cache().clear()
+        calculate_balance(make_iban(sample % ACCOUNTS))
+    return operation, ops, 1
+
+
+def bench_calculate_balance_cold(data_dir, size, ops):
+    """calculate_balance() summing size transactions without ledger or cache"""
+    _write_data(data_dir, transactions=size)
+    ledger_path = os.path.join(data_dir, JsonStorage.LEDGER_FILE)
+
+    def operation(sample):
+        balance_cache().clear()
+        if os.path.exists(ledger_path):
+            os.remove(ledger_path)
+        # a new storage, as the ledger is kept in memory by the storage
+        set_storage(JsonStorage(data_dir))
+        calculate_balance(make_iban(sample % ACCOUNTS))
+    return operation, max(1, min(ops, 10 ** 6 // size)), 1
+
+
+BENCHMARKS = {
+    "validate_iban": bench_validate_iban,
+    "deposit_into_account": bench_deposit_into_account,
+    "transfer_request": bench_transfer_request,
+    "calculate_balance": bench_calculate_balance,
+    "calculate_balance_cold": bench_calculate_balance_cold,
+}
+
+
+def run_benchmark(name, size, ops):
+    """Runs a benchmark for a size and returns its result entry"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        set_storage(JsonStorage(data_dir))
+        try:
+            operation, samples, batch = BENCHMARKS[name](data_dir, size, ops)
+            timings = []
+            for sample in range(samples):
+                start = time.perf_counter()
+                operation(sample)
+                timings.append((time.perf_counter() - start) / batch)
+            # memory is measured apart, as tracing slows the operations down
+            tracemalloc.start()
+            operation(samples)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            set_storage(None)
+    timings.sort()
+    total = sum(timings) * batch
+    return {"name": name, "size": size, "ops": samples * batch,
+            "seconds": round(total, 6),
+            "ops_per_sec": round(samples * batch / total, 1) if total else None,
+            "mean_us": round(statistics.fmean(timings) * 1e6, 3),
+            "p50_us": round(_percentile(timings, 0.50) * 1e6, 3),
+            "p99_us": round(_percentile(timings, 0.99) * 1e6, 3),
+            "peak_bytes": peak}
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_suite(names, sizes, ops, log=print):
+    """Runs the benchmarks for every size and returns the results document"""
+    results = []
+    for size in sizes:
+        for name in names:
+            result = run_benchmark(name, size, ops)
+            log(f"{name:>24} {size:>10} {result['mean_us']:>12.1f} us "
+                f"{result['p99_us']:>12.1f} us {result['peak_bytes'] // 1024:>8} KiB")
+            results.append(result)
+    return {"version": RESULTS_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+            "results": results}
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns the regressions of current against baseline: a list of
+    (name, size, baseline p50_us, current p50_us) for the benchmarks present
+    in both whose median latency grew by more than threshold (a fraction); the
+    median is less sensitive than the mean to the outliers of a noisy machine.
+    """
+    previous = {(entry["name"], entry["size"]): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        old = previous.get((entry["name"], entry["size"]))
+        if old is not None and entry["p50_us"] > old["p50_us"] * (1 + threshold):
+            regressions.append((entry["name"], entry["size"], old["p50_us"], entry["p50_us"]))
+    return regressions
+
+
+def main(argv=None):
+    """Runs the suite with the options of the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="data sizes, 10^3 10^4 10^5 by default (up to 10^7 is supported)")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS,
+                        help="timed operations per benchmark and size")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS),
+                        help="benchmarks to run, all by default")
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="JSON results of a previous run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown of the median latency reported as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    print(f"{'benchmark':>24} {'size':>10} {'mean':>15} {'p99':>15} {'peak':>12}")
+    results = run_suite(args.only, args.sizes, args.ops)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, size, old, new in regressions:
+            print(f"REGRESSION {name} size {size}: {old:.1f} us -> {new:.1f} us")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Load generator for the uc3m_money server: requests/sec and latency percentiles"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from uc3m_money import account_deposit, transfer_request
+from uc3m_money.service import MoneyServer, DEFAULT_HOST, DEFAULT_PORT
+from uc3m_money.storage import JsonStorage, set_storage
+
+IBANS = ["ES9121000418450200051332", "ES9820385778983000760236", "ES8658342044541216872704"]
+
+
+def make_request(number, mix):
+    """Returns the request number of the load, cycling over the methods in mix"""
+    method = mix[number % len(mix)]
+    if method == "transfer_request":
+        params = {"from_iban": IBANS[0], "to_iban": IBANS[1],
+                  "concept": f"load test {number}", "transfer_type": "ORDINARY",
+                  "date": "01/01/2050", "amount": 10.0 + number % 100}
+    elif method == "deposit_into_account":
+        params = {"IBAN": IBANS[number % len(IBANS)], "AMOUNT": f"EUR {10 + number % 1000}.00"}
+    else:
+        params = {"iban": IBANS[number % len(IBANS)]}
+    return {"id": number, "method": method, "params": params}
+
+
+async def run_connection(host, port, numbers, mix, pipeline, latencies, errors):
+    """Sends the requests of one connection keeping up to pipeline of them in flight"""
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = {}
+    window = asyncio.Semaphore(pipeline)
+
+    async def receive():
+        for _ in numbers:
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent_at.pop(response["id"]))
+            if "error" in response:
+                errors.append(response["error"])
+            window.release()
+
+    receiver = asyncio.create_task(receive())
+    for number in numbers:
+        await window.acquire()
+        sent_at[number] = time.perf_counter()
+        writer.write(json.dumps(make_request(number, mix)).encode("utf-8") + b"\n")
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(host, port, requests, connections, pipeline, mix):
+    """Runs the load and returns (elapsed seconds, latencies, errors)"""
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_connection(host, port, range(c, requests, connections), mix,
+                                          pipeline, latencies, errors)
+                           for c in range(connections)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def percentile(values, fraction):
+    """Returns the value below which the given fraction of values fall"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_with_local_server(args, mix):
+    """Starts a server over a temporary copy of the data files and loads it"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        transactions = [{"IBAN": iban, "amount": "+100.00"} for iban in IBANS] * 1000
+        for file_name, content in ((JsonStorage.TRANSACTIONS_FILE, transactions),
+                                   (JsonStorage.BALANCES_FILE, [])):
+            with open(os.path.join(data_dir, file_name), "w", encoding="utf-8") as f:
+                json.dump(content, f, indent=4)
+        set_storage(JsonStorage(data_dir))
+        if args.group_commit:
+            account_deposit.start_group_commit()
+            transfer_request.start_group_commit()
+        server = MoneyServer(port=0, max_workers=args.workers)
+        await server.start()
+        try:
+            return await run_load(DEFAULT_HOST, server.port, args.requests, args.connections,
+                                  args.pipeline, mix)
+        finally:
+            await server.close()
+            account_deposit.stop_group_commit()
+            transfer_request.stop_group_commit()
+            set_storage(None)
+
+
+def main():
+    """Runs the load generator and prints its measurements"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default=None,
+                        help="server to load; by default a local one over temporary files")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--pipeline", type=int, default=8, help="requests in flight per connection")
+    parser.add_argument("--workers", type=int, default=8, help="threads of the local server")
+    parser.add_argument("--mix", default="transfer_request,deposit_into_account,calculate_balance",
+                        help="comma separated methods, sent in turn")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="enable group commit in the local server")
+    args = parser.parse_args()
+    mix = args.mix.split(",")
+
+    if args.host is None:
+        elapsed, latencies, errors = asyncio.run(run_with_local_server(args, mix))
+    else:
+        elapsed, latencies, errors = asyncio.run(run_load(
+            args.host, args.port, args.requests, args.connections, args.pipeline, mix))
+
+    print(f"{len(latencies)} requests in {elapsed:.2f} s: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50 {percentile(latencies, 0.50) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, "
+          f"max {max(latencies) * 1000:.2f} ms")
+    if errors:
+        print(f"{len(errors)} errors, first: {errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
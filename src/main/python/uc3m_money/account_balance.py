@@ -1,18 +1,37 @@
 """Calculates the Balance for a given IBAN"""
-import json
-import os
 from datetime import date
 from uc3m_money.account_management_exception import AccountManagementException
 from uc3m_money.account_manager import AccountManager
+from uc3m_money.balance_cache import BalanceCache
+from uc3m_money import metrics
+from uc3m_money.storage import get_storage
 
+# balances already computed (and recorded), valid while the transactions are unchanged
+_BALANCE_CACHE = BalanceCache()
 
-def calculate_balance(iban_number):
+
+def calculate_balance(iban_number, storage=None):
     """
     Validates the IBAN, sums all transactions for it from 'transactions.json',
     and appends the balance to 'balances.json' (if amount ≠ 0).
 
+    The sums are kept in a running ledger ('balance_ledger.json'), so only the
+    transactions appended since the previous call are parsed. 'transactions.json'
+    must therefore be append-only: the ledger is rebuilt when the file is
+    replaced or rewritten in place without growing, but other edits of past
+    transactions may go unnoticed (see BalanceLedger). If an up-to-date columnar
+    copy ('transactions.bin', see export_columnar) exists, the sum is a
+    vectorised scan of its memory-mapped columns instead; with the SQLite
+    storage backend the sum is an indexed aggregate query. Repeated calls for
+    an IBAN whose transactions did not change (same size and mtime of the file)
+    are answered from an in-memory LRU cache without reading or writing any
+    file, see balance_cache().
+
     Args:
         iban_number (str): The IBAN number for which the balance is calculated.
+        storage (Storage): Where the transactions are read and the balance is
+            recorded; the storage in use by default (see AccountManager for
+            isolated ledgers).
 
     Returns:
         bool: True if the balance was successfully calculated and (if non-zero) recorded.
@@ -22,67 +41,99 @@ def calculate_balance(iban_number):
     """
 
     # Validate IBAN
-    if not isinstance(iban_number, str):
-        raise AccountManagementException("IBAN must be a string")
-    if not AccountManager.validate_iban(iban_number):
-        raise AccountManagementException("IBAN is not valid")
-
-    # Define file paths
-    transactions_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "transactions.json"))
-    balances_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "balances.json"))
-
-    # Check if transactions.json exists
-    if not os.path.exists(transactions_path):
-        raise AccountManagementException("Transactions file not found")
-
-    # Load transactions
-    try:
-        with open(transactions_path, "r", encoding="utf-8") as file:
-            transactions_data = json.load(file)
-            if not isinstance(transactions_data, list):
-                raise AccountManagementException("Transactions file format is invalid")
-    except json.JSONDecodeError:
-        raise AccountManagementException("Transactions file is empty or corrupted")
-
-    # Filter and sum amounts
-    amount = 0.0
-    found = False
-    for transaction in transactions_data:
-        if transaction.get("IBAN") == iban_number:
-            found = True
-            try:
-                amount += float(transaction.get("amount"))
-            except ValueError:
-                raise AccountManagementException("Amount format in transactions file is invalid")
+    with metrics.timed("balance", "validate"):
+        _validate_ibans([iban_number])
+
+    storage = storage or get_storage()
+    today = date.today().isoformat()
+    # taken before summing, so transactions added meanwhile make the next call miss
+    version = (storage, storage.transactions_version(iban_number))
+    cached = _BALANCE_CACHE.get(iban_number, version) if version[1] is not None else None
+    if cached is not None and cached[1] == today:
+        # already computed and recorded today
+        return True
+    if cached is not None:
+        amount = cached[0]
+    else:
+        with metrics.timed("balance", "sum"):
+            amount = storage.balances([iban_number]).get(iban_number)
 
     # Return True but don't write if no transactions were found
+    if amount:
+        _append_balances({iban_number: amount}, storage)
 
-    if amount == 0.0:
-        return True
+    if version[1] is not None:
+        _BALANCE_CACHE.put(iban_number, version, (amount, today))
+    return True
+
+
+def balance_cache():
+    """Returns the cache of calculate_balance(), with its hits and misses counters"""
+    return _BALANCE_CACHE
+
+
+def calculate_balances(ibans=None, workers=None, storage=None):
+    """
+    Calculates the balance of many IBANs with a single pass over 'transactions.json'
+    and appends all the non-zero balances to 'balances.json' with a single write.
+
+    Args:
+        ibans (iterable): IBAN numbers to compute, or None for every account
+            present in the transactions file.
+        workers (int): If given, the balances are recomputed from all the
+            transactions, split in chunks summed by that many processes
+            (0 for one per CPU), instead of read from the running ledger.
+        storage (Storage): Where the transactions are read and the balances are
+            recorded; the storage in use by default.
+
+    Returns:
+        dict: IBAN -> amount of every balance that was recorded.
 
-    # Prepare balance entry
-    balance_entry = {
+    Raises:
+        AccountManagementException: If any IBAN is invalid, has an invalid amount
+        in the transactions file, or files are missing/corrupt. Nothing is
+        recorded in that case.
+    """
+    if ibans is not None:
+        ibans = list(ibans)
+        with metrics.timed("balance", "validate"):
+            _validate_ibans(ibans)
+
+    storage = storage or get_storage()
+    with metrics.timed("balance", "sum"):
+        if workers is None:
+            balances = storage.balances(ibans)
+        else:
+            balances = storage.recompute_balances(ibans, workers or None)
+    balances = {iban_number: amount for iban_number, amount in balances.items() if amount}
+    if balances:
+        _append_balances(balances, storage)
+    return balances
+
+
+def _append_balances(balances, storage=None):
+    """Appends one entry per IBAN -> amount to 'balances.json' with a single write"""
+    # Prepare balance entries
+    today = date.today().isoformat()
+    balance_entries = [{
         "iban": iban_number,
         "amount": amount,
-        "date": date.today().isoformat()
-    }
-
-    # Check if balances.json exists
-    if not os.path.exists(balances_path):
-        raise AccountManagementException("Balances file not found")
-
-    # Load balances data
-    try:
-        with open(balances_path, "r", encoding="utf-8") as f:
-            balances_data = json.load(f)
-            if not isinstance(balances_data, list):
-                raise AccountManagementException("Balances file format is invalid")
-    except json.JSONDecodeError:
-        raise AccountManagementException("Balances file is empty or corrupted")
-
-    # Append new balance and save
-    balances_data.append(balance_entry)
-    with open(balances_path, "w", encoding="utf-8") as f:
-        json.dump(balances_data, f, indent=4)
-
-    return True
+        "date": today
+    } for iban_number, amount in balances.items()]
+
+    with metrics.timed("balance", "write"):
+        (storage or get_storage()).add_balances(balance_entries)
+    metrics.increment(metrics.RECORDS_WRITTEN, len(balance_entries), file="Balances")
+
+
+def _validate_ibans(ibans):
+    """Raises an AccountManagementException if any of the IBANs is not valid"""
+    for iban_number in ibans:
+        if not isinstance(iban_number, str):
+            error = AccountManagementException("IBAN must be a string")
+        elif not AccountManager.validate_iban(iban_number):
+            error = AccountManagementException("IBAN is not valid")
+        else:
+            continue
+        metrics.validation_failure("balance", error)
+        raise error
@@ -4,10 +4,20 @@ import json
 import os
 from uc3m_money.account_management_exception import AccountManagementException
 from uc3m_money.account_manager import AccountManager
+from uc3m_money import metrics
+from uc3m_money.amount_cents import parse_cents, float_to_cents, cents_to_float
+from uc3m_money.batch_validation import VALID, validate_deposits
+from uc3m_money.json_stream import iter_json_array
+from uc3m_money.group_commit import GroupCommitWriter
+from uc3m_money.storage import get_storage
 import hashlib
 
 class AccountDeposit:
     """Class representing the information required for shipping of an order"""
+    # no per-instance __dict__: millions of deposits may be held in memory
+    __slots__ = ("__to_iban", "__deposit_cents", "__deposit_date", "__signature")
+    __alg = "SHA-256"
+    __type = "DEPOSIT"
 
     def __init__(self,
                  to_iban: str,
@@ -18,41 +28,49 @@ class AccountDeposit:
 
         if not AccountManager.validate_iban(to_iban):
             raise AccountManagementException("Invalid to_iban")
+        # a decimal string with up to two decimals is parsed exactly; any other
+        # amount float() accepts (e.g. "1e3" or "10.555") is checked as a float
         try:
-            deposit_amount = float(deposit_amount)
-        except ValueError as exc:
-            raise AccountManagementException("Invalid amount format") from exc
+            deposit_cents = parse_cents(deposit_amount) if isinstance(deposit_amount, str) \
+                else None
+        except ValueError:
+            deposit_cents = None
+        exact = deposit_cents is not None
+        if not exact:
+            try:
+                deposit_cents = round(float(deposit_amount) * 100)
+            except (ValueError, OverflowError) as exc:
+                raise AccountManagementException("Invalid amount format") from exc
 
-        if deposit_amount <= 0:
+        if deposit_cents <= 0:
             raise AccountManagementException("Amount must be positive")
-        if deposit_amount < 10.00:
+        if deposit_cents < 1000:
             raise AccountManagementException("Amount must be >= 10.00")
-        if deposit_amount > 10000.00:
+        if deposit_cents > 1000000:
             raise AccountManagementException("Amount must be <= 10000.00")
 
-        if len(str(deposit_amount).split(".")[1]) > 2:
+        if not exact and cents_to_float(deposit_cents) != float(deposit_amount):
             raise AccountManagementException("Amount must have 2 decimal places")
 
-        self.__alg = "SHA-256"
-        self.__type = "DEPOSIT"
         self.__to_iban = to_iban
-        self.__deposit_amount = deposit_amount
+        self.__deposit_cents = deposit_cents
         justnow = datetime.now(timezone.utc)
         self.__deposit_date = datetime.timestamp(justnow)
+        self.__signature = None
 
     def to_json(self):
         """returns the object data in json format"""
         return {"alg": self.__alg,
                 "type": self.__type,
                 "to_iban": self.__to_iban,
-                "deposit_amount": self.__deposit_amount,
+                "deposit_amount": self.deposit_amount,
                 "deposit_date": self.__deposit_date,
                 "deposit_signature": self.deposit_signature}
 
     def __signature_string(self):
         """Composes the string to be used for generating the key for the date"""
         return "{alg:" + str(self.__alg) +",typ:" + str(self.__type) +",iban:" + \
-               str(self.__to_iban) + ",amount:" + str(self.__deposit_amount) + \
+               str(self.__to_iban) + ",amount:" + str(self.deposit_amount) + \
                ",deposit_date:" + str(self.__deposit_date) + "}"
 
     @property
@@ -63,14 +81,21 @@ class AccountDeposit:
     @to_iban.setter
     def to_iban(self, value):
         self.__to_iban = value
+        self.__signature = None
 
     @property
     def deposit_amount(self):
         """Property that represents the order_id"""
-        return self.__deposit_amount
+        return cents_to_float(self.__deposit_cents)
     @deposit_amount.setter
     def deposit_amount(self, value):
-        self.__deposit_amount = value
+        self.__deposit_cents = float_to_cents(value)
+        self.__signature = None
+
+    @property
+    def deposit_cents(self):
+        """Property that represents the amount in cents"""
+        return self.__deposit_cents
 
     @property
     def deposit_date(self):
@@ -79,14 +104,18 @@ class AccountDeposit:
     @deposit_date.setter
     def deposit_date( self, value ):
         self.__deposit_date = value
+        self.__signature = None
 
 
     @property
     def deposit_signature( self ):
-        """Returns the sha256 signature of the date"""
-        return hashlib.sha256(self.__signature_string().encode()).hexdigest()
+        """Returns the sha256 signature of the date, computed once until a field changes"""
+        if self.__signature is None:
+            # the raw digest takes half the memory of its hex string
+            self.__signature = hashlib.sha256(self.__signature_string().encode()).digest()
+        return self.__signature.hex()
 
-def deposit_into_account(input_file):
+def deposit_into_account(input_file, storage=None):
     """
         Processes a deposit into an account by reading deposit data from a JSON file.
 
@@ -97,6 +126,8 @@ def deposit_into_account(input_file):
 
         Args:
             input_file (str): Path to the JSON file containing the deposit data.
+            storage (Storage): Where the deposit is saved; the storage in use by
+                default (see AccountManager for isolated ledgers).
 
         Returns:
             str: A unique deposit signature generated for the successful deposit.
@@ -110,11 +141,186 @@ def deposit_into_account(input_file):
         raise AccountManagementException("Data file is not found.")
 
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
+        with metrics.timed("deposit", "load"), open(input_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
+            if metrics.enabled():
+                metrics.increment(metrics.BYTES_READ, os.fstat(f.fileno()).st_size,
+                                  file="Deposit input")
     except json.JSONDecodeError as exc:
-        raise AccountManagementException("The file is not in JSON format.") from exc
+        error = AccountManagementException("The file is not in JSON format.")
+        metrics.validation_failure("deposit", error)
+        raise error from exc
+
+    return deposit_data_into_account(data, storage)
+
+
+def deposit_data_into_account(data, storage=None):
+    """
+        Processes a deposit given as the dictionary deposit_into_account() reads from
+        its input file.
+
+        Args:
+            data (dict): Deposit data with the keys "IBAN" and "AMOUNT".
+            storage (Storage): Where the deposit is saved; the storage in use by default.
+
+        Returns:
+            str: A unique deposit signature generated for the successful deposit.
+
+        Raises:
+            AccountManagementException: If the data lacks required fields, contains
+            invalid data or if the amount is out of acceptable bounds.
+        """
+    try:
+        with metrics.timed("deposit", "validate"):
+            deposit = _deposit_from_data(data)
+    except AccountManagementException as exc:
+        metrics.validation_failure("deposit", exc)
+        raise
+    with metrics.timed("deposit", "hash"):
+        signature = deposit.deposit_signature
+    if _GROUP_COMMIT is not None and storage is None:
+        # returns once the batch holding the deposit is on disk
+        return _GROUP_COMMIT.submit(deposit)
+    _save_deposits([deposit], storage)
+
+    return signature
+
+
+def deposit_into_account_bulk(input_file, storage=None):
+    """
+        Processes a batch of deposits read from a single file.
+
+        The file holds a JSON array or JSON Lines (one JSON object per line) of
+        dictionaries with the same "IBAN" and "AMOUNT" keys accepted by
+        deposit_into_account(), or a single such dictionary, as the input file of
+        deposit_into_account(). Every record is validated on its own: an invalid record
+        is reported in its position of the result without aborting the batch, and all
+        the accepted deposits are appended to `deposits.json` with a single write.
+
+        Args:
+            input_file (str): Path to the JSON or JSON Lines file with the deposits.
+            storage (Storage): Where the deposits are saved; the storage in use by default.
+
+        Returns:
+            list: One item per record, in input order: the deposit signature (str) if it
+            was accepted, or the AccountManagementException explaining the rejection.
+
+        Raises:
+            AccountManagementException: If the file is missing or is neither a JSON
+            array nor JSON Lines.
+        """
+    if not os.path.exists(input_file):
+        raise AccountManagementException("Data file is not found.")
 
+    return deposit_data_into_account_bulk(_read_deposit_records(input_file), storage)
+
+
+def deposit_data_into_account_bulk(records, storage=None):
+    """
+        Processes a batch of deposits given as the dictionaries deposit_into_account()
+        reads from its input file.
+
+        The IBANs and amounts of the whole batch are validated at once (see
+        batch_validation.validate_deposits()); the records it rejects are checked
+        again one by one, which gives the reason of their rejection. All the
+        accepted deposits are appended to `deposits.json` with a single write.
+
+        Args:
+            records (iterable): Deposit data dictionaries with the keys "IBAN" and
+                "AMOUNT"; an AccountManagementException in their place (e.g. for an
+                input that could not be read) is reported as the rejection.
+            storage (Storage): Where the deposits are saved; the storage in use by default.
+
+        Returns:
+            list: One item per record, in input order: the deposit signature (str) if it
+            was accepted, or the AccountManagementException explaining the rejection.
+        """
+    records = list(records)
+    with metrics.timed("deposit", "validate"):
+        results = _batch_deposits(records)
+        for position, data in enumerate(records):
+            if results[position] is not None:
+                continue
+            try:
+                if isinstance(data, AccountManagementException):
+                    raise data
+                results[position] = _deposit_from_data(data)
+            except AccountManagementException as exc:
+                metrics.validation_failure("deposit", exc)
+                results[position] = exc
+    deposits = [result for result in results if isinstance(result, AccountDeposit)]
+    with metrics.timed("deposit", "hash"):
+        signatures = [deposit.deposit_signature for deposit in deposits]
+
+    _save_deposits(deposits, storage)
+
+    signatures.reverse()
+    return [result if isinstance(result, AccountManagementException) else signatures.pop()
+            for result in results]
+
+
+def _batch_deposits(records):
+    """Returns the AccountDeposit of every record the vectorised validators accept,
+    and None in the place of the others"""
+    results = [None] * len(records)
+    positions = [position for position, data in enumerate(records)
+                 if isinstance(data, dict) and isinstance(data.get("IBAN"), str)
+                 and isinstance(data.get("AMOUNT"), str)]
+    if not positions:
+        return results
+    cents, errors = validate_deposits([records[position]["IBAN"] for position in positions],
+                                      [records[position]["AMOUNT"] for position in positions])
+    for position, amount, error in zip(positions, cents.tolist(), errors.tolist()):
+        if error != VALID:
+            continue
+        try:
+            results[position] = AccountDeposit(records[position]["IBAN"], cents_to_float(amount))
+        except AccountManagementException:
+            # left to the record by record checks
+            pass
+    return results
+
+
+def _read_deposit_records(input_file):
+    """Yields the records of a JSON array, a single JSON object or a JSON Lines
+    file; a line that is not valid JSON is yielded as an AccountManagementException"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+    if first == "[":
+        for _, data in iter_json_array(input_file, file_label="Data"):
+            yield data
+        return
+    if first != "{":
+        raise AccountManagementException("The file is not in JSON format.")
+    with open(input_file, 'r', encoding='utf-8') as f:
+        first_line = next((line for line in f if line.strip()), "")
+        try:
+            json.loads(first_line)
+        except json.JSONDecodeError:
+            # not JSON Lines, unless only some lines are corrupt: a pretty-printed
+            # object, as the input of deposit_into_account(), is a single record
+            f.seek(0)
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                pass
+            else:
+                yield data
+                return
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield AccountManagementException("The record is not in JSON format.")
+
+
+def _deposit_from_data(data):
+    """Validates a {"IBAN", "AMOUNT"} dictionary and returns its AccountDeposit"""
     if not isinstance(data, dict) or "AMOUNT" not in data or "IBAN" not in data:
         raise AccountManagementException("The JSON does not have the expected structure.")
 
@@ -122,43 +328,66 @@ def deposit_into_account(input_file):
     iban = data["IBAN"]
     amount = data["AMOUNT"]
 
-    if not AccountManager.validate_iban(iban):
+    if not isinstance(iban, str) or not AccountManager.validate_iban(iban):
         raise AccountManagementException("The iban is invalid.")
 
-    if not amount.startswith("EUR "):
+    if not isinstance(amount, str) or not amount.startswith("EUR "):
         raise AccountManagementException("Currency must be EUR.")
 
     try:
-        amount = float(amount.split("EUR ")[1])
+        cents = parse_cents(amount, "EUR ")
     except ValueError as exc:
         raise AccountManagementException("Amount format invalid") from exc
 
-    if amount > 10000.00:
+    if cents > 1000000:
         raise AccountManagementException("Amount must be <= 10000.00")
-    if amount <= 0:
+    if cents <= 0:
         raise AccountManagementException("Amount must be > 0.")
 
+    return AccountDeposit(iban, cents_to_float(cents))
 
-    deposit = AccountDeposit(iban, amount)
 
-    directory = os.path.dirname(__file__)
-    path = os.path.join(directory, "..", "..", "deposits.json")
+def _save_deposits(deposits, storage=None):
+    """Appends the deposits to `deposits.json` with a single write"""
+    if not deposits:
+        return
+    # appended in place under the file lock (a single-row insert with SQLite);
+    # an unreadable file raises instead of being overwritten
+    with metrics.timed("deposit", "write"):
+        (storage or get_storage()).add_deposits([deposit.to_json() for deposit in deposits])
+    metrics.increment(metrics.RECORDS_WRITTEN, len(deposits), file="Deposits")
 
-    if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            try:
-                deposits = json.load(f)
-                if not isinstance(deposits, list):
-                    deposits = []
-            except json.JSONDecodeError:
-                deposits = []
-    else:
-        deposits = []
-    deposits.append(deposit.to_json())
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(deposits, f, indent=4)  # type: ignore
 
-    return deposit.deposit_signature
+_GROUP_COMMIT = None
+
+
+def start_group_commit(max_batch: int = 64, max_delay: float = 0.002):
+    """
+    Makes deposit_into_account() group the deposits of concurrent callers.
+
+    Instead of each call appending and fsync'ing its own deposit, the accepted
+    deposits are queued and written to `deposits.json` together once max_batch of
+    them are waiting or max_delay seconds after the first one. Every call still
+    returns only when its deposit is on disk.
+
+    Args:
+        max_batch (int): Maximum number of deposits written at a time.
+        max_delay (float): Seconds a deposit may wait for others to join its batch.
+    """
+    global _GROUP_COMMIT  # pylint: disable=global-statement
+    stop_group_commit()
+    _GROUP_COMMIT = GroupCommitWriter(_commit_deposits, max_batch, max_delay)
+
 
+def stop_group_commit():
+    """Writes the queued deposits and goes back to one write per deposit"""
+    global _GROUP_COMMIT  # pylint: disable=global-statement
+    writer, _GROUP_COMMIT = _GROUP_COMMIT, None
+    if writer is not None:
+        writer.close()
 
 
+def _commit_deposits(deposits):
+    """Saves a batch of deposits and returns their signatures"""
+    _save_deposits(deposits)
+    return [deposit.deposit_signature for deposit in deposits]
@@ -2,8 +2,9 @@
 
 class AccountManagementException(Exception):
     """Personalised exception for Accounts Management"""
-    def __init__(self, message):
+    def __init__(self, message, reason=None):
         self.__message = message
+        self.__reason = reason
         super().__init__(self.message)
 
     @property
@@ -14,3 +15,9 @@ class AccountManagementException(Exception):
     @message.setter
     def message(self,value):
         self.__message = value
+
+    @property
+    def reason(self):
+        """gets the kind of error: the message without the input that caused it
+        (e.g. to label metrics), or the message itself if it holds no input"""
+        return self.__reason or self.__message
@@ -1,9 +1,68 @@
 """Module """
 
-class AccountManager: # pylint: disable=too-few-public-methods
-    """Class for providing the methods for managing the orders"""
-    def __init__(self):
-        pass
+class AccountManager:
+    """
+    Class for providing the methods for managing the orders.
+
+    An instance is a handle on one ledger: the deposits, transfers, transactions
+    and balances files of a data directory. It keeps the storage of that
+    directory open for its lifetime (the transfer index connection, the parsed
+    running balances, the mapped columnar copy), and deposit_into_account(),
+    transfer_request() and calculate_balance() called through it read and write
+    only that directory, so several isolated ledgers can be used in one process.
+    """
+    def __init__(self, data_dir: str = None, storage=None):
+        """
+        Args:
+            data_dir (str): Directory of the data files of the ledger, past
+                transfers included; it is created if needed.
+            storage (Storage): Storage backend of the ledger, instead of data_dir.
+
+        Without arguments, the operations go to the storage in use (get_storage()).
+        """
+        if data_dir is not None and storage is None:
+            # imported here as storage imports the modules that import this one
+            from uc3m_money.storage import JsonStorage  # pylint: disable=import-outside-toplevel
+            storage = JsonStorage.create(data_dir)
+        self.__storage = storage
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    @property
+    def storage(self):
+        """Storage backend of the ledger"""
+        if self.__storage is not None:
+            return self.__storage
+        from uc3m_money.storage import get_storage  # pylint: disable=import-outside-toplevel
+        return get_storage()
+
+    def deposit_into_account(self, input_file: str):
+        """Processes the deposit of input_file into this ledger, see
+        account_deposit.deposit_into_account()"""
+        from uc3m_money.account_deposit import deposit_into_account  # pylint: disable=import-outside-toplevel
+        return deposit_into_account(input_file, self.__storage)
+
+    def transfer_request(self, from_iban, to_iban, concept, transfer_type, date, amount):
+        # pylint: disable=too-many-arguments
+        """Stores a transfer in this ledger, see transfer_request.transfer_request()"""
+        from uc3m_money.transfer_request import transfer_request  # pylint: disable=import-outside-toplevel
+        return transfer_request(from_iban, to_iban, concept, transfer_type, date, amount,
+                                self.__storage)
+
+    def calculate_balance(self, iban_number: str):
+        """Calculates and records the balance of an IBAN of this ledger, see
+        account_balance.calculate_balance()"""
+        from uc3m_money.account_balance import calculate_balance  # pylint: disable=import-outside-toplevel
+        return calculate_balance(iban_number, self.__storage)
+
+    def close(self):
+        """Releases the files held by the ledger; the storage in use is left open"""
+        if self.__storage is not None:
+            self.__storage.close()
 
     @staticmethod
     def validate_iban(iban: str):
@@ -0,0 +1,77 @@
+"""Fixed-point amounts stored as an integer number of cents"""
+import math
+
+
+def parse_cents(text: str, prefix: str = "") -> int:
+    """
+    Parses a decimal amount such as "EUR 123.45", "+2424.42" or "15" into cents.
+
+    Args:
+        text (str): The amount, optionally signed, with up to two decimals.
+        prefix (str): Text the amount must start with (e.g. "EUR ").
+
+    Returns:
+        int: The amount in cents.
+
+    Raises:
+        ValueError: If the text is not a number with at most two decimals
+        preceded by the prefix.
+    """
+    if prefix:
+        if not text.startswith(prefix):
+            raise ValueError(f"Amount must start with {prefix!r}")
+        text = text[len(prefix):]
+    text = text.strip()
+    sign = 1
+    first = text[:1]
+    if first == "-":
+        sign = -1
+        text = text[1:]
+    elif first == "+":
+        text = text[1:]
+    whole, _, decimals = text.partition(".")
+    valid_whole = whole.isdigit() or not whole and decimals
+    valid_decimals = len(decimals) <= 2 and (decimals.isdigit() or not decimals)
+    # isdigit() alone would accept non-ASCII digits
+    if not (text.isascii() and valid_whole and valid_decimals):
+        raise ValueError(f"Invalid amount: {text!r}")
+    return sign * (int(whole or "0") * 100 + int(decimals.ljust(2, "0")))
+
+
+def amount_to_cents(amount) -> int:
+    """
+    Converts an amount of the transactions file into cents.
+
+    Decimal strings with up to two decimals are parsed exactly; amounts with
+    other notations or more decimals are rounded to cents.
+
+    Raises:
+        TypeError, ValueError, OverflowError: If the amount is not a number.
+    """
+    try:
+        return parse_cents(amount)
+    except (AttributeError, ValueError):
+        return round(float(amount) * 100)
+
+
+def float_to_cents(amount: float) -> int:
+    """
+    Converts a float amount in euros to cents.
+
+    Raises:
+        ValueError: If the amount has more than two decimals, i.e. if its shortest
+        representation (str(amount)) has more than two digits after the point.
+    """
+    if not math.isfinite(amount):
+        raise ValueError("Amount must be a finite number")
+    cents = round(amount * 100)
+    # n / 100 is the float closest to the decimal n/100, so this holds exactly
+    # for the floats written with at most two decimals
+    if cents / 100 != amount:
+        raise ValueError("Amount must have up to two decimal places")
+    return cents
+
+
+def cents_to_float(cents: int) -> float:
+    """Converts cents to a float amount in euros"""
+    return cents / 100
@@ -0,0 +1,74 @@
+"""Bounded least-recently-used cache of computed balances"""
+import collections
+import threading
+
+DEFAULT_MAXSIZE = 1024
+
+
+class BalanceCache:
+    """
+    Class representing a thread-safe LRU cache keyed by IBAN.
+
+    Every value is stored with the version of the data it was computed from
+    (e.g. the size and mtime of the transactions file); a lookup with another
+    version is a miss, so changed data is never served.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.__maxsize = maxsize
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self):
+        """Number of lookups served from the cache"""
+        return self.__hits
+
+    @property
+    def misses(self):
+        """Number of lookups not found or found with another version"""
+        return self.__misses
+
+    @property
+    def maxsize(self):
+        """Maximum number of cached IBANs"""
+        return self.__maxsize
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, iban, version):
+        """Returns the value cached for iban at version, or None"""
+        with self.__lock:
+            entry = self.__entries.get(iban)
+            if entry is None or entry[0] != version:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(iban)
+            self.__hits += 1
+            return entry[1]
+
+    def put(self, iban, version, value):
+        """Caches the value of iban at version, evicting the least recently used IBAN
+        if the cache is full"""
+        if self.__maxsize <= 0:
+            return
+        with self.__lock:
+            self.__entries[iban] = (version, value)
+            self.__entries.move_to_end(iban)
+            while len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        """Empties the cache and resets the counters"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+    def stats(self):
+        """Returns the counters as a dict with the keys hits, misses, size and maxsize"""
+        return {"hits": self.__hits, "misses": self.__misses,
+                "size": len(self.__entries), "maxsize": self.__maxsize}
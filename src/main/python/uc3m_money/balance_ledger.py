@@ -0,0 +1,150 @@
+"""Materialised running balances per IBAN over the transactions file"""
+import json
+import os
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.json_stream import iter_json_array, read_checkpoint
+from uc3m_money.amount_cents import amount_to_cents, cents_to_float
+from uc3m_money.file_storage import atomic_write_json
+from uc3m_money import metrics
+
+
+class BalanceLedger:
+    """
+    Class representing the running balance of every IBAN in 'transactions.json'.
+
+    The ledger is persisted in a sidecar JSON file together with the byte offset
+    right after the last transaction folded in. When transactions are appended
+    to the array only the new elements are parsed, so the file must be
+    append-only. The ledger is rebuilt from scratch when the file was replaced
+    (another inode), modified without growing (same size, another mtime) or no
+    longer holds the bytes right before the offset. Other edits of transactions
+    already folded in are not detected.
+    """
+
+    def __init__(self, transactions_path: str, ledger_path: str):
+        self.__transactions_path = transactions_path
+        self.__ledger_path = ledger_path
+        self.__state = self.__load()
+
+    @property
+    def offset(self):
+        """Byte offset in the transactions file up to which the ledger is computed"""
+        return self.__state["offset"]
+
+    def balance(self, iban: str):
+        """
+        Returns the summed amount of the transactions of an IBAN.
+
+        Args:
+            iban (str): The IBAN to look up.
+
+        Returns:
+            float: The balance, or None if the IBAN has no transactions.
+
+        Raises:
+            AccountManagementException: If the transactions file is missing or
+            corrupt, or if any transaction of the IBAN has an invalid amount.
+        """
+        return self.balances([iban]).get(iban)
+
+    def balances(self, ibans=None):
+        """
+        Returns the balances of several IBANs after a single refresh.
+
+        Args:
+            ibans (iterable): IBANs to look up, or None for every IBAN in the ledger.
+
+        Returns:
+            dict: IBAN -> balance for the requested IBANs that have transactions.
+
+        Raises:
+            AccountManagementException: If the transactions file is missing or
+            corrupt, or if any requested IBAN has a transaction with an invalid amount.
+        """
+        self.refresh()
+        balances = self.__state["cents"]
+        if ibans is None:
+            ibans = list(balances)
+        for iban in ibans:
+            if iban in self.__state["invalid"]:
+                raise AccountManagementException("Amount format in transactions file is invalid")
+        return {iban: cents_to_float(balances[iban]) for iban in ibans if iban in balances}
+
+    def refresh(self):
+        """Folds in the transactions appended since the last computation"""
+        if not os.path.exists(self.__transactions_path):
+            raise AccountManagementException("Transactions file not found")
+        stat = os.stat(self.__transactions_path)
+        if not self.__is_prefix_unchanged(stat):
+            self.__state = self.__empty_state()
+        file_version = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        offset = new_offset = self.__state["offset"]
+        scanned = 0
+        try:
+            for new_offset, transaction in iter_json_array(
+                    self.__transactions_path, offset, "Transactions"):
+                self.__add(transaction)
+                scanned += 1
+        except AccountManagementException:
+            # discard the partially folded balances
+            self.__state = self.__load()
+            raise
+        if new_offset == offset and file_version == self.__state["file"]:
+            return
+        if new_offset != offset:
+            metrics.increment(metrics.RECORDS_SCANNED, scanned, file="Transactions")
+            metrics.increment(metrics.BYTES_READ, new_offset - offset, file="Transactions")
+            self.__state["offset"] = new_offset
+            # an empty checkpoint (file shrunk meanwhile) makes the next refresh rebuild
+            self.__state["checkpoint"] = (read_checkpoint(self.__transactions_path, new_offset)
+                                          or b"").hex()
+        self.__state["file"] = file_version
+        self.__save()
+
+    def __add(self, transaction):
+        if not isinstance(transaction, dict):
+            return
+        iban = transaction.get("IBAN")
+        if iban is None:
+            return
+        balances = self.__state["cents"]
+        try:
+            balances[iban] = balances.get(iban, 0) + amount_to_cents(transaction.get("amount"))
+        except (AttributeError, TypeError, ValueError, OverflowError):
+            if iban not in self.__state["invalid"]:
+                self.__state["invalid"].append(iban)
+            balances.setdefault(iban, 0)
+
+    def __is_prefix_unchanged(self, stat):
+        offset = self.__state["offset"]
+        if offset == 0:
+            return True
+        inode, size, mtime_ns = self.__state["file"]
+        if stat.st_ino != inode:
+            # replaced by another file
+            return False
+        if stat.st_size == size and stat.st_mtime_ns != mtime_ns:
+            # written in place without appending
+            return False
+        return read_checkpoint(self.__transactions_path, offset) == \
+            bytes.fromhex(self.__state["checkpoint"])
+
+    @staticmethod
+    def __empty_state():
+        # file: inode, size and mtime of the transactions file when last refreshed
+        return {"offset": 0, "checkpoint": "", "file": [0, 0, 0], "cents": {}, "invalid": []}
+
+    def __load(self):
+        if not os.path.exists(self.__ledger_path):
+            return self.__empty_state()
+        try:
+            with open(self.__ledger_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except json.JSONDecodeError:
+            return self.__empty_state()
+        if not isinstance(state, dict) or set(state) != set(self.__empty_state()):
+            return self.__empty_state()
+        return state
+
+    def __save(self):
+        atomic_write_json(self.__ledger_path, self.__state, indent=None)
@@ -0,0 +1,143 @@
+"""Balances file holding one entry per IBAN and date"""
+import json
+import os
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.file_storage import atomic_write_json, file_lock
+from uc3m_money.json_stream import (iter_json_array, read_checkpoint, rewrite_json_array_tail,
+                                    rollback_json_array)
+
+# sidecar file, next to the balances file, with the offset of the latest run
+STATE_FILE = "balances_state.json"
+
+
+class BalanceStore:
+    """
+    Class representing 'balances.json' as a set of entries keyed by (iban, date).
+
+    Writing a balance replaces the entry of the same IBAN and date instead of
+    appending another one, and writes nothing if the entry is already there.
+    As balances are written with the current date, the entries of the latest
+    date form a run at the end of the array: the store remembers (in a sidecar
+    JSON file) the byte offset where that run starts, and upserts only read and
+    rewrite the run, so their cost grows with the number of accounts, not with
+    the number of calls or days. compact() collapses the duplicates written
+    before this store existed.
+    """
+
+    def __init__(self, path: str, state_path: str = None):
+        self.__path = path
+        self.__state_path = state_path or os.path.join(os.path.dirname(os.path.abspath(path)),
+                                                       STATE_FILE)
+        self.__journal_path = path + ".journal"
+
+    def upsert(self, entries):
+        """
+        Writes {"iban", "amount", "date"} balance entries, replacing the stored
+        entries of the same IBAN and date.
+
+        Returns:
+            int: Number of entries that were added or changed.
+
+        Raises:
+            AccountManagementException: If the file does not exist or does not
+            hold a JSON array.
+        """
+        entries = list(entries)
+        if not entries:
+            return 0
+        if not os.path.exists(self.__path):
+            raise AccountManagementException("Balances file not found")
+        with file_lock(self.__path):
+            rollback_json_array(self.__path, self.__journal_path)
+            offset = self.__load_offset()
+            tail = list(iter_json_array(self.__path, offset, "Balances"))
+            dates = {entry.get("date") for entry in entries}
+            last_date = _date(tail[-1][1]) if tail else None
+            if len(dates) != 1 or None in dates \
+                    or (last_date is not None and min(dates) < last_date):
+                # balances of past dates: merge them anywhere in the file
+                return self.__rewrite_all(entries)
+
+            run_start = offset
+            run = tail
+            if dates == {last_date}:
+                # the run of the latest date is the suffix of the tail with that date
+                first = len(tail)
+                while first > 0 and _date(tail[first - 1][1]) == last_date:
+                    first -= 1
+                if first:
+                    run_start = tail[first - 1][0]
+                run = tail[first:]
+            elif tail:
+                # a new date starts a new run after the last entry
+                run_start = tail[-1][0]
+                run = []
+
+            merged = {_key(entry): entry for _, entry in run}
+            changed = 0
+            for entry in entries:
+                key = _key(entry)
+                if merged.get(key) != entry:
+                    merged[key] = entry
+                    changed += 1
+            if changed or len(merged) != len(run):
+                rewrite_json_array_tail(self.__path, run_start, merged.values(),
+                                        self.__journal_path, "Balances")
+            if run_start != offset:
+                self.__save_offset(run_start)
+            return changed
+
+    def compact(self):
+        """
+        Rewrites the file keeping only the last entry written for every IBAN and
+        date, ordered by date.
+
+        Returns:
+            tuple: (entries before, entries after).
+        """
+        with file_lock(self.__path):
+            rollback_json_array(self.__path, self.__journal_path)
+            before = sum(1 for _ in iter_json_array(self.__path, 0, "Balances"))
+            after = self.__rewrite_all([])
+        return before, after
+
+    def __rewrite_all(self, entries):
+        """Merges entries into every stored entry and replaces the file; returns the
+        number of entries in the new file"""
+        merged = {}
+        for position, (_, entry) in enumerate(iter_json_array(self.__path, 0, "Balances")):
+            # entries without iban or date cannot be merged and are kept as they are
+            mergeable = isinstance(entry, dict) and None not in _key(entry)
+            merged[_key(entry) if mergeable else position] = entry
+        for entry in entries:
+            merged[_key(entry)] = entry
+        ordered = sorted(merged.values(), key=lambda entry: str(_date(entry) or ""))
+        atomic_write_json(self.__path, ordered)
+        if os.path.exists(self.__state_path):
+            os.remove(self.__state_path)
+        return len(ordered)
+
+    def __load_offset(self):
+        """Returns the stored offset of the latest run if the file up to it did not change"""
+        try:
+            with open(self.__state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            offset, checkpoint = state["offset"], bytes.fromhex(state["checkpoint"])
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return 0
+        if read_checkpoint(self.__path, offset) != checkpoint:
+            return 0
+        return offset
+
+    def __save_offset(self, offset):
+        checkpoint = read_checkpoint(self.__path, offset) or b""
+        atomic_write_json(self.__state_path, {"offset": offset, "checkpoint": checkpoint.hex()},
+                          indent=None)
+
+
+def _key(entry):
+    return entry.get("iban"), entry.get("date")
+
+
+def _date(entry):
+    return entry.get("date") if isinstance(entry, dict) else None
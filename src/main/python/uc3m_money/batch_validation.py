@@ -0,0 +1,148 @@
+"""Vectorised validation of large batches of IBANs and amounts with NumPy"""
+import numpy as np
+
+# error codes returned by the batch validators
+VALID = 0
+INVALID_IBAN = 1
+INVALID_CURRENCY = 2
+INVALID_AMOUNT_FORMAT = 3
+TOO_MANY_DECIMALS = 4
+AMOUNT_OUT_OF_RANGE = 5
+
+IBAN_LENGTH = 24
+MIN_AMOUNT_CENTS = 1000
+MAX_AMOUNT_CENTS = 1000000
+# more integer digits than this cannot be a valid amount and would overflow int64
+MAX_INTEGER_DIGITS = 15
+
+_ZERO, _NINE, _DOT, _PLUS, _MINUS = (ord(char) for char in "09.+-")
+
+
+def validate_ibans(ibans):
+    """
+    Validates a batch of Spanish IBANs like AccountManager.validate_iban().
+
+    Args:
+        ibans (sequence): IBAN strings.
+
+    Returns:
+        numpy.ndarray: Boolean mask, True where the IBAN is valid. Only ASCII
+        digits are accepted after the 'ES' prefix.
+    """
+    # one extra column so that IBANs longer than 24 characters are noticed
+    codes = _code_points(ibans, IBAN_LENGTH + 1)
+    digits = codes[:, 2:IBAN_LENGTH]
+    return ((codes[:, 0] == ord("E")) & (codes[:, 1] == ord("S"))
+            & np.all((digits >= _ZERO) & (digits <= _NINE), axis=1)
+            & (codes[:, IBAN_LENGTH] == 0))
+
+
+def parse_amounts(amounts, prefix=""):
+    """
+    Parses a batch of decimal amount strings into integer cents.
+
+    Accepts an optional sign, integer digits and up to two decimals
+    (e.g. "+2424.42", "-1280.06", "15"), after a mandatory prefix such as "EUR ".
+
+    Args:
+        amounts (sequence): Amount strings.
+        prefix (str): Text every amount must start with.
+
+    Returns:
+        tuple: (cents, errors) int64 arrays; errors holds VALID, INVALID_CURRENCY,
+        INVALID_AMOUNT_FORMAT or TOO_MANY_DECIMALS, and cents is 0 where errors != VALID.
+    """
+    strings = np.asarray(amounts, dtype=str)
+    codes = _code_points(strings, None, len(prefix) + 1)[:, len(prefix):]
+    has_sign = (codes[:, 0] == _PLUS) | (codes[:, 0] == _MINUS)
+    is_digit = ((codes >= _ZERO) & (codes <= _NINE)
+                & (np.arange(codes.shape[1]) >= has_sign[:, None]))
+    errors, decimals = _amount_errors(codes, has_sign, is_digit)
+    errors[~np.char.startswith(strings, prefix)] = INVALID_CURRENCY
+
+    scale = np.power(10, np.clip(2 - decimals, 0, 2), dtype=np.int64)
+    cents = np.where(codes[:, 0] == _MINUS, -1, 1) * _digits_value(codes, is_digit) * scale
+    return np.where(errors == VALID, cents, 0), errors
+
+
+def validate_deposits(ibans, amounts):
+    """
+    Validates a batch of deposits with the rules of deposit_into_account().
+
+    Args:
+        ibans (sequence): IBAN strings.
+        amounts (sequence): Amount strings in the format "EUR <amount>".
+
+    Returns:
+        tuple: (cents, errors) int64 arrays with the parsed amounts and one error
+        code per deposit (VALID for accepted deposits).
+    """
+    cents, errors = parse_amounts(amounts, prefix="EUR ")
+    errors[(errors == VALID) & ((cents < MIN_AMOUNT_CENTS) | (cents > MAX_AMOUNT_CENTS))] = \
+        AMOUNT_OUT_OF_RANGE
+    errors[~validate_ibans(ibans)] = INVALID_IBAN
+    return np.where(errors == VALID, cents, 0), errors
+
+
+def validate_transfer_amounts(amounts):
+    """
+    Validates a batch of float transfer amounts with the rules of transfer_request().
+
+    Args:
+        amounts (sequence): Amounts in euros.
+
+    Returns:
+        tuple: (cents, errors) int64 arrays with the amounts rounded to cents and
+        VALID, TOO_MANY_DECIMALS (also for NaN and infinities) or
+        AMOUNT_OUT_OF_RANGE for every amount.
+    """
+    euros = np.asarray(amounts, dtype=np.float64)
+    rounded = np.rint(euros * 100)
+    errors = np.full(euros.shape, VALID, dtype=np.int64)
+    errors[(rounded < MIN_AMOUNT_CENTS) | (rounded > MAX_AMOUNT_CENTS)] = AMOUNT_OUT_OF_RANGE
+    # the exact test of amount_cents.float_to_cents(): rint rounds half to even like round()
+    errors[(rounded / 100 != euros) | ~np.isfinite(euros)] = TOO_MANY_DECIMALS
+    cents = np.where(errors == VALID, rounded, 0).astype(np.int64)
+    return cents, errors
+
+
+def _amount_errors(codes, has_sign, is_digit):
+    """Returns the error code (VALID, INVALID_AMOUNT_FORMAT or TOO_MANY_DECIMALS)
+    and the number of decimals of every amount"""
+    columns = np.arange(codes.shape[1])
+    length = np.count_nonzero(codes, axis=1)
+    is_dot = codes == _DOT
+    is_used = columns < length[:, None]
+    dots = np.count_nonzero(is_dot, axis=1)
+    dot_position = np.where(dots > 0, np.argmax(is_dot, axis=1), length)
+    integer_digits = dot_position - has_sign
+    decimals = np.where(dots > 0, length - dot_position - 1, 0)
+
+    is_sign = (columns == 0) & has_sign[:, None]
+    well_formed = (np.all(is_digit | is_dot | is_sign | ~is_used, axis=1) & (dots <= 1)
+                   & (np.count_nonzero(is_digit, axis=1) > 0)
+                   & (integer_digits <= MAX_INTEGER_DIGITS))
+    errors = np.full(codes.shape[0], VALID, dtype=np.int64)
+    errors[well_formed & (decimals > 2)] = TOO_MANY_DECIMALS
+    errors[~well_formed] = INVALID_AMOUNT_FORMAT
+    return errors, decimals
+
+
+def _digits_value(codes, is_digit):
+    """Returns the number written by the digits of every row, skipping the sign
+    and the dot, with Horner's rule column by column"""
+    value = np.zeros(codes.shape[0], dtype=np.int64)
+    for column in range(codes.shape[1]):
+        value = np.where(is_digit[:, column],
+                         value * 10 + (codes[:, column].astype(np.int64) - _ZERO), value)
+    return value
+
+
+def _code_points(strings, width, min_width=1):
+    """Returns the unicode code points of the strings as a (count, width) uint32 matrix,
+    padded with zeros; width None uses the length of the longest string"""
+    array = np.asarray(strings, dtype=str)
+    if width is None:
+        width = max(array.dtype.itemsize // 4, min_width)
+    array = array.astype(f"<U{width}")
+    return array.view(np.uint32).reshape(array.shape[0], width)
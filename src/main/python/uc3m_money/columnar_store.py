@@ -0,0 +1,283 @@
+"""Binary columnar copy of the transactions file, read through mmap and NumPy"""
+import itertools
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import numpy as np
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.amount_cents import amount_to_cents, cents_to_float
+from uc3m_money.json_stream import iter_json_array
+
+MAGIC = b"UC3MCOL1"
+FORMAT_VERSION = 1
+# magic, version, flags, count, size and mtime of the source file, IBAN width
+HEADER = struct.Struct("<8sIIQQqI")
+HEADER_SIZE = 64
+IBAN_WIDTH = 24
+FLAG_DATES = 1
+MISSING_DATE = np.iinfo(np.int32).min
+BATCH_SIZE = 65536
+
+
+class ColumnarTransactions:
+    # one attribute per column of the file, besides the mapping and its header
+    # pylint: disable=too-many-instance-attributes
+    """
+    Class representing a columnar transactions file opened with mmap.
+
+    The file holds a 64-byte header followed by the columns of the transactions,
+    each contiguous and aligned: IBAN (24 bytes, NUL padded), amount (int64
+    cents), whether the amount was valid (uint8) and, optionally, date (int32
+    days since 1970-01-01). The columns are NumPy views of the mapped file, so
+    queries scan them with vectorised operations and without copying or parsing.
+    """
+
+    def __init__(self, path: str):
+        self.__file = open(path, "rb")  # pylint: disable=consider-using-with
+        try:
+            size = os.fstat(self.__file.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise AccountManagementException("Columnar file format is invalid")
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.__file.close()
+            raise
+        magic, version, flags, count, source_size, source_mtime, width = \
+            HEADER.unpack_from(self.__map)
+        offsets = _column_offsets(count, flags & FLAG_DATES)
+        if magic != MAGIC or version != FORMAT_VERSION or width != IBAN_WIDTH \
+                or offsets["end"] > size:
+            self.close()
+            raise AccountManagementException("Columnar file format is invalid")
+        self.__count = count
+        self.__source = (source_size, source_mtime)
+        # each IBAN as 3 uint64 words, compared word by word
+        self.__iban_words = np.frombuffer(self.__map, np.uint64, count * 3,
+                                          offsets["ibans"]).reshape(count, 3)
+        self.__cents = np.frombuffer(self.__map, np.int64, count, offsets["cents"])
+        self.__valid = np.frombuffer(self.__map, np.uint8, count, offsets["valid"])
+        self.__dates = np.frombuffer(self.__map, np.int32, count, offsets["dates"]) \
+            if flags & FLAG_DATES else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.__count
+
+    @property
+    def cents(self):
+        """Amounts in cents (read-only view of the file)"""
+        return self.__cents
+
+    @property
+    def dates(self):
+        """Days since 1970-01-01 (MISSING_DATE where unknown), or None without dates"""
+        return self.__dates
+
+    def ibans(self):
+        """Returns the IBAN column as a NumPy array of 24-byte strings"""
+        return self.__iban_words.view(f"S{IBAN_WIDTH}").reshape(self.__count)
+
+    def is_current(self, json_path: str):
+        """Tells whether json_path still has the size and mtime it had when exported"""
+        try:
+            stat = os.stat(json_path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self.__source
+
+    def balance(self, iban: str):
+        """
+        Returns the summed amount of the transactions of an IBAN, or None if it
+        has none.
+
+        Raises:
+            AccountManagementException: If a transaction of the IBAN has an invalid amount.
+        """
+        key = _iban_words(iban)
+        if key is None:
+            return None
+        words = self.__iban_words
+        mask = (words[:, 0] == key[0]) & (words[:, 1] == key[1]) & (words[:, 2] == key[2])
+        if not mask.any():
+            return None
+        if not self.__valid[mask].all():
+            raise AccountManagementException("Amount format in transactions file is invalid")
+        return cents_to_float(int(self.__cents[mask].sum()))
+
+    def balances(self, ibans=None):
+        """
+        Returns IBAN -> balance for the requested IBANs (all of them if None)
+        that have transactions.
+
+        Raises:
+            AccountManagementException: If a requested IBAN has an invalid amount.
+        """
+        keys, sums, valid = self.__grouped()
+        if ibans is None:
+            if not valid.all():
+                raise AccountManagementException("Amount format in transactions file is invalid")
+            return {key.decode("ascii"): cents_to_float(int(total))
+                    for key, total in zip(keys, sums)}
+        wanted = [iban for iban in dict.fromkeys(ibans) if _iban_words(iban) is not None]
+        if not wanted or keys.size == 0:
+            return {}
+        # the requested IBANs are looked up in the groups, which are sorted
+        requested = np.array([iban.encode("ascii") for iban in wanted], dtype=f"S{IBAN_WIDTH}")
+        positions = np.minimum(np.searchsorted(keys, requested), len(keys) - 1)
+        found = keys[positions] == requested
+        if not valid[positions[found]].all():
+            raise AccountManagementException("Amount format in transactions file is invalid")
+        return {iban: cents_to_float(int(sums[position]))
+                for iban, position, is_found in zip(wanted, positions, found) if is_found}
+
+    def __grouped(self):
+        """Returns the sorted distinct IBANs with the summed amounts of their
+        transactions and whether all of them are valid, in one sort of the rows"""
+        ibans = self.ibans()
+        if not self.__count:
+            return ibans, np.array([], dtype=np.int64), np.array([], dtype=np.uint8)
+        order = np.argsort(ibans, kind="stable")
+        sorted_ibans = ibans[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_ibans[1:] != sorted_ibans[:-1])))
+        return (sorted_ibans[starts], np.add.reduceat(self.__cents[order], starts),
+                np.minimum.reduceat(self.__valid[order], starts))
+
+    def close(self):
+        """Releases the mapping; the columns cannot be used afterwards"""
+        self.__iban_words = self.__cents = self.__valid = self.__dates = None
+        if getattr(self, "_ColumnarTransactions__map", None) is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+
+
+def export_transactions(json_path: str, columnar_path: str, with_dates: bool = False,
+                        batch_size: int = BATCH_SIZE):
+    """
+    Writes the columnar copy of a 'transactions.json' file.
+
+    The JSON file is streamed, so memory usage is bounded by batch_size. The
+    copy records the size and mtime of the JSON file, see is_current().
+    As in the ledger, transactions without IBAN are skipped and an amount that
+    is not a number marks its IBAN as invalid.
+
+    Args:
+        json_path (str): Path of the transactions JSON array.
+        columnar_path (str): Path of the columnar file, replaced atomically.
+        with_dates (bool): Whether to store the "date" of the transactions
+            (YYYY-MM-DD) in a column.
+
+    Returns:
+        int: Number of transactions written.
+
+    Raises:
+        AccountManagementException: If the JSON file is corrupt or holds an IBAN
+        longer than 24 ASCII characters.
+    """
+    if not os.path.exists(json_path):
+        raise AccountManagementException("Transactions file not found")
+    stat = os.stat(json_path)
+    directory = os.path.dirname(os.path.abspath(columnar_path))
+    columns = ["ibans", "cents", "valid"] + (["dates"] if with_dates else [])
+    with tempfile.TemporaryDirectory(dir=directory) as tmp_dir:
+        count = _write_columns(json_path, tmp_dir, columns, batch_size)
+        tmp_path = os.path.join(tmp_dir, "columnar")
+        with open(tmp_path, "wb") as out:
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_DATES if with_dates else 0, count,
+                                 stat.st_size, stat.st_mtime_ns, IBAN_WIDTH)
+            out.write(header.ljust(HEADER_SIZE, b"\0"))
+            offsets = _column_offsets(count, with_dates)
+            for name in columns:
+                out.write(b"\0" * (offsets[name] - out.tell()))
+                with open(os.path.join(tmp_dir, name), "rb") as column:
+                    shutil.copyfileobj(column, out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, columnar_path)
+    return count
+
+
+def _write_columns(json_path, tmp_dir, columns, batch_size):
+    """Streams the transactions of json_path into one file per column in tmp_dir,
+    batch_size records at a time, and returns the number of rows written"""
+    dtypes = {"ibans": f"S{IBAN_WIDTH}", "cents": np.int64, "valid": np.uint8,
+              "dates": np.int32}
+    count = 0
+    files = {name: open(os.path.join(tmp_dir, name), "wb")  # pylint: disable=consider-using-with
+             for name in columns}
+    try:
+        records = (record for _, record
+                   in iter_json_array(json_path, file_label="Transactions"))
+        while True:
+            chunk = list(itertools.islice(records, batch_size))
+            if not chunk:
+                break
+            batch = [row for row in map(_row, chunk) if row is not None]
+            if batch:
+                # the values of every column, in the order of _row()
+                for name, values in zip(("ibans", "cents", "valid", "dates"), zip(*batch)):
+                    if name in files:
+                        np.array(values, dtype=dtypes[name]).tofile(files[name])
+                count += len(batch)
+    finally:
+        for f in files.values():
+            f.close()
+    return count
+
+
+def _column_offsets(count, with_dates):
+    """Returns the byte offset of every column and of the end of the file"""
+    offsets = {"ibans": HEADER_SIZE}
+    offsets["cents"] = _align(offsets["ibans"] + count * IBAN_WIDTH, 8)
+    offsets["valid"] = offsets["cents"] + count * 8
+    end = offsets["valid"] + count
+    if with_dates:
+        offsets["dates"] = _align(end, 4)
+        end = offsets["dates"] + count * 4
+    offsets["end"] = end
+    return offsets
+
+
+def _align(offset, alignment):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _iban_words(iban):
+    """Returns an IBAN as the 3 uint64 words it is stored as, or None if it cannot be stored"""
+    try:
+        encoded = iban.encode("ascii")
+    except (AttributeError, UnicodeEncodeError):
+        return None
+    if len(encoded) > IBAN_WIDTH:
+        return None
+    return np.frombuffer(encoded.ljust(IBAN_WIDTH, b"\0"), np.uint64)
+
+
+def _row(record):
+    """Returns the (iban, cents, valid, date) columns of a transaction, or None"""
+    if not isinstance(record, dict):
+        return None
+    iban = record.get("IBAN")
+    if iban is None:
+        return None
+    if _iban_words(iban) is None:
+        raise AccountManagementException(
+            f"IBAN in transactions file is not {IBAN_WIDTH} ASCII characters or less")
+    try:
+        cents, valid = amount_to_cents(record.get("amount")), 1
+        if not -2 ** 63 <= cents < 2 ** 63:
+            raise OverflowError
+    except (TypeError, ValueError, OverflowError):
+        cents, valid = 0, 0
+    try:
+        date = int(np.datetime64(record["date"], "D").astype(np.int64))
+    except (KeyError, TypeError, ValueError):
+        date = MISSING_DATE
+    return iban.encode("ascii"), cents, valid, date
@@ -0,0 +1,22 @@
+"""Command line tool collapsing the duplicate entries of a balances file"""
+import argparse
+import os
+from uc3m_money.balance_store import BalanceStore
+
+DEFAULT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "balances.json"))
+
+
+def main(argv=None):
+    """Compacts the balances files given in the command line"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+                        help="balances files, src/main/balances.json by default")
+    args = parser.parse_args(argv)
+
+    for path in args.paths or [DEFAULT_PATH]:
+        before, after = BalanceStore(path).compact()
+        print(f"{path}: {before} entries compacted to {after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Ingestion of the deposit files dropped into a spool directory"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uc3m_money import metrics
+from uc3m_money.account_deposit import deposit_data_into_account_bulk
+from uc3m_money.account_management_exception import AccountManagementException
+
+DONE_DIR = "done"
+REJECTED_DIR = "rejected"
+INPUT_SUFFIX = ".json"
+# written next to a rejected file, with the reason of the rejection
+REASON_SUFFIX = ".error"
+# read in place of a file taken away since it was listed
+_GONE = object()
+
+
+class DepositSpool:
+    # the directories and settings of the spool, its reading pool and counters
+    # pylint: disable=too-many-instance-attributes
+    """
+    Class ingesting the deposit files dropped into an inbox directory.
+
+    Each file holds one deposit, as the input file of deposit_into_account().
+    The files waiting in the inbox are taken in batches of batch_size: they are
+    read and parsed on a pool of worker threads (the next batch is read while
+    the current one is saved), the whole batch is validated at once and its
+    accepted deposits are appended to `deposits.json` with a single write.
+    Then every file is moved to the done directory, or to the rejected one with
+    a '.error' file giving the reason.
+
+    Producers must write their files elsewhere (or under a name starting with
+    '.' or not ending in '.json') and rename them into the inbox once complete.
+    A single spool may process an inbox at a time. A file is moved after its
+    deposit is saved, so a crash between both may ingest it twice.
+    """
+
+    def __init__(self, inbox: str, done_dir: str = None, rejected_dir: str = None,
+                 storage=None, workers: int = 4, batch_size: int = 256,
+                 poll_interval: float = 0.5):
+        # pylint: disable=too-many-arguments
+        """
+        Args:
+            inbox (str): Directory the deposit files are dropped into.
+            done_dir (str): Directory of the processed files; inbox/done by default.
+            rejected_dir (str): Directory of the rejected files; inbox/rejected by default.
+            storage (Storage): Where the deposits are saved; the storage in use by default.
+            workers (int): Threads reading and parsing the files.
+            batch_size (int): Maximum number of files saved with a single write.
+            poll_interval (float): Seconds run() waits when the inbox is empty.
+        """
+        self.__inbox = inbox
+        self.__done_dir = done_dir or os.path.join(inbox, DONE_DIR)
+        self.__rejected_dir = rejected_dir or os.path.join(inbox, REJECTED_DIR)
+        for directory in (self.__inbox, self.__done_dir, self.__rejected_dir):
+            os.makedirs(directory, exist_ok=True)
+        self.__storage = storage
+        self.__batch_size = batch_size
+        self.__poll_interval = poll_interval
+        self.__executor = ThreadPoolExecutor(workers, thread_name_prefix="deposit-spool")
+        self.__stopped = threading.Event()
+        self.__files = 0
+        self.__accepted = 0
+        self.__seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def pending(self):
+        """Returns the names of the files waiting in the inbox, oldest name first"""
+        with os.scandir(self.__inbox) as entries:
+            return sorted(entry.name for entry in entries
+                          if entry.name.endswith(INPUT_SUFFIX)
+                          and not entry.name.startswith(".") and entry.is_file())
+
+    def process_once(self):
+        """
+        Ingests the files waiting in the inbox.
+
+        Returns:
+            int: Number of files listed in the inbox, including those taken
+            away before they could be read (which are skipped).
+
+        Raises:
+            AccountManagementException: If the deposits cannot be saved; the files
+            of the failed batch are left in the inbox.
+        """
+        names = self.pending()
+        if not names:
+            return 0
+        start = time.perf_counter()
+        batches = [names[index:index + self.__batch_size]
+                   for index in range(0, len(names), self.__batch_size)]
+        reading = self.__read(batches[0])
+        try:
+            for index, batch in enumerate(batches):
+                records = [future.result() for future in reading]
+                if index + 1 < len(batches):
+                    reading = self.__read(batches[index + 1])
+                self.__commit(batch, records)
+        finally:
+            self.__seconds += time.perf_counter() - start
+        return len(names)
+
+    def run(self):
+        """Processes the files dropped into the inbox until stop() is called"""
+        self.__stopped.clear()
+        while not self.__stopped.is_set():
+            if not self.process_once():
+                self.__stopped.wait(self.__poll_interval)
+
+    def stop(self):
+        """Makes run() return once the files being processed are done"""
+        self.__stopped.set()
+
+    def close(self):
+        """Stops the spool and its reading threads"""
+        self.stop()
+        self.__executor.shutdown()
+
+    def stats(self):
+        """
+        Returns the counters of the files processed so far.
+
+        Returns:
+            dict: files, accepted and rejected counts, seconds spent processing
+            them (waits on an empty inbox excluded) and files_per_sec.
+        """
+        return {"files": self.__files,
+                "accepted": self.__accepted,
+                "rejected": self.__files - self.__accepted,
+                "seconds": self.__seconds,
+                "files_per_sec": self.__files / self.__seconds if self.__seconds else 0.0}
+
+    def __read(self, names):
+        return [self.__executor.submit(_read_deposit_file, os.path.join(self.__inbox, name))
+                for name in names]
+
+    def __commit(self, names, records):
+        kept = [position for position, record in enumerate(records) if record is not _GONE]
+        names = [names[position] for position in kept]
+        records = [records[position] for position in kept]
+        results = deposit_data_into_account_bulk(records, self.__storage)
+        with metrics.timed("spool", "move"):
+            for name, result in zip(names, results):
+                source = os.path.join(self.__inbox, name)
+                if isinstance(result, AccountManagementException):
+                    target = _move(source, self.__rejected_dir, name)
+                    with open(target + REASON_SUFFIX, "w", encoding="utf-8") as f:
+                        f.write(result.message + "\n")
+                else:
+                    _move(source, self.__done_dir, name)
+                    self.__accepted += 1
+                self.__files += 1
+
+
+def _read_deposit_file(path):
+    """Returns the data of a deposit file, the AccountManagementException
+    rejecting it if it is not valid JSON or cannot be read, or _GONE"""
+    try:
+        with metrics.timed("spool", "read"), open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            if metrics.enabled():
+                metrics.increment(metrics.BYTES_READ, os.fstat(f.fileno()).st_size,
+                                  file="Deposit input")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return AccountManagementException("The file is not in JSON format.")
+    except FileNotFoundError:
+        return _GONE
+    except OSError:
+        return AccountManagementException("The file cannot be read.")
+    return data
+
+
+def _move(source, directory, name):
+    """Moves source into directory as name, or name with a number if it is taken,
+    and returns its new path"""
+    root, suffix = os.path.splitext(name)
+    target = os.path.join(directory, name)
+    number = 1
+    while os.path.exists(target):
+        target = os.path.join(directory, f"{root}.{number}{suffix}")
+        number += 1
+    os.replace(source, target)
+    return target
+
+
+def main(argv=None):
+    """Ingests the deposit files of an inbox, once or until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("inbox", help="directory the deposit files are dropped into")
+    parser.add_argument("--done", help="directory of the processed files")
+    parser.add_argument("--rejected", help="directory of the rejected files")
+    parser.add_argument("--workers", type=int, default=4, help="reading threads")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="files saved with a single write")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--once", action="store_true",
+                        help="process the waiting files and exit")
+    args = parser.parse_args(argv)
+
+    spool = DepositSpool(args.inbox, args.done, args.rejected, workers=args.workers,
+                         batch_size=args.batch_size, poll_interval=args.poll_interval)
+    try:
+        if args.once:
+            spool.process_once()
+        else:
+            spool.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        spool.close()
+    stats = spool.stats()
+    print(f"{stats['files']} files ({stats['accepted']} accepted, {stats['rejected']} "
+          f"rejected) in {stats['seconds']:.3f} s: {stats['files_per_sec']:.1f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Command line tool writing the columnar copy of a transactions file"""
+import argparse
+import os
+from uc3m_money.columnar_store import export_transactions
+from uc3m_money.storage import DEFAULT_DATA_DIR, JsonStorage
+
+
+def main(argv=None):
+    """Exports the transactions file given in the command line"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", nargs="?",
+                        default=os.path.join(DEFAULT_DATA_DIR, JsonStorage.TRANSACTIONS_FILE),
+                        help="transactions file, src/main/transactions.json by default")
+    parser.add_argument("target", nargs="?",
+                        help="columnar file, transactions.bin next to the source by default")
+    parser.add_argument("--with-dates", action="store_true",
+                        help="store the date of the transactions in a column")
+    args = parser.parse_args(argv)
+
+    target = args.target or os.path.join(os.path.dirname(os.path.abspath(args.source)),
+                                         JsonStorage.COLUMNAR_FILE)
+    count = export_transactions(args.source, target, with_dates=args.with_dates)
+    print(f"{args.source}: {count} transactions exported to {target}")
+
+
+if __name__ == "__main__":
+    main()
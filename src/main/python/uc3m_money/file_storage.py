@@ -0,0 +1,88 @@
+"""Locked and crash-safe writes of the JSON data files shared by several processes"""
+import contextlib
+import json
+import os
+import tempfile
+from uc3m_money.json_stream import append_json_array, rollback_json_array
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    import msvcrt  # pylint: disable=import-error
+
+    def _lock(lock_file):
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(lock_file):
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    def _lock(lock_file):
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(lock_file):
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def file_lock(path: str):
+    """
+    Holds an exclusive advisory lock associated to a data file.
+
+    The lock is taken on a sidecar 'path.lock' file, so it survives the data file
+    being replaced. Other processes (and other open() calls of this one) block
+    until it is released.
+    """
+    with open(path + ".lock", "a+b") as lock_file:
+        _lock(lock_file)
+        try:
+            yield
+        finally:
+            _unlock(lock_file)
+
+
+def atomic_write_json(path: str, data, indent=4):
+    """
+    Replaces a file with the JSON dump of data.
+
+    The data is written and fsync'ed to a temporary file of the same directory
+    which is then moved over path with os.replace(), so readers and crashes only
+    ever see the old or the new content, never a truncated file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def append_records(path: str, records, file_label: str = "Data"):
+    """
+    Appends records to a JSON array file under its lock.
+
+    The file is created if it does not exist. Appends are done in place and
+    protected by a rollback journal ('path.journal'): an append interrupted by a
+    crash is undone by the next writer, instead of leaving a truncated file.
+
+    Raises:
+        AccountManagementException: If the existing file does not hold a JSON array.
+            The file is never overwritten in that case.
+    """
+    records = list(records)
+    if not records:
+        return
+    with file_lock(path):
+        journal_path = path + ".journal"
+        rollback_json_array(path, journal_path)
+        if not os.path.exists(path):
+            atomic_write_json(path, records)
+            return
+        append_json_array(path, records, file_label, journal_path)
@@ -0,0 +1,118 @@
+"""Group commit of records submitted by concurrent callers"""
+import threading
+import time
+from uc3m_money.account_management_exception import AccountManagementException
+
+
+class GroupCommitWriter:
+    # the settings, the queue shared with the writer thread and its counters
+    # pylint: disable=too-many-instance-attributes
+    """
+    Class that queues records from concurrent callers and commits them together.
+
+    A background thread takes the queued records once max_batch of them are
+    waiting or max_delay seconds after the first one arrived, and hands them to
+    commit_batch in a single call (so a single write and fsync). Each caller of
+    submit() is blocked until the batch holding its record has been committed.
+    """
+
+    def __init__(self, commit_batch, max_batch: int = 64, max_delay: float = 0.002):
+        """
+        Args:
+            commit_batch (callable): Receives a list of records, makes them durable
+                and returns one result per record, in order. A result that is an
+                exception is raised to the caller of that record. If commit_batch
+                raises, every caller of the batch gets the exception.
+            max_batch (int): Maximum number of records per commit.
+            max_delay (float): Seconds to wait for more records before committing.
+        """
+        if max_batch < 1:
+            raise AccountManagementException("max_batch must be >= 1")
+        self.__commit_batch = commit_batch
+        self.__max_batch = max_batch
+        self.__max_delay = max_delay
+        self.__condition = threading.Condition()
+        self.__queue = []
+        self.__closed = False
+        self.__batches = 0
+        self.__thread = threading.Thread(target=self.__run, name="group-commit", daemon=True)
+        self.__thread.start()
+
+    @property
+    def batches(self):
+        """Number of commits done so far"""
+        return self.__batches
+
+    def submit(self, record):
+        """
+        Queues a record and waits until it is committed.
+
+        Returns:
+            The result returned by commit_batch for this record.
+
+        Raises:
+            Exception: The exception commit_batch raised or returned for the record.
+        """
+        pending = _PendingRecord(record)
+        with self.__condition:
+            if self.__closed:
+                raise AccountManagementException("The writer is closed")
+            self.__queue.append(pending)
+            self.__condition.notify_all()
+        return pending.wait()
+
+    def close(self):
+        """Commits the queued records and stops the background thread"""
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        self.__thread.join()
+
+    def __run(self):
+        while True:
+            batch = self.__next_batch()
+            if not batch:
+                return
+            self.__batches += 1
+            try:
+                results = self.__commit_batch([pending.record for pending in batch])
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                results = [exc] * len(batch)
+            for pending, result in zip(batch, results):
+                pending.set(result)
+
+    def __next_batch(self):
+        """Waits for a full batch, the delay to expire or the writer to close"""
+        with self.__condition:
+            while not self.__queue and not self.__closed:
+                self.__condition.wait()
+            deadline = time.monotonic() + self.__max_delay
+            while len(self.__queue) < self.__max_batch and not self.__closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.__condition.wait(remaining)
+            batch = self.__queue[:self.__max_batch]
+            del self.__queue[:self.__max_batch]
+            return batch
+
+
+class _PendingRecord:
+    """A submitted record waiting for its commit"""
+
+    def __init__(self, record):
+        self.record = record
+        self.__result = None
+        self.__done = threading.Event()
+
+    def set(self, result):
+        """Stores the result of the commit and wakes up the caller"""
+        self.__result = result
+        self.__done.set()
+
+    def wait(self):
+        """Waits for the commit, returning its result or raising its exception"""
+        self.__done.wait()
+        if isinstance(self.__result, Exception):
+            raise self.__result
+        return self.__result
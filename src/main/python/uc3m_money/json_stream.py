@@ -0,0 +1,266 @@
+"""Incremental reading and appending of files holding a JSON array"""
+import codecs
+import json
+import os
+import re
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money import metrics
+
+CHUNK_SIZE = 64 * 1024
+# bytes kept from right before a stored offset to detect rewritten files
+CHECKPOINT_LENGTH = 64
+BLANK = re.compile(r"[ \t\r\n]*")
+
+# parser states of iter_json_array
+_START, _FIRST, _ELEMENT, _AFTER_ELEMENT = range(4)
+
+
+def iter_json_array(path: str, offset: int = 0, file_label: str = "Data",
+                    chunk_size: int = CHUNK_SIZE):
+    """
+    Yields the elements of a JSON array file one at a time.
+
+    The file is read in chunks of chunk_size bytes, so memory usage is bounded by
+    the size of the biggest element rather than by the size of the file.
+
+    Args:
+        path (str): Path of the file containing the JSON array.
+        offset (int): 0 to read the whole array, or the byte position right after
+            an element (as yielded by a previous call) to resume reading there.
+        file_label (str): Name of the file used in the exception messages.
+        chunk_size (int): Number of bytes read at a time.
+
+    Yields:
+        tuple: (end_offset, element), where end_offset is the byte position right
+        after the element.
+
+    Raises:
+        AccountManagementException: If the file is empty, corrupted or does not
+        contain a JSON array.
+    """
+    # the parser state and the read buffer stay in locals, which is what keeps
+    # this per-element loop fast
+    # pylint: disable=too-many-locals
+    decode = json.JSONDecoder().raw_decode
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    # byte offset of buffer[0]; while the buffer is ASCII, chars are bytes
+    base = offset
+    is_ascii = True
+    eof = False
+    state = _START if offset == 0 else _AFTER_ELEMENT
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            position = BLANK.match(buffer, position).end()
+            if position < len(buffer):
+                char = buffer[position]
+                if state == _START:
+                    if char != "[":
+                        raise AccountManagementException(f"{file_label} file format is invalid")
+                    position += 1
+                    state = _FIRST
+                    continue
+                if char == "]" and state != _ELEMENT:
+                    return
+                if state == _AFTER_ELEMENT:
+                    if char != ",":
+                        raise AccountManagementException(
+                            f"{file_label} file is empty or corrupted")
+                    position += 1
+                    state = _ELEMENT
+                    continue
+                try:
+                    element, end = decode(buffer, position)
+                    # a value ending with the buffer may continue in the next chunk
+                    if end < len(buffer) or eof:
+                        position = end
+                        state = _AFTER_ELEMENT
+                        yield (base + end if is_ascii
+                               else base + len(buffer[:end].encode("utf-8"))), element
+                        continue
+                except json.JSONDecodeError as exc:
+                    if eof:
+                        raise AccountManagementException(
+                            f"{file_label} file is empty or corrupted") from exc
+            if eof:
+                raise AccountManagementException(f"{file_label} file is empty or corrupted")
+            # read one more chunk, dropping the consumed part of the buffer
+            base += position if is_ascii else len(buffer[:position].encode("utf-8"))
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + text_decoder.decode(chunk, final=eof)
+            position = 0
+            is_ascii = buffer.isascii()
+
+
+def append_json_array(path: str, records, file_label: str = "Data", journal_path: str = None):
+    """
+    Appends records to a file holding a JSON array without loading it.
+
+    Only the end of the file is read: the closing bracket is overwritten with the
+    new elements, formatted as json.dump(..., indent=4) would.
+
+    If journal_path is given, the bytes about to be overwritten are saved there
+    (and fsync'ed) before writing, and the journal is removed once the append is
+    on disk, so rollback_json_array() can undo an interrupted append.
+
+    Raises:
+        AccountManagementException: If the file does not hold a JSON array.
+    """
+    records = list(records)
+    if not records:
+        return
+    with open(path, "rb+") as f:
+        first = _first_token(f)
+        if first is None:
+            raise AccountManagementException(f"{file_label} file is empty or corrupted")
+        if first != b"[":
+            raise AccountManagementException(f"{file_label} file format is invalid")
+        size = f.seek(0, os.SEEK_END)
+        closing, previous = _last_two_tokens(f, size)
+        if closing[1] != b"]" or closing[0] == 0:
+            raise AccountManagementException(f"{file_label} file is empty or corrupted")
+        body = ",\n".join(_indented(record) for record in records)
+        separator = "\n" if previous[1] == b"[" else ",\n"
+        cut = previous[0] + 1
+        if journal_path:
+            f.seek(cut)
+            with open(journal_path, "w", encoding="utf-8") as journal:
+                json.dump({"offset": cut, "tail": f.read().hex()}, journal)
+                journal.flush()
+                os.fsync(journal.fileno())
+        f.seek(cut)
+        f.truncate()
+        written = f.write((separator + body + "\n]").encode("utf-8"))
+        if journal_path:
+            f.flush()
+            os.fsync(f.fileno())
+    if journal_path:
+        os.remove(journal_path)
+    metrics.increment(metrics.BYTES_WRITTEN, written, file=file_label)
+
+
+def rewrite_json_array_tail(path: str, offset: int, records, journal_path: str = None,
+                            file_label: str = "Data"):
+    """
+    Replaces the elements of a JSON array file that follow offset with records.
+
+    Args:
+        path (str): Path of the file containing the JSON array.
+        offset (int): 0 to replace every element, or the byte position right after
+            an element (as yielded by iter_json_array()) to keep the elements up to it.
+        records (list): The new elements, formatted as json.dump(..., indent=4) would.
+        journal_path (str): If given, the replaced bytes are saved there first, so
+            rollback_json_array() can undo an interrupted rewrite.
+        file_label (str): Name of the file in the metrics.
+    """
+    records = list(records)
+    body = ",\n".join(_indented(record) for record in records)
+    if offset == 0:
+        text = "[\n" + body + "\n]" if records else "[]"
+    else:
+        text = (",\n" + body if records else "") + "\n]"
+    with open(path, "rb+") as f:
+        if journal_path:
+            f.seek(offset)
+            with open(journal_path, "w", encoding="utf-8") as journal:
+                json.dump({"offset": offset, "tail": f.read().hex()}, journal)
+                journal.flush()
+                os.fsync(journal.fileno())
+        f.seek(offset)
+        f.truncate()
+        written = f.write(text.encode("utf-8"))
+        if journal_path:
+            f.flush()
+            os.fsync(f.fileno())
+    if journal_path:
+        os.remove(journal_path)
+    metrics.increment(metrics.BYTES_WRITTEN, written, file=file_label)
+
+
+def rollback_json_array(path: str, journal_path: str):
+    """
+    Undoes an append_json_array() or rewrite_json_array_tail() call interrupted
+    before removing its journal.
+
+    Returns:
+        bool: True if an interrupted append was rolled back.
+    """
+    if not os.path.exists(journal_path):
+        return False
+    try:
+        with open(journal_path, "r", encoding="utf-8") as journal:
+            entry = json.load(journal)
+        offset, tail = entry["offset"], bytes.fromhex(entry["tail"])
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        # the journal itself was torn, so the data file was not touched yet
+        os.remove(journal_path)
+        return False
+    with open(path, "rb+") as f:
+        f.seek(offset)
+        f.truncate()
+        f.write(tail)
+        f.flush()
+        os.fsync(f.fileno())
+    os.remove(journal_path)
+    return True
+
+
+def read_checkpoint(path: str, offset: int):
+    """
+    Returns the bytes right before an offset in a file.
+
+    Readers resuming from a stored offset keep them as a checkpoint: if they
+    are not the same on the next run, the file was rewritten and the offset
+    is meaningless.
+
+    Returns:
+        bytes: The CHECKPOINT_LENGTH bytes before offset (fewer near the start
+        of the file), or None if the file is missing or shorter than offset.
+    """
+    try:
+        with open(path, "rb") as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                return None
+            start = max(0, offset - CHECKPOINT_LENGTH)
+            f.seek(start)
+            return f.read(offset - start)
+    except OSError:
+        return None
+
+
+def _indented(record):
+    """Formats an element of an array dumped with indent=4"""
+    return "\n".join("    " + line for line in json.dumps(record, indent=4).split("\n"))
+
+
+def _first_token(f):
+    """Returns the first non-whitespace byte of the file"""
+    f.seek(0)
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            return None
+        stripped = chunk.lstrip()
+        if stripped:
+            return stripped[:1]
+
+
+def _last_two_tokens(f, size):
+    """Returns (position, byte) of the last two non-whitespace bytes of the file"""
+    found = []
+    position = size
+    while position > 0 and len(found) < 2:
+        step = min(CHUNK_SIZE, position)
+        position -= step
+        f.seek(position)
+        chunk = f.read(step)
+        for index in range(len(chunk) - 1, -1, -1):
+            if chunk[index:index + 1] not in b" \t\r\n":
+                found.append((position + index, chunk[index:index + 1]))
+                if len(found) == 2:
+                    break
+    found.extend([None] * (2 - len(found)))
+    return found[0], found[1]
@@ -0,0 +1,203 @@
+"""Opt-in instrumentation of the hot paths: stage timers and counters"""
+import os
+import threading
+import time
+
+METRICS_VARIABLE = "UC3M_MONEY_METRICS"
+PREFIX = "uc3m_money_"
+
+# names of the metrics recorded by the package
+STAGE_SECONDS = "stage_seconds"
+RECORDS_SCANNED = "records_scanned_total"
+RECORDS_WRITTEN = "records_written_total"
+BYTES_READ = "bytes_read_total"
+BYTES_WRITTEN = "bytes_written_total"
+DUPLICATES = "duplicates_total"
+VALIDATION_FAILURES = "validation_failures_total"
+
+
+class MetricsSink:
+    """
+    Class representing a destination of the metrics.
+
+    Labels are given as a tuple of sorted (name, value) pairs.
+    """
+
+    def increment(self, name: str, value, labels: tuple):
+        """Adds value to a counter"""
+        raise NotImplementedError
+
+    def observe(self, name: str, seconds: float, labels: tuple):
+        """Records the duration of a stage"""
+        raise NotImplementedError
+
+
+class MetricsRegistry(MetricsSink):
+    """
+    Class representing a thread-safe in-memory sink.
+
+    Counters are summed and durations are kept as summaries (count and sum),
+    which to_prometheus() renders in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.__counters = {}
+        self.__summaries = {}
+        self.__lock = threading.Lock()
+
+    def increment(self, name, value, labels):
+        with self.__lock:
+            key = (name, labels)
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels):
+        with self.__lock:
+            summary = self.__summaries.setdefault((name, labels), [0, 0.0])
+            summary[0] += 1
+            summary[1] += seconds
+
+    def counter(self, name: str, **labels):
+        """Returns the value of a counter, 0 if it was never incremented"""
+        return self.__counters.get((name, _labels(labels)), 0)
+
+    def summary(self, name: str, **labels):
+        """Returns (count, total seconds) of a timed stage"""
+        return tuple(self.__summaries.get((name, _labels(labels)), (0, 0.0)))
+
+    def clear(self):
+        """Resets every metric"""
+        with self.__lock:
+            self.__counters.clear()
+            self.__summaries.clear()
+
+    def to_prometheus(self):
+        """Returns the metrics in the Prometheus text exposition format"""
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            summaries = sorted((key, tuple(value)) for key, value in self.__summaries.items())
+        lines = []
+        previous = None
+        for (name, labels), value in counters:
+            if name != previous:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                previous = name
+            lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+        for (name, labels), (count, total) in summaries:
+            if name != previous:
+                lines.append(f"# TYPE {PREFIX}{name} summary")
+                previous = name
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {count}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {total!r}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_prometheus(self, path: str):
+        """Writes to_prometheus() to path atomically, e.g. for the textfile
+        collector of the Prometheus node exporter"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+class _StageTimer:
+    """Context manager recording the duration of a stage in a sink"""
+    __slots__ = ("__sink", "__labels", "__start")
+
+    def __init__(self, sink, labels):
+        self.__sink = sink
+        self.__labels = labels
+        self.__start = None
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.__sink.observe(STAGE_SECONDS, time.perf_counter() - self.__start, self.__labels)
+
+
+class _NullTimer:
+    """Context manager doing nothing, used while instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+_SINK = None
+
+
+def get_sink():
+    """Returns the sink receiving the metrics, or None if instrumentation is disabled"""
+    return _SINK
+
+
+def set_sink(sink):
+    """
+    Sends the metrics of the package to sink.
+
+    Args:
+        sink (MetricsSink): The new sink, or None to disable instrumentation.
+    """
+    global _SINK  # pylint: disable=global-statement
+    _SINK = sink
+
+
+def enable():
+    """Enables instrumentation into an in-memory registry (the current one if
+    there is one) and returns it"""
+    if not isinstance(_SINK, MetricsRegistry):
+        set_sink(MetricsRegistry())
+    return _SINK
+
+
+def enabled():
+    """Tells whether instrumentation is enabled; callers check it before computing
+    values only needed by the metrics"""
+    return _SINK is not None
+
+
+def increment(name: str, value=1, **labels):
+    """Adds value to a counter if instrumentation is enabled"""
+    sink = _SINK
+    if sink is not None:
+        sink.increment(name, value, _labels(labels))
+
+
+def timed(operation: str, stage: str):
+    """Returns a context manager timing a stage of an operation if
+    instrumentation is enabled, and doing nothing otherwise"""
+    sink = _SINK
+    if sink is None:
+        return _NULL_TIMER
+    return _StageTimer(sink, (("operation", operation), ("stage", stage)))
+
+
+def validation_failure(operation: str, exc):
+    """Counts a rejected input of an operation by reason: the reason of an
+    AccountManagementException, which never holds the input, so that the
+    number of series stays bounded"""
+    sink = _SINK
+    if sink is not None:
+        reason = getattr(exc, "reason", None) or type(exc).__name__
+        sink.increment(VALIDATION_FAILURES, 1, (("operation", operation), ("reason", reason)))
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+               for _, value in labels)
+    return "{" + ",".join(f"{name}=\"{value}\"" for (name, _), value in zip(labels, escaped)) + "}"
+
+
+if os.environ.get(METRICS_VARIABLE, "") not in ("", "0"):
+    enable()
@@ -0,0 +1,158 @@
+"""Parallel summation of transaction files split into byte-range chunks"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.amount_cents import amount_to_cents, cents_to_float
+
+CHUNK_SIZE = 8 * 1024 * 1024
+# bytes read at a time while looking for a chunk boundary
+SCAN_SIZE = 64 * 1024
+
+
+def sum_transactions(paths, workers: int = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Sums the amounts of every IBAN over one or more transaction files.
+
+    Each file is split into byte ranges of about chunk_size bytes that start at
+    an element of its JSON array; the ranges are summed in worker processes and
+    the partial sums are merged. Only files written with one element per line
+    (as json.dump(..., indent=N) does) can be split, other files are summed as a
+    single chunk.
+
+    Args:
+        paths (iterable): Paths of JSON array transaction files (e.g. shards).
+        workers (int): Number of worker processes; os.cpu_count() by default.
+            With 1 worker (or a single chunk) the sum runs in this process.
+        chunk_size (int): Approximate size in bytes of the ranges.
+
+    Returns:
+        tuple: (cents, invalid): IBAN -> summed cents, and the set of IBANs with
+        a transaction whose amount is not a number.
+
+    Raises:
+        AccountManagementException: If a file is missing, empty or corrupted.
+    """
+    chunks = []
+    for path in paths:
+        if not os.path.exists(path):
+            raise AccountManagementException("Transactions file not found")
+        ranges = _split(path, chunk_size)
+        chunks.extend((path, start, end, index == len(ranges) - 1)
+                      for index, (start, end) in enumerate(ranges))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        partials = [_sum_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(min(workers, len(chunks))) as pool:
+            partials = list(pool.map(_sum_chunk, *zip(*chunks)))
+
+    cents, invalid = {}, set()
+    for partial_cents, partial_invalid in partials:
+        for iban, amount in partial_cents.items():
+            cents[iban] = cents.get(iban, 0) + amount
+        invalid.update(partial_invalid)
+    return cents, invalid
+
+
+def recompute_balances(paths, ibans=None, workers: int = None):
+    """
+    Sums the transactions of one or more files with sum_transactions().
+
+    Args:
+        paths (iterable): Paths of JSON array transaction files (e.g. shards).
+        ibans (iterable): IBANs whose balance is returned; all of them if None.
+        workers (int): Number of worker processes, shared by all the files.
+
+    Returns:
+        dict: IBAN -> balance for the requested IBANs that have transactions.
+
+    Raises:
+        AccountManagementException: If a file is missing or corrupted, or a
+        requested IBAN has an invalid amount.
+    """
+    cents, invalid = sum_transactions(paths, workers)
+    if ibans is None:
+        ibans = list(cents)
+    for iban in ibans:
+        if iban in invalid:
+            raise AccountManagementException("Amount format in transactions file is invalid")
+    return {iban: cents_to_float(cents[iban]) for iban in ibans if iban in cents}
+
+
+def _split(path, chunk_size):
+    """Returns the (start, end) byte ranges of a JSON array file; every range but
+    the first starts at the line of an element"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(SCAN_SIZE)
+        stripped = head.lstrip()
+        if not stripped:
+            raise AccountManagementException("Transactions file is empty or corrupted")
+        if stripped[:1] != b"[":
+            raise AccountManagementException("Transactions file format is invalid")
+        start = len(head) - len(stripped) + 1
+        # elements dumped with indent=N start with a line of exactly N spaces and "{";
+        # JSON strings cannot hold newlines, so such lines never fall inside a value
+        after_bracket = stripped[1:]
+        blank = after_bracket[:len(after_bracket) - len(after_bracket.lstrip())]
+        indent = blank[blank.rfind(b"\n") + 1:]
+        if b"\n" not in blank or not indent \
+                or after_bracket[len(blank):len(blank) + 1] != b"{":
+            return [(start, size)]
+        marker = b"\n" + indent + b"{"
+        boundaries = [start]
+        target = start + chunk_size
+        while target < size:
+            boundary = _next_marker(f, target, marker)
+            if boundary is None:
+                break
+            boundaries.append(boundary)
+            target = boundary + chunk_size
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _next_marker(f, position, marker):
+    """Returns the position right after the first newline of marker found from
+    position on, or None"""
+    f.seek(position)
+    carry = b""
+    while True:
+        block = f.read(SCAN_SIZE)
+        if not block:
+            return None
+        data = carry + block
+        found = data.find(marker)
+        if found >= 0:
+            return position - len(carry) + found + 1
+        carry = data[-(len(marker) - 1):]
+        position += len(block)
+
+
+def _sum_chunk(path, start, end, last):
+    """Sums a byte range of a transaction file; runs in the worker processes"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8").strip()
+    if last:
+        if not text.endswith("]"):
+            raise AccountManagementException("Transactions file is empty or corrupted")
+        text = text[:-1].rstrip()
+    text = text[:-1] if text.endswith(",") else text
+    try:
+        transactions = json.loads("[" + text + "]")
+    except json.JSONDecodeError as exc:
+        raise AccountManagementException("Transactions file is empty or corrupted") from exc
+
+    cents, invalid = {}, set()
+    for transaction in transactions:
+        if not isinstance(transaction, dict) or transaction.get("IBAN") is None:
+            continue
+        iban = transaction["IBAN"]
+        try:
+            cents[iban] = cents.get(iban, 0) + amount_to_cents(transaction.get("amount"))
+        except (TypeError, ValueError, OverflowError):
+            invalid.add(iban)
+            cents.setdefault(iban, 0)
+    return cents, invalid
@@ -0,0 +1,248 @@
+"""Range and per-IBAN queries over the stored deposits and transfers"""
+import json
+import math
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.file_storage import file_lock
+from uc3m_money.json_stream import iter_json_array, read_checkpoint, rollback_json_array
+from uc3m_money.sqlite_transaction import write_transaction
+from uc3m_money.storage import JsonStorage, get_storage
+
+# bytes read to parse a single deposit from the middle of the array
+RECORD_CHUNK_SIZE = 4096
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS transfers "
+    "(position INTEGER PRIMARY KEY, from_iban TEXT, to_iban TEXT, transfer_date TEXT)",
+    "CREATE INDEX IF NOT EXISTS transfers_from ON transfers (from_iban, transfer_date)",
+    "CREATE INDEX IF NOT EXISTS transfers_to ON transfers (to_iban, transfer_date)",
+    "CREATE INDEX IF NOT EXISTS transfers_date ON transfers (transfer_date)",
+    "CREATE TABLE IF NOT EXISTS deposits "
+    "(position INTEGER PRIMARY KEY, to_iban TEXT, deposit_date REAL)",
+    "CREATE INDEX IF NOT EXISTS deposits_to ON deposits (to_iban, deposit_date)",
+    "CREATE INDEX IF NOT EXISTS deposits_date ON deposits (deposit_date)",
+    "CREATE TABLE IF NOT EXISTS sources "
+    "(name TEXT PRIMARY KEY, byte_offset INTEGER, checkpoint TEXT)",
+)
+
+
+class RecordQuery:
+    """
+    Class answering queries over the deposits and transfers of a JsonStorage.
+
+    Secondary indexes on from_iban, to_iban and transfer_date of the transfers
+    and on to_iban and deposit_date of the deposits are kept in a SQLite file
+    ('records.idx') next to the data files. Each one maps the indexed fields to
+    the byte position of the record in its file. The index is built on the
+    first query and caught up with the records appended since then before
+    every query. If an indexed file was rewritten, its index is rebuilt.
+    Queries are B-tree lookups; their results are read from the data files
+    and yielded one at a time, in the order they were stored.
+    """
+
+    def __init__(self, storage: JsonStorage = None, index_path: str = None):
+        """
+        Args:
+            storage (JsonStorage): Storage whose files are queried; the one in use
+                by default.
+            index_path (str): Path of the index file; records.idx in the data
+                directory of the storage by default.
+
+        Raises:
+            AccountManagementException: If the storage is not a JsonStorage.
+        """
+        storage = storage or get_storage()
+        if not isinstance(storage, JsonStorage):
+            raise AccountManagementException("Queries need the JSON storage backend")
+        self.__deposits_path = storage.path(JsonStorage.DEPOSITS_FILE)
+        self.__log = storage.transfer_log()
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(
+            index_path or storage.path(JsonStorage.QUERY_INDEX),
+            isolation_level=None, check_same_thread=False)
+        for statement in _SCHEMA:
+            self.__connection.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def transfers(self, from_iban: str = None, to_iban: str = None, start=None, end=None):
+        """
+        Yields the stored transfers matching every given condition.
+
+        Args:
+            from_iban (str): Ordering account.
+            to_iban (str): Receiving account.
+            start (date or str): First transfer_date, as a date or "DD/MM/YYYY".
+            end (date or str): Last transfer_date (included).
+
+        Returns:
+            generator: Transfer dicts, in the order they were stored.
+        """
+        conditions = []
+        for column, value in (("from_iban", from_iban), ("to_iban", to_iban)):
+            if value is not None:
+                conditions.append((f"{column} = ?", value))
+        if start is not None:
+            conditions.append(("transfer_date >= ?", _transfer_date_bound(start)))
+        if end is not None:
+            conditions.append(("transfer_date <= ?", _transfer_date_bound(end)))
+        positions = self.__positions("transfers", conditions)
+        return self.__read_transfers(positions)
+
+    def deposits(self, to_iban: str = None, start=None, end=None):
+        """
+        Yields the stored deposits matching every given condition.
+
+        Args:
+            to_iban (str): Account the deposits were made into.
+            start (date, datetime or float): First deposit_date; a date stands for
+                its first instant (UTC), a float for a POSIX timestamp.
+            end (date, datetime or float): Last deposit_date (included); a date
+                stands for the whole day.
+
+        Returns:
+            generator: Deposit dicts, in the order they were stored.
+        """
+        conditions = []
+        if to_iban is not None:
+            conditions.append(("to_iban = ?", to_iban))
+        if start is not None:
+            conditions.append(("deposit_date >= ?", _timestamp(start)))
+        if end is not None:
+            if isinstance(end, date) and not isinstance(end, datetime):
+                # the last instant before the next day
+                bound = math.nextafter(_timestamp(end + timedelta(days=1)), -math.inf)
+            else:
+                bound = _timestamp(end)
+            conditions.append(("deposit_date <= ?", bound))
+        positions = self.__positions("deposits", conditions)
+        return self.__read_deposits(positions)
+
+    def refresh(self):
+        """Indexes the records appended to the data files since the last query"""
+        with write_transaction(self.__connection, self.__lock):
+            self.__refresh_transfers()
+            self.__refresh_deposits()
+
+    def close(self):
+        """Closes the index file"""
+        with self.__lock:
+            self.__connection.close()
+
+    def __positions(self, table, conditions):
+        """Returns the positions of the records of table matching the conditions;
+        they are collected before reading, so queries never see a half-caught-up index"""
+        where = " AND ".join(condition for condition, _ in conditions) or "1"
+        with self.__lock:
+            self.refresh()
+            return [row[0] for row in self.__connection.execute(
+                f"SELECT position FROM {table} WHERE {where} ORDER BY position",
+                [value for _, value in conditions])]
+
+    def __read_transfers(self, positions):
+        if not positions:
+            return
+        with open(self.__log.path, "rb") as f:
+            for position in positions:
+                f.seek(position)
+                line = f.readline()
+                while line and not line.strip():
+                    # blank lines are skipped by the log too
+                    line = f.readline()
+                if not line:
+                    # the log was replaced by a shorter one since the positions were read
+                    return
+                yield json.loads(line)
+
+    def __read_deposits(self, positions):
+        for position in positions:
+            for _, record in iter_json_array(self.__deposits_path, position, "Deposits",
+                                             RECORD_CHUNK_SIZE):
+                yield record
+                break
+
+    def __refresh_transfers(self):
+        # the log is append-only: no lock is needed to read its complete lines
+        start = self.__start_offset("transfers", self.__log.path)
+        rows = []
+        position = end = start
+        # read_from yields the offset after each record: the position of the next one
+        for end, record in self.__log.read_from(start):
+            if isinstance(record, dict):
+                rows.append((position, record.get("from_iban"), record.get("to_iban"),
+                             _iso_transfer_date(record.get("transfer_date"))))
+            position = end
+        self.__connection.executemany("INSERT INTO transfers VALUES (?, ?, ?, ?)", rows)
+        self.__save_offset("transfers", self.__log.path, start, end)
+
+    def __refresh_deposits(self):
+        if not os.path.exists(self.__deposits_path):
+            self.__start_offset("deposits", self.__deposits_path)
+            return
+        # deposits.json is appended in place: read it as its writers leave it
+        with file_lock(self.__deposits_path):
+            rollback_json_array(self.__deposits_path, self.__deposits_path + ".journal")
+            start = self.__start_offset("deposits", self.__deposits_path)
+            rows = []
+            position = end = start
+            for end, record in iter_json_array(self.__deposits_path, start, "Deposits"):
+                if isinstance(record, dict):
+                    deposit_date = record.get("deposit_date")
+                    rows.append((position, record.get("to_iban"),
+                                 deposit_date if isinstance(deposit_date, (int, float)) else None))
+                position = end
+            self.__connection.executemany("INSERT INTO deposits VALUES (?, ?, ?)", rows)
+            self.__save_offset("deposits", self.__deposits_path, start, end)
+
+    def __start_offset(self, table, path):
+        """Returns the offset indexing of path resumes from, after emptying the
+        index of table if the indexed part of the file changed"""
+        row = self.__connection.execute(
+            "SELECT byte_offset, checkpoint FROM sources WHERE name = ?", (table,)).fetchone()
+        if row is not None:
+            offset, checkpoint = row[0], bytes.fromhex(row[1])
+            if read_checkpoint(path, offset) == checkpoint:
+                return offset
+        self.__connection.execute(f"DELETE FROM {table}")
+        self.__connection.execute("DELETE FROM sources WHERE name = ?", (table,))
+        return 0
+
+    def __save_offset(self, table, path, start, end):
+        if end == start:
+            return
+        self.__connection.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)",
+                                  (table, end, (read_checkpoint(path, end) or b"").hex()))
+
+
+def _iso_transfer_date(value):
+    """Returns a "DD/MM/YYYY" transfer date as "YYYY-MM-DD", which sorts by date"""
+    if not isinstance(value, str) or len(value) != 10 or value[2] != "/" or value[5] != "/":
+        return None
+    return f"{value[6:]}-{value[3:5]}-{value[:2]}"
+
+
+def _transfer_date_bound(value):
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    bound = _iso_transfer_date(value)
+    if bound is None:
+        raise AccountManagementException("Invalid date format. Must be DD/MM/YYYY.")
+    return bound
+
+
+def _timestamp(value):
+    """Returns a date (its first instant, UTC), datetime or number as a POSIX timestamp"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime.combine(value, time(), tzinfo=timezone.utc).timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raise AccountManagementException("Deposit dates must be dates, datetimes or timestamps")
@@ -0,0 +1,131 @@
+"""Columnar containers for large collections of deposits and transfers"""
+import sys
+from array import array
+from uc3m_money.account_management_exception import AccountManagementException
+
+# kinds of column: repeated strings are stored once (interned), numbers in a
+# typed array and hex digests as raw bytes in a single bytearray
+SYMBOL = "symbol"
+TEXT = "text"
+FLOAT = "float"
+HEX_16 = "hex16"
+HEX_32 = "hex32"
+_HEX_WIDTHS = {HEX_16: 16, HEX_32: 32}
+
+
+class RecordColumns:
+    """
+    Class representing a collection of records stored field by field.
+
+    Every field of the records is kept in its own column instead of one dict
+    (or object) per record: amounts and timestamps take 8 bytes each in an
+    array, digests take their raw size in a bytearray and IBANs, types or
+    dates are interned, so the records of an account share a single string.
+    Records go in as dicts (or objects with to_json()) and come out as the
+    same dicts. Subclasses give the FIELDS as (name, kind) pairs.
+    """
+    FIELDS = ()
+
+    def __init__(self, records=()):
+        self.__columns = {name: _new_column(kind) for name, kind in self.FIELDS}
+        self.__count = 0
+        self.extend(records)
+
+    def __len__(self):
+        return self.__count
+
+    def append(self, record):
+        """
+        Adds a record, given as a dict or an object with to_json().
+
+        Raises:
+            AccountManagementException: If a field is missing or has a value that
+            does not fit its column. Nothing is added in that case.
+        """
+        if not isinstance(record, dict):
+            record = record.to_json()
+        try:
+            values = [_encode(kind, record[name]) for name, kind in self.FIELDS]
+        except (KeyError, TypeError, ValueError) as exc:
+            raise AccountManagementException(
+                f"The record does not fit the {type(self).__name__} columns") from exc
+        for (name, kind), value in zip(self.FIELDS, values):
+            if kind in _HEX_WIDTHS:
+                self.__columns[name] += value
+            else:
+                self.__columns[name].append(value)
+        self.__count += 1
+
+    def extend(self, records):
+        """Adds every record of an iterable"""
+        for record in records:
+            self.append(record)
+
+    def __getitem__(self, index):
+        """Returns the record at index as a dict"""
+        if index < 0:
+            index += self.__count
+        if not 0 <= index < self.__count:
+            raise IndexError("record index out of range")
+        return {name: self.__value(name, kind, index) for name, kind in self.FIELDS}
+
+    def __iter__(self):
+        for index in range(self.__count):
+            yield self[index]
+
+    def column(self, name: str):
+        """Returns the values of a field as a list (str and hex fields) or an array
+        (numeric fields); arrays are the stored column, not a copy"""
+        kind = dict(self.FIELDS)[name]
+        if kind in _HEX_WIDTHS:
+            return [self.__value(name, kind, index) for index in range(self.__count)]
+        return self.__columns[name]
+
+    def __value(self, name, kind, index):
+        column = self.__columns[name]
+        width = _HEX_WIDTHS.get(kind)
+        if width is not None:
+            return column[index * width:(index + 1) * width].hex()
+        return column[index]
+
+
+class DepositColumns(RecordColumns):
+    """Class representing deposits, as stored in 'deposits.json', in columns"""
+    FIELDS = (("alg", SYMBOL), ("type", SYMBOL), ("to_iban", SYMBOL),
+              ("deposit_amount", FLOAT), ("deposit_date", FLOAT),
+              ("deposit_signature", HEX_32))
+
+
+class TransferColumns(RecordColumns):
+    """Class representing transfers, as stored in the transfer log, in columns"""
+    FIELDS = (("from_iban", SYMBOL), ("to_iban", SYMBOL), ("transfer_concept", TEXT),
+              ("transfer_type", SYMBOL), ("transfer_date", SYMBOL),
+              ("transfer_amount", FLOAT), ("time_stamp", FLOAT), ("transfer_code", HEX_16))
+
+
+def _new_column(kind):
+    if kind == FLOAT:
+        return array("d")
+    if kind in _HEX_WIDTHS:
+        return bytearray()
+    return []
+
+
+def _encode(kind, value):
+    """Returns value as stored in a column of kind, raising TypeError or ValueError
+    if it does not fit"""
+    if kind == FLOAT:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"expected a number, not {type(value).__name__}")
+        return float(value)
+    if not isinstance(value, str):
+        raise TypeError(f"expected a string, not {type(value).__name__}")
+    if kind == SYMBOL:
+        return sys.intern(value)
+    if kind == TEXT:
+        return value
+    digest = bytes.fromhex(value)
+    # bytes.hex() gives lowercase digits back, so uppercase ones would not round trip
+    if len(digest) != _HEX_WIDTHS[kind] or digest.hex() != value:
+        raise ValueError(f"expected {_HEX_WIDTHS[kind]} bytes in lowercase hex")
+    return digest
@@ -0,0 +1,207 @@
+"""Asyncio server exposing deposits, transfers and balances as JSON lines over TCP"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from uc3m_money import account_deposit, transfer_request as transfer_module
+from uc3m_money.account_balance import calculate_balance
+from uc3m_money.account_deposit import deposit_data_into_account
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.transfer_request import transfer_request
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8737
+# longest request line accepted
+MAX_LINE_LENGTH = 64 * 1024
+
+
+def _transfer(params):
+    return transfer_request(params["from_iban"], params["to_iban"], params["concept"],
+                            params["transfer_type"], params["date"], params["amount"])
+
+
+def _deposit(params):
+    return deposit_data_into_account(params)
+
+
+def _balance(params):
+    return calculate_balance(params["iban"])
+
+
+METHODS = {
+    "transfer_request": _transfer,
+    "deposit_into_account": _deposit,
+    "calculate_balance": _balance,
+}
+
+
+class MoneyServer:
+    # the limits given to __init__, plus the pool, semaphore and server they size
+    # pylint: disable=too-many-instance-attributes
+    """
+    Class representing a local server for the functions of the package.
+
+    Clients send one JSON request per line, {"id": ..., "method": ...,
+    "params": {...}}, and get one JSON line per request back, {"id": ...,
+    "result": ...} or {"id": ..., "error": "..."}. The methods are
+    transfer_request (params named like its arguments, with "concept", "date"
+    and "amount"), deposit_into_account (params {"IBAN", "AMOUNT"}, like the
+    input file) and calculate_balance (params {"iban"}).
+
+    Requests may be pipelined: a connection can send up to max_pipeline
+    requests without waiting, and their responses are written as they finish,
+    possibly out of order. The blocking storage calls run on a pool of
+    max_workers threads, and at most max_in_flight requests are processed at a
+    time; beyond those limits the server stops reading from the sockets, so
+    the clients are slowed down by TCP flow control instead of filling memory.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_workers: int = 8, max_in_flight: int = 256, max_pipeline: int = 32):
+        # pylint: disable=too-many-arguments
+        self.__host = host
+        self.__port = port
+        self.__max_workers = max_workers
+        self.__max_in_flight = max_in_flight
+        self.__max_pipeline = max_pipeline
+        self.__executor = None
+        self.__in_flight = None
+        self.__server = None
+
+    @property
+    def port(self):
+        """Port the server listens on, known once started when created with port 0"""
+        return self.__port
+
+    async def start(self):
+        """Starts listening for connections"""
+        self.__executor = ThreadPoolExecutor(self.__max_workers, thread_name_prefix="uc3m-money")
+        self.__in_flight = asyncio.Semaphore(self.__max_in_flight)
+        self.__server = await asyncio.start_server(self.__handle_connection, self.__host,
+                                                   self.__port, limit=MAX_LINE_LENGTH)
+        self.__port = self.__server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Starts the server if needed and serves until cancelled"""
+        if self.__server is None:
+            await self.start()
+        try:
+            await self.__server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stops accepting connections and waits for the running requests"""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+
+    async def __handle_connection(self, reader, writer):
+        pipeline = asyncio.Semaphore(self.__max_pipeline)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                # a full pipeline stops reading until a response is written
+                await pipeline.acquire()
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self.__respond(writer, write_lock, {"id": None,
+                                                              "error": "Request is too long"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    pipeline.release()
+                    continue
+                task = asyncio.create_task(self.__handle_request(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: pipeline.release())
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __handle_request(self, line, writer, write_lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise AccountManagementException("Request must be a JSON object")
+            request_id = request.get("id")
+            method = METHODS.get(request.get("method"))
+            if method is None:
+                raise AccountManagementException(f"Unknown method: {request.get('method')}")
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise AccountManagementException("Params must be a JSON object")
+            async with self.__in_flight:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.__executor, _call, method, params)
+            response = {"id": request_id, "result": result}
+        except json.JSONDecodeError:
+            response = {"id": None, "error": "Request is not in JSON format"}
+        except AccountManagementException as exc:
+            response = {"id": request_id, "error": str(exc)}
+        except Exception:  # pylint: disable=broad-exception-caught
+            # every request gets a response, whatever went wrong
+            response = {"id": request_id, "error": "Internal error"}
+        await self.__respond(writer, write_lock, response)
+
+    @staticmethod
+    async def __respond(writer, write_lock, response):
+        async with write_lock:
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+
+
+def _call(method, params):
+    """Runs a method on a worker thread"""
+    try:
+        return method(params)
+    except KeyError as exc:
+        raise AccountManagementException(f"Missing parameter: {exc.args[0]}") from exc
+
+
+def main(argv=None):
+    """Runs the server until interrupted"""
+    parser = argparse.ArgumentParser(description="uc3m_money JSON lines server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=8, help="storage threads")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--max-pipeline", type=int, default=32,
+                        help="requests a connection may send without waiting")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="write concurrent deposits and transfers in batches")
+    args = parser.parse_args(argv)
+
+    if args.group_commit:
+        account_deposit.start_group_commit()
+        transfer_module.start_group_commit()
+    server = MoneyServer(args.host, args.port, args.workers, args.max_in_flight,
+                         args.max_pipeline)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.group_commit:
+            account_deposit.stop_group_commit()
+            transfer_module.stop_group_commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Storage backend partitioning the records by a hash of their IBAN"""
+import json
+import os
+import zlib
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.file_storage import atomic_write_json, file_lock
+from uc3m_money.parallel_balance import recompute_balances
+from uc3m_money.storage import Storage, JsonStorage
+
+SHARDS_FILE = "shards.json"
+
+
+def shard_of(iban: str, count: int) -> int:
+    """Returns the shard (0 to count - 1) holding the records of an IBAN; the hash
+    is stable across processes, unlike hash()"""
+    return zlib.crc32(iban.encode("utf-8")) % count
+
+
+class ShardedStorage(Storage):
+    """
+    Class representing N storage backends, each holding the accounts whose IBAN
+    hashes to it.
+
+    Deposits are routed by to_iban, transactions and balances by their IBAN and
+    transfers by from_iban (which is part of the transfer_code, so duplicates
+    always meet in the same shard). Operations on one account only read and
+    lock the files of its shard.
+    """
+
+    def __init__(self, shards):
+        """
+        Args:
+            shards (list): The Storage of every shard, in shard order.
+        """
+        if not shards:
+            raise AccountManagementException("At least one shard is required")
+        self.__shards = list(shards)
+
+    @classmethod
+    def json_shards(cls, directory: str, count: int):
+        """
+        Opens (or creates) count JSON shards in directory/shard_<n>.
+
+        The number of shards is recorded in directory/shards.json: reopening
+        with another count would route accounts to the wrong shard, so it raises.
+        """
+        os.makedirs(directory, exist_ok=True)
+        shards_path = os.path.join(directory, SHARDS_FILE)
+        with file_lock(shards_path):
+            if os.path.exists(shards_path):
+                with open(shards_path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)["count"]
+                if stored != count:
+                    raise AccountManagementException(
+                        f"The storage has {stored} shards, not {count}")
+            else:
+                atomic_write_json(shards_path, {"count": count})
+            shards = []
+            for number in range(count):
+                shards.append(JsonStorage.create(os.path.join(directory, f"shard_{number:03d}")))
+        return cls(shards)
+
+    @property
+    def shards(self):
+        """Storage of every shard"""
+        return list(self.__shards)
+
+    def shard(self, iban: str):
+        """Returns the storage of the shard holding an IBAN"""
+        return self.__shards[shard_of(iban, len(self.__shards))]
+
+    def add_deposits(self, records):
+        for shard, shard_records in self.__route(records, "to_iban"):
+            shard.add_deposits(shard_records)
+
+    def add_transfers(self, records):
+        accepted_ids = set()
+        for shard, shard_records in self.__route(records, "from_iban"):
+            accepted_ids.update(id(record) for record in shard.add_transfers(shard_records))
+        return [record for record in records if id(record) in accepted_ids]
+
+    def add_transactions(self, records):
+        records = [record for record in records
+                   if isinstance(record, dict) and isinstance(record.get("IBAN"), str)]
+        for shard, shard_records in self.__route(records, "IBAN"):
+            shard.add_transactions(shard_records)
+
+    def transactions_version(self, iban: str):
+        return self.shard(iban).transactions_version(iban)
+
+    def balances(self, ibans=None):
+        return self.__per_shard(ibans, lambda shard, shard_ibans: shard.balances(shard_ibans))
+
+    def recompute_balances(self, ibans=None, workers: int = None):
+        if not all(isinstance(shard, JsonStorage) for shard in self.__shards):
+            return self.__per_shard(
+                ibans, lambda shard, shard_ibans: shard.recompute_balances(shard_ibans, workers))
+        # the files of the shards involved are summed by a single pool of workers
+        if ibans is None:
+            numbers = range(len(self.__shards))
+        else:
+            ibans = list(ibans)
+            numbers = sorted({shard_of(iban, len(self.__shards)) for iban in ibans})
+        paths = [self.__shards[number].path(JsonStorage.TRANSACTIONS_FILE) for number in numbers]
+        return recompute_balances(paths, ibans, workers)
+
+    def add_balances(self, entries):
+        for shard, shard_entries in self.__route(entries, "iban"):
+            shard.add_balances(shard_entries)
+
+    def close(self):
+        for shard in self.__shards:
+            shard.close()
+
+    def __route(self, records, key):
+        """Yields (shard, records of the shard) for the shards with records"""
+        groups = {}
+        for record in records:
+            groups.setdefault(shard_of(record[key], len(self.__shards)), []).append(record)
+        for number, shard_records in sorted(groups.items()):
+            yield self.__shards[number], shard_records
+
+    def __per_shard(self, ibans, query):
+        """Runs query(shard, ibans of the shard) on the shards involved and merges
+        the results; every shard is queried when ibans is None"""
+        balances = {}
+        if ibans is None:
+            for shard in self.__shards:
+                balances.update(query(shard, None))
+            return balances
+        groups = {}
+        for iban in ibans:
+            groups.setdefault(shard_of(iban, len(self.__shards)), []).append(iban)
+        for number, shard_ibans in sorted(groups.items()):
+            balances.update(query(self.__shards[number], shard_ibans))
+        return balances
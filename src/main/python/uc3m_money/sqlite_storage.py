@@ -0,0 +1,154 @@
+"""Storage backend keeping every record in a local SQLite database"""
+import json
+import sqlite3
+import threading
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.amount_cents import amount_to_cents, cents_to_float
+from uc3m_money.sqlite_transaction import write_transaction
+from uc3m_money.storage import Storage
+
+# bound parameters per query, below SQLite's historical limit of 999
+MAX_PARAMETERS = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deposits (
+    id INTEGER PRIMARY KEY,
+    to_iban TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    deposit_date REAL,
+    deposit_signature TEXT,
+    record TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS deposits_to_iban ON deposits (to_iban);
+CREATE TABLE IF NOT EXISTS transfers (
+    transfer_code TEXT PRIMARY KEY,
+    from_iban TEXT NOT NULL,
+    to_iban TEXT NOT NULL,
+    transfer_date TEXT,
+    amount_cents INTEGER NOT NULL,
+    record TEXT NOT NULL) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transfers_from_iban ON transfers (from_iban);
+CREATE INDEX IF NOT EXISTS transfers_to_iban ON transfers (to_iban);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    iban TEXT NOT NULL,
+    amount_cents INTEGER,
+    record TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS transactions_iban ON transactions (iban, amount_cents);
+CREATE TABLE IF NOT EXISTS balances (
+    id INTEGER PRIMARY KEY,
+    iban TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    date TEXT NOT NULL);
+CREATE UNIQUE INDEX IF NOT EXISTS balances_iban_date ON balances (iban, date);
+"""
+
+
+class SqliteStorage(Storage):
+    """
+    Class representing a SQLite database holding the records of the package.
+
+    The database runs in WAL mode so readers do not block the writer. Amounts
+    are stored as integer cents next to the original JSON record; a transaction
+    whose amount cannot be parsed is kept with a NULL amount, which makes the
+    balance of its IBAN fail like with the JSON files. An instance may be shared
+    by several threads.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the database file, created if it does not exist.
+        """
+        self.__path = path
+        self.__lock = threading.RLock()
+        self.__transactions_added = 0
+        self.__connection = sqlite3.connect(path, isolation_level=None,
+                                            check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.executescript(_SCHEMA)
+
+    @property
+    def path(self):
+        """Path of the database file"""
+        return self.__path
+
+    def add_deposits(self, records):
+        rows = [(record["to_iban"], round(record["deposit_amount"] * 100),
+                 record.get("deposit_date"), record.get("deposit_signature"),
+                 json.dumps(record)) for record in records]
+        with self.__transaction():
+            self.__connection.executemany(
+                "INSERT INTO deposits (to_iban, amount_cents, deposit_date, "
+                "deposit_signature, record) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def add_transfers(self, records):
+        accepted = []
+        with self.__transaction():
+            for record in records:
+                cursor = self.__connection.execute(
+                    "INSERT OR IGNORE INTO transfers (transfer_code, from_iban, to_iban, "
+                    "transfer_date, amount_cents, record) VALUES (?, ?, ?, ?, ?, ?)",
+                    (record["transfer_code"], record["from_iban"], record["to_iban"],
+                     record.get("transfer_date"), round(record["transfer_amount"] * 100),
+                     json.dumps(record)))
+                if cursor.rowcount:
+                    accepted.append(record)
+        return accepted
+
+    def add_transactions(self, records):
+        rows = [(record["IBAN"], _amount_cents(record.get("amount")), json.dumps(record))
+                for record in records
+                if isinstance(record, dict) and record.get("IBAN") is not None]
+        with self.__transaction():
+            self.__connection.executemany(
+                "INSERT INTO transactions (iban, amount_cents, record) VALUES (?, ?, ?)", rows)
+            self.__transactions_added += 1
+
+    def transactions_version(self, iban: str):
+        # data_version changes when another connection commits, the counter when
+        # this one adds transactions
+        with self.__lock:
+            data_version = self.__connection.execute("PRAGMA data_version").fetchone()[0]
+            return data_version, self.__transactions_added
+
+    def balances(self, ibans=None):
+        query = ("SELECT iban, SUM(amount_cents), COUNT(*) - COUNT(amount_cents) "
+                 "FROM transactions")
+        with self.__lock:
+            if ibans is None:
+                rows = self.__connection.execute(query + " GROUP BY iban").fetchall()
+            else:
+                ibans = list(dict.fromkeys(ibans))
+                rows = []
+                for start in range(0, len(ibans), MAX_PARAMETERS):
+                    chunk = ibans[start:start + MAX_PARAMETERS]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(self.__connection.execute(
+                        f"{query} WHERE iban IN ({placeholders}) GROUP BY iban", chunk))
+        if any(invalid for _, _, invalid in rows):
+            raise AccountManagementException("Amount format in transactions file is invalid")
+        return {iban: cents_to_float(cents or 0) for iban, cents, _ in rows}
+
+    def add_balances(self, entries):
+        rows = [(entry["iban"], round(entry["amount"] * 100), entry["date"])
+                for entry in entries]
+        with self.__transaction():
+            self.__connection.executemany(
+                "INSERT INTO balances (iban, amount_cents, date) VALUES (?, ?, ?) "
+                "ON CONFLICT (iban, date) DO UPDATE SET amount_cents = excluded.amount_cents",
+                rows)
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+    def __transaction(self):
+        """Runs a write transaction under the connection lock"""
+        return write_transaction(self.__connection, self.__lock)
+
+def _amount_cents(amount):
+    """Parses an amount of the transactions file into cents, None if it is invalid"""
+    try:
+        return amount_to_cents(amount)
+    except (TypeError, ValueError, OverflowError):
+        return None
@@ -0,0 +1,26 @@
+"""Write transactions on the SQLite connections shared by several threads"""
+import contextlib
+
+
+@contextlib.contextmanager
+def write_transaction(connection, lock):
+    """
+    Runs a write transaction on a connection opened with isolation_level=None.
+
+    The transaction takes the write lock of the database on BEGIN IMMEDIATE, so
+    the reads it starts with are not invalidated by another writer. It is
+    committed if the block succeeds and rolled back otherwise.
+
+    Args:
+        connection (sqlite3.Connection): Connection in autocommit mode.
+        lock (threading.RLock): Lock of the threads sharing the connection,
+            held during the whole transaction.
+    """
+    with lock:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
@@ -0,0 +1,305 @@
+"""Storage backends holding the deposits, transactions, balances and transfers"""
+import itertools
+import os
+import threading
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.balance_ledger import BalanceLedger
+from uc3m_money.balance_store import BalanceStore
+from uc3m_money.columnar_store import ColumnarTransactions
+from uc3m_money.file_storage import append_records, atomic_write_json
+from uc3m_money.json_stream import iter_json_array
+from uc3m_money.parallel_balance import recompute_balances
+from uc3m_money.transaction_log import TransactionLog
+from uc3m_money.transfer_index import TransferCodeIndex
+
+# environment variable selecting the backend: "json" (default), "sqlite[:<path>]"
+# or "sharded:<count>[:<directory>]"
+STORAGE_VARIABLE = "UC3M_MONEY_STORAGE"
+DEFAULT_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_DATABASE = "uc3m_money.db"
+DEFAULT_SHARDS_DIR = "shards"
+
+
+class Storage:
+    """
+    Class representing where the package reads and writes its records.
+
+    Deposits, transfers and balances are given as the dicts written by
+    AccountDeposit.to_json(), TransferRequest.to_json() and calculate_balance();
+    transactions as {"IBAN", "amount"} dicts like in 'transactions.json'.
+    """
+
+    def add_deposits(self, records):
+        """Stores deposit records with a single write"""
+        raise NotImplementedError
+
+    def add_transfers(self, records):
+        """
+        Stores, with a single write, the transfer records whose transfer_code is
+        not stored yet (neither before nor earlier in records).
+
+        Returns:
+            list: The records that were stored, in input order.
+        """
+        raise NotImplementedError
+
+    def add_transactions(self, records):
+        """Stores transaction records with a single write"""
+        raise NotImplementedError
+
+    def import_transactions(self, json_path: str, batch_size: int = 10000):
+        """
+        Copies the transactions of a 'transactions.json' file into the backend.
+
+        The file is streamed and stored with add_transactions(), batch_size
+        transactions at a time.
+
+        Raises:
+            AccountManagementException: If the file is empty or corrupted.
+        """
+        records = (record for _, record in iter_json_array(json_path, file_label="Transactions"))
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                return
+            self.add_transactions(batch)
+
+    def balances(self, ibans=None):
+        """
+        Returns the summed amount of the transactions of several IBANs.
+
+        Args:
+            ibans (iterable): IBANs to look up, or None for every IBAN.
+
+        Returns:
+            dict: IBAN -> balance (float) of the IBANs that have transactions.
+
+        Raises:
+            AccountManagementException: If the transactions are missing or corrupt,
+            or if any requested IBAN has a transaction with an invalid amount.
+        """
+        raise NotImplementedError
+
+    def transactions_version(self, iban: str):
+        """
+        Returns a value that changes whenever the transactions of an IBAN may have
+        changed, or None if the backend cannot tell (so nothing can be cached).
+        """
+        # pylint: disable=unused-argument
+        return None
+
+    def recompute_balances(self, ibans=None, workers: int = None):
+        """
+        Like balances(), but summing all the transactions again instead of relying
+        on incrementally maintained sums, using up to workers processes.
+        """
+        # pylint: disable=unused-argument
+        return self.balances(ibans)
+
+    def add_balances(self, entries):
+        """
+        Stores {"iban", "amount", "date"} balance entries with a single write,
+        keeping one entry per IBAN and date: an entry replaces the stored entry
+        of the same IBAN and date.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases the resources held by the backend"""
+
+
+class JsonStorage(Storage):
+    """
+    Class representing the JSON files of the package.
+
+    Deposits, transactions and balances are JSON arrays appended in place under
+    a file lock; transfers live in a JSON Lines log indexed by transfer_code.
+    Balances are read from the columnar copy of the transactions while it is
+    current, and from the running ledger otherwise.
+    """
+    DEPOSITS_FILE = "deposits.json"
+    TRANSACTIONS_FILE = "transactions.json"
+    BALANCES_FILE = "balances.json"
+    LEDGER_FILE = "balance_ledger.json"
+    COLUMNAR_FILE = "transactions.bin"
+    TRANSFER_FILE = "past_transactions.json"
+    TRANSFER_LOG = "past_transactions.jsonl"
+    TRANSFER_INDEX = "past_transactions.idx"
+    QUERY_INDEX = "records.idx"
+
+    def __init__(self, data_dir: str = None, transfers_dir: str = None):
+        """
+        Args:
+            data_dir (str): Directory of the deposits, transactions and balances
+                files; src/main by default.
+            transfers_dir (str): Directory of the transfer files; data_dir if it is
+                given, or the package directory by default.
+        """
+        self.__data_dir = os.path.abspath(data_dir or DEFAULT_DATA_DIR)
+        if transfers_dir is None:
+            transfers_dir = data_dir or os.path.dirname(os.path.abspath(__file__))
+        self.__transfers_dir = os.path.abspath(transfers_dir)
+        self.__transfer_index = None
+        self.__ledger = None
+        self.__columnar = None
+        self.__columnar_key = None
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def create(cls, data_dir: str):
+        """Opens the storage of data_dir, creating the directory and empty
+        transactions and balances files if they do not exist"""
+        os.makedirs(data_dir, exist_ok=True)
+        for file_name in (cls.TRANSACTIONS_FILE, cls.BALANCES_FILE):
+            path = os.path.join(data_dir, file_name)
+            if not os.path.exists(path):
+                atomic_write_json(path, [])
+        return cls(data_dir)
+
+    @property
+    def data_dir(self):
+        """Directory of the deposits, transactions and balances files"""
+        return self.__data_dir
+
+    def path(self, file_name):
+        """Returns the absolute path of a data file"""
+        return os.path.join(self.__data_dir, file_name)
+
+    def add_deposits(self, records):
+        append_records(self.path(self.DEPOSITS_FILE), records, "Deposits")
+
+    def add_transfers(self, records):
+        return self.__index().add_new(records)
+
+    def transfer_log(self):
+        """Returns the log of past transfers, migrating the legacy JSON file first"""
+        return self.__index().log
+
+    def add_transactions(self, records):
+        append_records(self.path(self.TRANSACTIONS_FILE), records, "Transactions")
+
+    def balances(self, ibans=None):
+        columnar = self.__columnar_copy()
+        if columnar is not None:
+            # an up-to-date columnar copy is summed with vectorised scans of its mmap
+            return columnar.balances(ibans)
+        # running balances are kept in a ledger, only new transactions are summed;
+        # it is loaded once and kept in memory for the lifetime of the storage
+        with self.__lock:
+            if self.__ledger is None:
+                self.__ledger = BalanceLedger(self.path(self.TRANSACTIONS_FILE),
+                                              self.path(self.LEDGER_FILE))
+            return self.__ledger.balances(ibans)
+
+    def transactions_version(self, iban: str):
+        try:
+            stat = os.stat(self.path(self.TRANSACTIONS_FILE))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def recompute_balances(self, ibans=None, workers: int = None):
+        return recompute_balances([self.path(self.TRANSACTIONS_FILE)], ibans, workers)
+
+    def add_balances(self, entries):
+        # only the entries of the latest date are read and rewritten
+        BalanceStore(self.path(self.BALANCES_FILE)).upsert(entries)
+
+    def close(self):
+        with self.__lock:
+            if self.__transfer_index is not None:
+                self.__transfer_index.close()
+                self.__transfer_index = None
+            if self.__columnar is not None:
+                self.__columnar.close()
+                self.__columnar = self.__columnar_key = None
+            self.__ledger = None
+
+    def __columnar_copy(self):
+        """Returns the columnar copy of the transactions (see export_columnar) if it
+        exists and the transactions file did not change since it was exported"""
+        path = self.path(self.COLUMNAR_FILE)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self.__lock:
+            if key != self.__columnar_key:
+                # a replaced copy is not closed, as other threads may be reading it;
+                # it is unmapped when no longer referenced
+                try:
+                    self.__columnar = ColumnarTransactions(path)
+                except AccountManagementException:
+                    self.__columnar = None
+                self.__columnar_key = key
+            columnar = self.__columnar
+        if columnar is None or not columnar.is_current(self.path(self.TRANSACTIONS_FILE)):
+            return None
+        return columnar
+
+    def __index(self):
+        """Returns the index over the log of past transfers, migrating the legacy
+        JSON file on first use"""
+        with self.__lock:
+            if self.__transfer_index is None:
+                log = TransactionLog(os.path.join(self.__transfers_dir, self.TRANSFER_LOG))
+                log.migrate_from(os.path.join(self.__transfers_dir, self.TRANSFER_FILE))
+                self.__transfer_index = TransferCodeIndex(
+                    os.path.join(self.__transfers_dir, self.TRANSFER_INDEX), log)
+            return self.__transfer_index
+
+
+_STORAGE = None
+_STORAGE_LOCK = threading.Lock()
+
+
+def get_storage():
+    """
+    Returns the storage backend in use.
+
+    Unless set_storage() was called, it is chosen by the UC3M_MONEY_STORAGE
+    environment variable: "json" (the default) for the JSON files, "sqlite" for
+    a database in src/main, "sqlite:<path>" for the database at path, or
+    "sharded:<count>" for count JSON shards in src/main/shards
+    ("sharded:<count>:<directory>" for shards in directory).
+    """
+    global _STORAGE  # pylint: disable=global-statement
+    with _STORAGE_LOCK:
+        if _STORAGE is None:
+            _STORAGE = storage_from_config(os.environ.get(STORAGE_VARIABLE, "json"))
+        return _STORAGE
+
+
+def set_storage(storage):
+    """
+    Replaces the storage backend in use, closing the previous one.
+
+    Args:
+        storage (Storage): The new backend, or None to choose it again from the
+            environment on next use.
+    """
+    global _STORAGE  # pylint: disable=global-statement
+    with _STORAGE_LOCK:
+        previous, _STORAGE = _STORAGE, storage
+    if previous is not None and previous is not storage:
+        previous.close()
+
+
+def storage_from_config(config: str):
+    """Creates the backend described by a UC3M_MONEY_STORAGE value"""
+    kind, _, location = config.strip().partition(":")
+    if kind == "json":
+        return JsonStorage(location or None)
+    if kind == "sqlite":
+        # imported here as sqlite_storage imports this module
+        from uc3m_money.sqlite_storage import SqliteStorage  # pylint: disable=import-outside-toplevel
+        return SqliteStorage(location or os.path.join(DEFAULT_DATA_DIR, DEFAULT_DATABASE))
+    if kind == "sharded":
+        from uc3m_money.sharded_storage import ShardedStorage  # pylint: disable=import-outside-toplevel
+        count, _, directory = location.partition(":")
+        if not count.isdigit() or int(count) < 1:
+            raise AccountManagementException(f"Invalid number of shards: {config}")
+        return ShardedStorage.json_shards(
+            directory or os.path.join(DEFAULT_DATA_DIR, DEFAULT_SHARDS_DIR), int(count))
+    raise AccountManagementException(f"Unknown storage backend: {config}")
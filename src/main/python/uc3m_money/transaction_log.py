@@ -0,0 +1,164 @@
+"""Append-only JSON Lines log used to store the past transfers"""
+import json
+import os
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money import metrics
+from uc3m_money.json_stream import iter_json_array
+from uc3m_money.file_storage import file_lock
+
+
+class TransactionLog:
+    """Class representing an append-only file with one JSON record per line"""
+
+    def __init__(self, path: str, sync_every: int = 1):
+        """
+        Args:
+            path (str): Path of the JSON Lines file.
+            sync_every (int): Number of appended records after which the file is
+                fsync'ed. Records written in between are flushed to the OS but
+                only made durable by the next fsync (or by calling sync()).
+        """
+        if sync_every < 1:
+            raise AccountManagementException("sync_every must be >= 1")
+        self.__path = path
+        self.__sync_every = sync_every
+        self.__pending = 0
+
+    @property
+    def path(self):
+        """Path of the log file"""
+        return self.__path
+
+    @property
+    def pending(self):
+        """Number of appended records that have not been fsync'ed yet"""
+        return self.__pending
+
+    def append(self, record: dict):
+        """Appends a single record to the end of the log"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Appends several records with a single write"""
+        lines = "".join(json.dumps(record, separators=(",", ":")) + "\n"
+                        for record in records)
+        if not lines:
+            return
+        self.__drop_torn_tail()
+        with open(self.__path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            # json.dumps escapes non-ASCII characters, so characters are bytes
+            metrics.increment(metrics.BYTES_WRITTEN, len(lines), file="Transfers")
+            f.flush()
+            self.__pending += len(records)
+            if self.__pending >= self.__sync_every:
+                os.fsync(f.fileno())
+                self.__pending = 0
+
+    def __drop_torn_tail(self):
+        """Truncates a last line left without newline by an interrupted write"""
+        size = self.size()
+        if not size:
+            return
+        with open(self.__path, "rb+") as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+
+    def sync(self):
+        """Forces the records appended so far to disk"""
+        if self.__pending and os.path.exists(self.__path):
+            with open(self.__path, "a", encoding="utf-8") as f:
+                os.fsync(f.fileno())
+        self.__pending = 0
+
+    def size(self):
+        """Returns the size in bytes of the log, 0 if it does not exist yet"""
+        if not os.path.exists(self.__path):
+            return 0
+        return os.path.getsize(self.__path)
+
+    def read_from(self, offset: int = 0):
+        """
+        Yields (end_offset, record) for every record stored from a byte offset on.
+
+        end_offset is the byte position right after the record, so it can be used
+        as a high-water mark to resume reading later on.
+        """
+        if not os.path.exists(self.__path):
+            return
+        with open(self.__path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                # a last line without newline is a write torn by a crash
+                if not line.endswith(b"\n"):
+                    return
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                    raise AccountManagementException(
+                        "Transactions log is corrupted") from exc
+                yield offset, record
+
+    def __iter__(self):
+        """Yields the stored records in insertion order"""
+        for _, record in self.read_from(0):
+            yield record
+
+    def migrate_from(self, json_path: str):
+        """
+        One-shot migration of a legacy JSON array file into the log.
+
+        Nothing is done if the log already exists. The log is written to a
+        temporary file and moved into place, so an interrupted migration is
+        simply repeated on the next call.
+
+        Args:
+            json_path (str): Path of the legacy file containing a JSON array.
+
+        Returns:
+            int: Number of records migrated.
+
+        Raises:
+            AccountManagementException: If the legacy file is corrupted; the log
+            is not created.
+        """
+        if os.path.exists(self.__path) or not os.path.exists(json_path):
+            return 0
+        with file_lock(self.__path):
+            # another process may have migrated while waiting for the lock
+            if os.path.exists(self.__path):
+                return 0
+            return self.__migrate(json_path)
+
+    def __migrate(self, json_path):
+        tmp_path = self.__path + ".tmp"
+        count = 0
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                # an empty legacy file holds no transfers yet
+                if os.path.getsize(json_path):
+                    for _, record in iter_json_array(json_path, file_label="Transfers"):
+                        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                        count += 1
+                f.flush()
+                os.fsync(f.fileno())
+        except AccountManagementException:
+            # the log is not created, so the fixed file is migrated later on
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, self.__path)
+        return count
@@ -0,0 +1,123 @@
+"""Persistent index of the transfer codes stored in the transactions log"""
+import sqlite3
+import threading
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.sqlite_transaction import write_transaction
+from uc3m_money.transaction_log import TransactionLog
+
+
+class TransferCodeIndex:
+    """
+    Class representing a SQLite sidecar table keyed by transfer_code.
+
+    The index remembers how many bytes of the log it has already indexed, so
+    records appended to the log by an interrupted insert (or while the index
+    file was missing) are folded in before the next lookup. An instance may be
+    shared by several threads.
+    """
+
+    def __init__(self, path: str, log: TransactionLog):
+        self.__log = log
+        # the connection is shared by the threads using this index
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(path, isolation_level=None,
+                                            check_same_thread=False)
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS transfer_codes "
+                                  "(code TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS meta "
+                                  "(key TEXT PRIMARY KEY, value INTEGER)")
+        self.__connection.execute("INSERT OR IGNORE INTO meta VALUES ('log_offset', 0)")
+
+    @property
+    def log(self):
+        """Log whose transfer codes are indexed"""
+        return self.__log
+
+    def __contains__(self, code):
+        with self.__lock:
+            self.catch_up()
+            row = self.__connection.execute(
+                "SELECT 1 FROM transfer_codes WHERE code = ?", (code,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self.__lock:
+            self.catch_up()
+            return self.__connection.execute(
+                "SELECT COUNT(*) FROM transfer_codes").fetchone()[0]
+
+    def catch_up(self):
+        """Indexes the records appended to the log after the stored high-water mark"""
+        with write_transaction(self.__connection, self.__lock):
+            self.__catch_up()
+
+    def add(self, records):
+        """
+        Appends transfer records to the log and indexes their codes atomically.
+
+        Args:
+            records (list): Transfer dicts as returned by TransferRequest.to_json().
+
+        Raises:
+            AccountManagementException: If any transfer_code is already stored,
+            in which case nothing is written.
+        """
+        with write_transaction(self.__connection, self.__lock):
+            self.__catch_up()
+            for record in records:
+                try:
+                    self.__connection.execute("INSERT INTO transfer_codes VALUES (?)",
+                                              (record["transfer_code"],))
+                except sqlite3.IntegrityError as exc:
+                    raise AccountManagementException("Transfer already exists") from exc
+            self.__log.append_many(records)
+            self.__set_offset(self.__log.size())
+
+    def add_new(self, records):
+        """
+        Appends to the log, in one write and one transaction, the transfer records
+        whose code is not stored yet (neither in the index nor earlier in records).
+
+        Args:
+            records (list): Transfer dicts as returned by TransferRequest.to_json().
+
+        Returns:
+            list: The records that were accepted, in input order.
+        """
+        with write_transaction(self.__connection, self.__lock):
+            self.__catch_up()
+            accepted = []
+            for record in records:
+                cursor = self.__connection.execute(
+                    "INSERT OR IGNORE INTO transfer_codes VALUES (?)",
+                    (record["transfer_code"],))
+                if cursor.rowcount:
+                    accepted.append(record)
+            self.__log.append_many(accepted)
+            self.__set_offset(self.__log.size())
+        return accepted
+
+    def close(self):
+        """Closes the underlying database"""
+        with self.__lock:
+            self.__connection.close()
+
+    def __catch_up(self):
+        stored = self.__connection.execute(
+            "SELECT value FROM meta WHERE key = 'log_offset'").fetchone()[0]
+        offset = stored
+        if offset > self.__log.size():
+            # the log was replaced: rebuild the index from scratch
+            self.__connection.execute("DELETE FROM transfer_codes")
+            offset = 0
+        new_offset = offset
+        for new_offset, record in self.__log.read_from(offset):
+            if "transfer_code" in record:
+                self.__connection.execute("INSERT OR IGNORE INTO transfer_codes VALUES (?)",
+                                          (record["transfer_code"],))
+        if new_offset != stored:
+            self.__set_offset(new_offset)
+
+    def __set_offset(self, offset):
+        self.__connection.execute("UPDATE meta SET value = ? WHERE key = 'log_offset'",
+                                  (offset,))
@@ -1,23 +1,33 @@
 import hashlib
 import json
-import re
-import os
 from datetime import datetime, timezone
 from uc3m_money.account_management_exception import AccountManagementException
-from uc3m_money.account_manager import AccountManager
+from uc3m_money.group_commit import GroupCommitWriter
+from uc3m_money import metrics
+from uc3m_money.storage import JsonStorage, get_storage
+from uc3m_money.transfer_validator import TransferValidator
 
 
 class TransferRequest:
-    TRANSFER_FILE = "past_transactions.json"
+    TRANSFER_FILE = JsonStorage.TRANSFER_FILE
+    TRANSFER_LOG = JsonStorage.TRANSFER_LOG
+    TRANSFER_INDEX = JsonStorage.TRANSFER_INDEX
+    # no per-instance __dict__: millions of transfers may be held in memory
+    __slots__ = ("from_iban", "to_iban", "transfer_concept", "transfer_type", "transfer_date",
+                 "__transfer_amount", "__transfer_amount_cents", "__time_stamp",
+                 "__transfer_code")
 
     def __init__(self, from_iban: str, to_iban: str, transfer_concept: str,
-                 transfer_type: str, transfer_date: str, transfer_amount: float):
+                 transfer_type: str, transfer_date: str, transfer_amount: float,
+                 transfer_amount_cents: int = None):
         self.from_iban = from_iban
         self.to_iban = to_iban
         self.transfer_concept = transfer_concept
         self.transfer_type = transfer_type
         self.transfer_date = transfer_date
-        self.transfer_amount = transfer_amount
+        self.__transfer_amount = transfer_amount
+        # given when the amount was already converted, e.g. by the validator
+        self.__transfer_amount_cents = transfer_amount_cents
         self.__time_stamp = datetime.timestamp(datetime.now(timezone.utc))
         self.__transfer_code = self.generate_transfer_code()
 
@@ -43,87 +53,144 @@ class TransferRequest:
     def transfer_code(self):
         return self.__transfer_code
 
+    @property
+    def transfer_amount(self):
+        """The amount in euros"""
+        return self.__transfer_amount
+    @transfer_amount.setter
+    def transfer_amount(self, value):
+        self.__transfer_amount = value
+        self.__transfer_amount_cents = None
+
+    @property
+    def transfer_amount_cents(self):
+        """The amount in cents, following transfer_amount"""
+        if self.__transfer_amount_cents is None:
+            self.__transfer_amount_cents = round(self.__transfer_amount * 100)
+        return self.__transfer_amount_cents
+
     def __str__(self):
         return json.dumps(self.to_json(), indent=4)
 
 
-def transfer_request(from_iban, to_iban, concept, transfer_type, date, amount):
+def transfer_request(from_iban, to_iban, concept, transfer_type, date, amount, storage=None):
     """
     Processes a transfer request by validating input fields and storing the transaction if it is not a duplicate.
+
+    The transfer is stored in storage, or in the storage in use by default (see
+    AccountManager for isolated ledgers).
     """
-    if not isinstance(from_iban, str):
-        raise AccountManagementException("from_iban must be a string")
-    if not AccountManager.validate_iban(from_iban):
-        raise AccountManagementException("From IBAN is not valid")
+    transfer_req = _validate_transfer(from_iban, to_iban, concept, transfer_type, date, amount)
 
-    if not isinstance(to_iban, str):
-        raise AccountManagementException("to_iban must be a string")
-    if not AccountManager.validate_iban(to_iban):
-        raise AccountManagementException("To IBAN is not valid")
+    if _GROUP_COMMIT is not None and storage is None:
+        # returns once the batch holding the transfer is on disk
+        return _GROUP_COMMIT.submit(transfer_req.to_json())
 
-    # Validate concept
-    if not isinstance(concept, str):
-        raise AccountManagementException("Concept must be a string")
+    result = _commit_transfers([transfer_req.to_json()], storage)[0]
+    if isinstance(result, AccountManagementException):
+        raise result
 
-    # Must be 10-30 characters and contain at least two words
-    if not (10 <= len(concept) <= 30 and re.search(r"\b\w+\b.*\b\w+\b", concept)):
-        raise AccountManagementException("Invalid concept. Must be 10-30 chars with at least two words.")
+    return result
 
-    # Must not contain special characters
-    if not re.fullmatch(r"[a-zA-Z0-9 ]+", concept):
-        raise AccountManagementException("Concept must not contain special characters.")
 
-    if not isinstance(transfer_type, str):
-        raise AccountManagementException("transfer_type must be a string")
-    valid_types = {"ORDINARY", "URGENT", "IMMEDIATE"}
-    if transfer_type not in valid_types:
-        raise AccountManagementException(f"Invalid transfer type: {transfer_type}.")
+def transfer_requests_bulk(transfers):
+    """
+    Processes a batch of transfer requests with a single write.
 
-    if not isinstance(date, str):
-        raise AccountManagementException("Date must be a string")
+    Every transfer is validated like in transfer_request(). Duplicates are detected
+    both within the batch and against the stored transfers in one pass over the
+    transfer codes, and all the accepted transfers are committed together.
 
-    # Check date format explicitly using regex (must be DD/MM/YYYY with two digits for DD and MM)
-    if not re.fullmatch(r"\d{2}/\d{2}/\d{4}", date):
-        raise AccountManagementException("Invalid date format. Must be DD/MM/YYYY with two-digit day and month.")
+    Args:
+        transfers (iterable): Transfers given either as dicts with the keys from_iban,
+            to_iban, concept, transfer_type, date and amount, or as tuples with the
+            arguments of transfer_request() in order.
 
+    Returns:
+        list: One item per transfer, in input order: the transfer code (str) if it was
+        stored, or the AccountManagementException explaining the rejection.
+    """
+    results = []
+    # (position in results, record) of the valid transfers
+    pending = []
+    for transfer in transfers:
+        try:
+            if isinstance(transfer, dict):
+                transfer_req = _validate_transfer(**transfer)
+            else:
+                transfer_req = _validate_transfer(*transfer)
+        except TypeError:
+            error = AccountManagementException("Transfer does not have the expected fields")
+            metrics.validation_failure("transfer", error)
+            results.append(error)
+            continue
+        except AccountManagementException as exc:
+            results.append(exc)
+            continue
+        pending.append((len(results), transfer_req.to_json()))
+        results.append(transfer_req.transfer_code)
+
+    codes = _commit_transfers([record for _, record in pending])
+    for (position, _), code in zip(pending, codes):
+        results[position] = code
+
+    return results
+
+
+def _commit_transfers(records, storage=None):
+    """Stores in one write the transfer records that are not duplicates; returns
+    for each record its transfer code or the exception that rejected it"""
+    with metrics.timed("transfer", "write"):
+        accepted = (storage or get_storage()).add_transfers(records)
+    metrics.increment(metrics.RECORDS_WRITTEN, len(accepted), file="Transfers")
+    metrics.increment(metrics.DUPLICATES, len(records) - len(accepted), operation="transfer")
+    accepted_ids = {id(record) for record in accepted}
+    return [record["transfer_code"] if id(record) in accepted_ids
+            else AccountManagementException("Transfer already exists")
+            for record in records]
+
+
+def _validate_transfer(from_iban, to_iban, concept, transfer_type, date, amount):
+    """Validates the fields of a transfer and returns its TransferRequest"""
     try:
-        date_obj = datetime.strptime(date, "%d/%m/%Y")
-        if not (2025 <= date_obj.year <= 2050):
-            raise AccountManagementException("Year must be between 2025 and 2050.")
-        if date_obj.date() < datetime.now().date():
-            raise AccountManagementException("Transfer date must be today or in the future.")
-    except ValueError as exc:
-        raise AccountManagementException("Invalid date. Must be a valid calendar date.") from exc
-
-    if not isinstance(amount, float):
-        raise AccountManagementException("Amount must be a float")
-    if len(str(amount).split('.')[-1]) > 2:
-        raise AccountManagementException("Amount must have up to two decimal places.")
-    if not 10.00 <= amount <= 10000.00:
-        raise AccountManagementException("Amount is not within the allowed range (10.00 to 10000.00).")
-
-    transfer_req = TransferRequest(from_iban, to_iban, concept, transfer_type, date, amount)
-
-    directory = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(directory, TransferRequest.TRANSFER_FILE)
-
-    if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            try:
-                transactions = json.load(f)
-                if not isinstance(transactions, list):
-                    transactions = []
-            except json.JSONDecodeError:
-                transactions = []
-    else:
-        transactions = []
-
-    for t in transactions:
-        if t.get("transfer_code") == transfer_req.transfer_code:
-            raise AccountManagementException("Transfer already exists")
-
-    transactions.append(transfer_req.to_json())
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(transactions, f, indent=4)
-
-    return transfer_req.transfer_code
+        with metrics.timed("transfer", "validate"):
+            cents = _VALIDATOR.check(from_iban, to_iban, concept, transfer_type, date, amount)
+    except AccountManagementException as exc:
+        metrics.validation_failure("transfer", exc)
+        raise
+    # the transfer code is an MD5 hash of the fields
+    with metrics.timed("transfer", "hash"):
+        return TransferRequest(from_iban, to_iban, concept, transfer_type, date, amount, cents)
+
+
+# shared by every call: it holds the compiled patterns and today's date
+_VALIDATOR = TransferValidator()
+
+
+_GROUP_COMMIT = None
+
+
+def start_group_commit(max_batch: int = 64, max_delay: float = 0.002):
+    """
+    Makes transfer_request() group the transfers of concurrent callers.
+
+    The accepted transfers are queued and stored together, with a single log
+    write and fsync, once max_batch of them are waiting or max_delay seconds after
+    the first one. Every call still returns only when its transfer is on disk,
+    and a duplicate transfer_code is still rejected with an exception.
+
+    Args:
+        max_batch (int): Maximum number of transfers written at a time.
+        max_delay (float): Seconds a transfer may wait for others to join its batch.
+    """
+    global _GROUP_COMMIT  # pylint: disable=global-statement
+    stop_group_commit()
+    _GROUP_COMMIT = GroupCommitWriter(_commit_transfers, max_batch, max_delay)
+
+
+def stop_group_commit():
+    """Stores the queued transfers and goes back to one write per transfer"""
+    global _GROUP_COMMIT  # pylint: disable=global-statement
+    writer, _GROUP_COMMIT = _GROUP_COMMIT, None
+    if writer is not None:
+        writer.close()
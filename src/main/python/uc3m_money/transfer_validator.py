@@ -0,0 +1,159 @@
+"""Validation of the fields of transfer requests"""
+import re
+import time
+from datetime import datetime, timedelta
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.account_manager import AccountManager
+
+TRANSFER_TYPES = frozenset(("ORDINARY", "URGENT", "IMMEDIATE"))
+MIN_YEAR = 2025
+MAX_YEAR = 2050
+MIN_AMOUNT_CENTS = 1000
+MAX_AMOUNT_CENTS = 1000000
+# days of each month of a common year, January first
+_MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+class TransferValidator:
+    """
+    Class checking the fields of transfer requests.
+
+    The concept patterns are compiled once, today's date is worked out once a
+    day (when the clock goes past the next local midnight) and dates are
+    parsed by hand into a YYYYMMDD number compared with it, instead of a
+    regular expression, strptime() and datetime.now() per transfer. The checks
+    and their messages are those of transfer_request(). A validator holds no
+    per-transfer state, so a single one can be shared by every thread.
+    """
+    __TWO_WORDS = re.compile(r"\b\w+\b.*\b\w+\b")
+    __CONCEPT_CHARACTERS = re.compile(r"[a-zA-Z0-9 ]+")
+
+    def __init__(self, clock=time.time):
+        """
+        Args:
+            clock (callable): Returns the current POSIX timestamp; today is its
+                local date.
+        """
+        self.__clock = clock
+        # (YYYYMMDD, first timestamp of that day, first timestamp of the next one),
+        # replaced as a whole so that threads never see half of it
+        self.__today = (0, 0.0, 0.0)
+
+    def today(self):
+        """Returns the local date of the clock as a YYYYMMDD number"""
+        today, start, end = self.__today
+        now = self.__clock()
+        if not start <= now < end:
+            midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0,
+                                                           microsecond=0)
+            today = midnight.year * 10000 + midnight.month * 100 + midnight.day
+            self.__today = (today, midnight.timestamp(),
+                            (midnight + timedelta(days=1)).timestamp())
+        return today
+
+    def check(self, from_iban, to_iban, concept, transfer_type, transfer_date, amount):
+        # pylint: disable=too-many-arguments
+        """
+        Checks the fields of a transfer.
+
+        Returns:
+            int: The amount in cents.
+
+        Raises:
+            AccountManagementException: For the first invalid field, in the order
+            of the arguments.
+        """
+        if not isinstance(from_iban, str):
+            raise AccountManagementException("from_iban must be a string")
+        if not AccountManager.validate_iban(from_iban):
+            raise AccountManagementException("From IBAN is not valid")
+
+        if not isinstance(to_iban, str):
+            raise AccountManagementException("to_iban must be a string")
+        if not AccountManager.validate_iban(to_iban):
+            raise AccountManagementException("To IBAN is not valid")
+
+        self.check_concept(concept)
+
+        if not isinstance(transfer_type, str):
+            raise AccountManagementException("transfer_type must be a string")
+        if transfer_type not in TRANSFER_TYPES:
+            raise AccountManagementException(f"Invalid transfer type: {transfer_type}.",
+                                             reason="Invalid transfer type.")
+
+        self.check_date(transfer_date)
+        return self.amount_cents(amount)
+
+    def check_concept(self, concept):
+        """Raises an AccountManagementException unless concept has 10-30 letters,
+        digits and spaces and at least two words"""
+        if not isinstance(concept, str):
+            raise AccountManagementException("Concept must be a string")
+        if not (10 <= len(concept) <= 30 and self.__TWO_WORDS.search(concept)):
+            raise AccountManagementException(
+                "Invalid concept. Must be 10-30 chars with at least two words.")
+        if not self.__CONCEPT_CHARACTERS.fullmatch(concept):
+            raise AccountManagementException("Concept must not contain special characters.")
+
+    def check_date(self, transfer_date):
+        """
+        Parses a "DD/MM/YYYY" transfer date.
+
+        Returns:
+            int: The date as a YYYYMMDD number.
+
+        Raises:
+            AccountManagementException: If it is not such a date, valid, between
+            MIN_YEAR and MAX_YEAR and not before today.
+        """
+        if not isinstance(transfer_date, str):
+            raise AccountManagementException("Date must be a string")
+        # what the regular expression \d{2}/\d{2}/\d{4} accepts: any decimal digits
+        if len(transfer_date) != 10 or transfer_date[2] != "/" or transfer_date[5] != "/" \
+                or not (transfer_date[:2].isdecimal() and transfer_date[3:5].isdecimal()
+                        and transfer_date[6:].isdecimal()):
+            raise AccountManagementException(
+                "Invalid date format. Must be DD/MM/YYYY with two-digit day and month.")
+        # while a date only has ASCII digits (as for strptime())
+        day, month, year = (int(transfer_date[:2]), int(transfer_date[3:5]),
+                            int(transfer_date[6:]))
+        if not transfer_date.isascii() or not 1 <= month <= 12 or year < 1 \
+                or not 1 <= day <= _days_in_month(year, month):
+            raise AccountManagementException("Invalid date. Must be a valid calendar date.")
+        if not MIN_YEAR <= year <= MAX_YEAR:
+            raise AccountManagementException("Year must be between 2025 and 2050.")
+        number = year * 10000 + month * 100 + day
+        if number < self.today():
+            raise AccountManagementException("Transfer date must be today or in the future.")
+        return number
+
+    @staticmethod
+    def amount_cents(amount):
+        """
+        Returns a float amount with up to two decimals in cents.
+
+        Raises:
+            AccountManagementException: If it is not such a float between 10.00
+            and 10000.00.
+        """
+        if not isinstance(amount, float):
+            raise AccountManagementException("Amount must be a float")
+        try:
+            cents = round(amount * 100)
+        except (ValueError, OverflowError) as exc:
+            # NaN and infinities
+            raise AccountManagementException("Amount must have up to two decimal places.") \
+                from exc
+        # cents / 100 is the float closest to the decimal, see amount_cents.float_to_cents()
+        if cents / 100 != amount:
+            raise AccountManagementException("Amount must have up to two decimal places.")
+        if not MIN_AMOUNT_CENTS <= cents <= MAX_AMOUNT_CENTS:
+            raise AccountManagementException(
+                "Amount is not within the allowed range (10.00 to 10000.00).")
+        return cents
+
+
+def _days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _MONTH_DAYS[month - 1]
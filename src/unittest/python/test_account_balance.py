@@ -1,6 +1,11 @@
 import unittest
+import os
+import json
+import shutil
+import tempfile
 from uc3m_money.account_management_exception import  AccountManagementException
-from uc3m_money.account_balance import calculate_balance
+from uc3m_money.account_balance import calculate_balance, calculate_balances
+from uc3m_money.storage import JsonStorage, DEFAULT_DATA_DIR, set_storage
 class TestCalculateBalance(unittest.TestCase):
 
     def test_valid_iban_and_transactions(self):
@@ -35,5 +40,41 @@ class TestCalculateBalance(unittest.TestCase):
         # TC7
         self.assertTrue(calculate_balance("ES3559005439021242088295"))
 
+class TestCalculateBalances(unittest.TestCase):
+
+    def setUp(self):
+        # the shipped transactions, in a storage whose balances can be written
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        shutil.copy(os.path.join(DEFAULT_DATA_DIR, JsonStorage.TRANSACTIONS_FILE),
+                    self.tmp_dir.name)
+        self.storage = JsonStorage.create(self.tmp_dir.name)
+        set_storage(self.storage)
+
+    def tearDown(self):
+        set_storage(None)
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def test_batch_of_ibans(self):
+        balances = calculate_balances(["ES8658342044541216872704",
+                                       "ES3559005439021242088295",
+                                       "ES9820385778983000760236"])
+        self.assertEqual(set(balances), {"ES8658342044541216872704",
+                                         "ES3559005439021242088295"})
+
+    def test_all_accounts(self):
+        balances = calculate_balances()
+        self.assertIn("ES8658342044541216872704", balances)
+        with open(self.storage.path(JsonStorage.BALANCES_FILE), encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), len(balances))
+
+    def test_parallel_recompute(self):
+        ibans = ["ES8658342044541216872704", "ES3559005439021242088295"]
+        self.assertEqual(calculate_balances(ibans, workers=2), calculate_balances(ibans))
+
+    def test_invalid_iban_in_batch(self):
+        with self.assertRaises(AccountManagementException):
+            calculate_balances(["ES8658342044541216872704", "INVALID_IBAN"])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
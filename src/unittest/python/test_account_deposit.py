@@ -1,8 +1,12 @@
 import unittest
 import os
 import json
-from uc3m_money.account_deposit import deposit_into_account
+import tempfile
+import threading
+from uc3m_money.account_deposit import (deposit_into_account, deposit_into_account_bulk,
+                                        start_group_commit, stop_group_commit)
 from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.storage import JsonStorage, set_storage
 
 class TestDepositIntoAccount(unittest.TestCase):
 
@@ -72,5 +76,113 @@ class TestDepositIntoAccount(unittest.TestCase):
         with self.assertRaises(AccountManagementException):
             deposit_into_account(self.test_file)
 
+class TestDepositIntoAccountBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        set_storage(JsonStorage(self.tmp_dir.name))
+        self.test_file = os.path.join(self.tmp_dir.name, "test_deposit_bulk.json")
+
+    def tearDown(self):
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    def saved_deposits(self):
+        with open(os.path.join(self.tmp_dir.name, JsonStorage.DEPOSITS_FILE),
+                  encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_json_array_with_invalid_records(self):
+        content = [{"IBAN": "ES9121000418450200051332", "AMOUNT": "EUR 2500.00"},
+                   {"IBAN": "INVALID_IBAN", "AMOUNT": "EUR 100.00"},
+                   {"IBAN": "ES9121000418450200051332", "AMOUNT": "USD 100.00"},
+                   {"IBAN": "ES9121000418450200051332"},
+                   {"IBAN": "ES9121000418450200051332", "AMOUNT": "EUR 15.50"}]
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        results = deposit_into_account_bulk(self.test_file)
+        self.assertEqual(len(results), 5)
+        self.assertIsInstance(results[0], str)
+        for result in results[1:4]:
+            self.assertIsInstance(result, AccountManagementException)
+        self.assertIsInstance(results[4], str)
+        self.assertEqual([d["deposit_signature"] for d in self.saved_deposits()],
+                         [results[0], results[4]])
+
+    def test_json_lines(self):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write('{"IBAN": "ES9121000418450200051332", "AMOUNT": "EUR 100.00"}\n')
+            f.write('not a json\n')
+            f.write('{"IBAN": "ES9121000418450200051332", "AMOUNT": "EUR 200.00"}\n')
+        results = deposit_into_account_bulk(self.test_file)
+        self.assertIsInstance(results[0], str)
+        self.assertIsInstance(results[1], AccountManagementException)
+        self.assertIsInstance(results[2], str)
+
+    def test_single_pretty_printed_deposit(self):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump({"IBAN": "ES9121000418450200051332", "AMOUNT": "EUR 100.00"}, f, indent=4)
+        results = deposit_into_account_bulk(self.test_file)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(results[0]), 64)
+
+    def test_json_lines_with_a_corrupt_first_line(self):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write('{"IBAN": "ES9121000418450200051332",\n')
+            f.write('{"IBAN": "ES9121000418450200051332", "AMOUNT": "EUR 200.00"}\n')
+        results = deposit_into_account_bulk(self.test_file)
+        self.assertEqual(results[0].message, "The record is not in JSON format.")
+        self.assertIsInstance(results[1], str)
+
+    def test_file_not_found(self):
+        with self.assertRaises(AccountManagementException):
+            deposit_into_account_bulk(os.path.join(self.tmp_dir.name, "nonexistent.json"))
+
+    def test_invalid_file_format(self):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write("not a json")
+        with self.assertRaises(AccountManagementException):
+            deposit_into_account_bulk(self.test_file)
+
+class TestDepositGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        set_storage(JsonStorage(self.tmp_dir.name))
+        start_group_commit(max_batch=8, max_delay=0.05)
+
+    def tearDown(self):
+        stop_group_commit()
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    def test_concurrent_deposits(self):
+        results = {}
+        def worker(number):
+            test_file = os.path.join(self.tmp_dir.name, f"test_deposit_group_{number}.json")
+            try:
+                results[number] = deposit_into_account(test_file)
+            except AccountManagementException as exc:
+                results[number] = exc
+        # deposit 5 is rejected by validation, before being queued
+        for number in range(10):
+            amount = "EUR 1.00" if number == 5 else f"EUR {100 + number}.00"
+            test_file = os.path.join(self.tmp_dir.name, f"test_deposit_group_{number}.json")
+            with open(test_file, 'w', encoding='utf-8') as f:
+                json.dump({"IBAN": "ES9121000418450200051332", "AMOUNT": amount}, f)
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for number, result in results.items():
+            if number == 5:
+                self.assertIsInstance(result, AccountManagementException)
+            else:
+                self.assertEqual(len(result), 64)
+        with open(os.path.join(self.tmp_dir.name, JsonStorage.DEPOSITS_FILE),
+                  encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 9)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money.account_manager import AccountManager
+from uc3m_money.storage import JsonStorage, get_storage
+from uc3m_money.account_balance import balance_cache, calculate_balances
+from uc3m_money.account_deposit import deposit_into_account_bulk
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+class TestAccountManagerLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dirs = [os.path.join(self.tmp_dir.name, name) for name in ("ledger_a", "ledger_b")]
+        self.managers = [AccountManager(data_dir) for data_dir in self.dirs]
+        balance_cache().clear()
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.close()
+        balance_cache().clear()
+        self.tmp_dir.cleanup()
+
+    def read(self, data_dir, file_name):
+        with open(os.path.join(data_dir, file_name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_ledgers_are_isolated(self):
+        ledger_a, ledger_b = self.managers
+        input_file = os.path.join(self.tmp_dir.name, "deposit.json")
+        with open(input_file, "w", encoding="utf-8") as f:
+            json.dump({"IBAN": IBAN, "AMOUNT": "EUR 100.00"}, f)
+        signature = ledger_a.deposit_into_account(input_file)
+        self.assertEqual([d["deposit_signature"] for d in
+                          self.read(self.dirs[0], JsonStorage.DEPOSITS_FILE)], [signature])
+        self.assertFalse(os.path.exists(os.path.join(self.dirs[1], JsonStorage.DEPOSITS_FILE)))
+
+        # the same transfer is new in each ledger
+        transfer = (IBAN, IBAN_2, "isolated ledger test", "ORDINARY", "01/01/2050", 10.0)
+        self.assertEqual(ledger_a.transfer_request(*transfer), ledger_b.transfer_request(*transfer))
+        self.assertTrue(os.path.exists(os.path.join(self.dirs[0], JsonStorage.TRANSFER_LOG)))
+
+        ledger_b.storage.add_transactions([{"IBAN": IBAN, "amount": "+7.00"}])
+        self.assertTrue(ledger_a.calculate_balance(IBAN))
+        self.assertTrue(ledger_b.calculate_balance(IBAN))
+        self.assertEqual(self.read(self.dirs[0], JsonStorage.BALANCES_FILE), [])
+        self.assertEqual([b["amount"] for b in self.read(self.dirs[1], JsonStorage.BALANCES_FILE)],
+                         [7.0])
+
+    def test_bulk_operations_use_the_given_storage(self):
+        ledger_a, ledger_b = self.managers
+        input_file = os.path.join(self.tmp_dir.name, "deposits.json")
+        with open(input_file, "w", encoding="utf-8") as f:
+            json.dump([{"IBAN": IBAN, "AMOUNT": "EUR 100.00"},
+                       {"IBAN": IBAN_2, "AMOUNT": "EUR 50.00"}], f)
+        results = deposit_into_account_bulk(input_file, ledger_a.storage)
+        self.assertEqual([d["deposit_signature"] for d in
+                          self.read(self.dirs[0], JsonStorage.DEPOSITS_FILE)], results)
+        self.assertFalse(os.path.exists(os.path.join(self.dirs[1], JsonStorage.DEPOSITS_FILE)))
+
+        ledger_b.storage.add_transactions([{"IBAN": IBAN, "amount": "+7.00"},
+                                           {"IBAN": IBAN_2, "amount": "-3.00"}])
+        self.assertEqual(calculate_balances(storage=ledger_a.storage), {})
+        self.assertEqual(calculate_balances([IBAN], workers=1, storage=ledger_b.storage),
+                         {IBAN: 7.0})
+        self.assertEqual(self.read(self.dirs[0], JsonStorage.BALANCES_FILE), [])
+        self.assertEqual([b["amount"] for b in self.read(self.dirs[1], JsonStorage.BALANCES_FILE)],
+                         [7.0])
+
+    def test_default_manager_uses_the_storage_in_use(self):
+        self.assertIs(AccountManager().storage, get_storage())
+        self.assertIsNot(self.managers[0].storage, get_storage())
+
+if __name__ == '__main__':
+    unittest.main()
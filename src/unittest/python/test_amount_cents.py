@@ -0,0 +1,45 @@
+import unittest
+from uc3m_money.amount_cents import parse_cents, float_to_cents, cents_to_float, amount_to_cents
+
+class TestAmountCents(unittest.TestCase):
+
+    def test_parse_signed_amounts(self):
+        self.assertEqual(parse_cents("+2424.42"), 242442)
+        self.assertEqual(parse_cents("-1280.06"), -128006)
+        self.assertEqual(parse_cents("15"), 1500)
+        self.assertEqual(parse_cents("1.5"), 150)
+        self.assertEqual(parse_cents(".05"), 5)
+
+    def test_parse_with_prefix(self):
+        self.assertEqual(parse_cents("EUR 2500.00", "EUR "), 250000)
+        with self.assertRaises(ValueError):
+            parse_cents("USD 2500.00", "EUR ")
+
+    def test_parse_invalid_amounts(self):
+        for text in ("", "+", ".", "1.234", "one hundred", "1.2.3", "1e3", "nan", "١٢"):
+            with self.assertRaises(ValueError):
+                parse_cents(text)
+
+    def test_float_to_cents(self):
+        self.assertEqual(float_to_cents(10.0), 1000)
+        self.assertEqual(float_to_cents(10.01), 1001)
+        self.assertEqual(float_to_cents(9999.99), 999999)
+        self.assertEqual(float_to_cents(15.2), 1520)
+        for amount in (10.001, 0.005, float("inf"), float("nan")):
+            with self.assertRaises(ValueError):
+                float_to_cents(amount)
+
+    def test_amount_to_cents(self):
+        self.assertEqual(amount_to_cents("+2424.42"), 242442)
+        self.assertEqual(amount_to_cents("1e3"), 100000)
+        self.assertEqual(amount_to_cents(12.345), 1234)
+        for amount in ("ten", None, "inf"):
+            with self.assertRaises((TypeError, ValueError, OverflowError)):
+                amount_to_cents(amount)
+
+    def test_round_trip_keeps_the_float(self):
+        for amount in (10.0, 10.01, 15.2, 2500.0, 9999.99, 0.1, 0.3):
+            self.assertEqual(cents_to_float(float_to_cents(amount)), amount)
+
+if __name__ == "__main__":
+    unittest.main()
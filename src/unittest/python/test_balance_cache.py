@@ -0,0 +1,67 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money.balance_cache import BalanceCache
+from uc3m_money.account_balance import calculate_balance, balance_cache
+from uc3m_money.storage import JsonStorage, set_storage
+
+IBAN = "ES9121000418450200051332"
+
+class TestBalanceCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = BalanceCache(maxsize=2)
+        cache.put("a", 1, "A")
+        cache.put("b", 1, "B")
+        self.assertEqual(cache.get("a", 1), "A")
+        cache.put("c", 1, "C")
+        self.assertIsNone(cache.get("b", 1))
+        self.assertEqual(cache.get("a", 1), "A")
+        self.assertEqual(cache.get("c", 1), "C")
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 1, "size": 2, "maxsize": 2})
+
+    def test_other_version_is_a_miss(self):
+        cache = BalanceCache()
+        cache.put("a", 1, "A")
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+class TestCalculateBalanceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = JsonStorage(self.tmp_dir.name)
+        self.write(JsonStorage.TRANSACTIONS_FILE, [{"IBAN": IBAN, "amount": "+10.00"}])
+        self.write(JsonStorage.BALANCES_FILE, [])
+        set_storage(self.storage)
+        balance_cache().clear()
+
+    def tearDown(self):
+        set_storage(None)
+        balance_cache().clear()
+        self.tmp_dir.cleanup()
+
+    def write(self, file_name, content):
+        with open(self.storage.path(file_name), "w", encoding="utf-8") as f:
+            json.dump(content, f, indent=4)
+
+    def test_repeated_calls_are_cached_until_transactions_change(self):
+        self.assertTrue(calculate_balance(IBAN))
+        balances_mtime = os.stat(self.storage.path(JsonStorage.BALANCES_FILE)).st_mtime_ns
+        # a hit reads no file, so the removed ledger is not written again
+        os.remove(self.storage.path(JsonStorage.LEDGER_FILE))
+        self.assertTrue(calculate_balance(IBAN))
+        self.assertEqual((balance_cache().hits, balance_cache().misses), (1, 1))
+        self.assertEqual(os.stat(self.storage.path(JsonStorage.BALANCES_FILE)).st_mtime_ns,
+                         balances_mtime)
+        self.assertFalse(os.path.exists(self.storage.path(JsonStorage.LEDGER_FILE)))
+
+        self.storage.add_transactions([{"IBAN": IBAN, "amount": "+5.00"}])
+        self.assertTrue(calculate_balance(IBAN))
+        self.assertEqual(balance_cache().misses, 2)
+        with open(self.storage.path(JsonStorage.BALANCES_FILE), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)[-1]["amount"], 15.0)
+
+if __name__ == "__main__":
+    unittest.main()
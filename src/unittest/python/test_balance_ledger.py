@@ -0,0 +1,102 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money.balance_ledger import BalanceLedger
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBAN_1 = "ES8658342044541216872704"
+IBAN_2 = "ES3559005439021242088295"
+
+class TestBalanceLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.transactions_path = os.path.join(self.tmp_dir.name, "transactions.json")
+        self.ledger_path = os.path.join(self.tmp_dir.name, "ledger.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_transactions(self, transactions):
+        with open(self.transactions_path, "w", encoding="utf-8") as f:
+            json.dump(transactions, f, indent=4)
+
+    def ledger(self):
+        return BalanceLedger(self.transactions_path, self.ledger_path)
+
+    def test_balance_matches_full_sum(self):
+        self.write_transactions([{"IBAN": IBAN_1, "amount": "-1280.06"},
+                                 {"IBAN": IBAN_2, "amount": "+1258.75"},
+                                 {"IBAN": IBAN_1, "amount": "+2424.42"}])
+        self.assertEqual(self.ledger().balance(IBAN_1), 1144.36)
+        self.assertEqual(self.ledger().balance(IBAN_2), 1258.75)
+        self.assertIsNone(self.ledger().balance("ES9820385778983000760236"))
+
+    def test_only_appended_transactions_are_parsed(self):
+        transactions = [{"IBAN": IBAN_1, "amount": "-10.00"}]
+        self.write_transactions(transactions)
+        self.assertEqual(self.ledger().balance(IBAN_1), -10.0)
+        first_offset = self.ledger().offset
+        transactions.append({"IBAN": IBAN_1, "amount": "+25.50"})
+        self.write_transactions(transactions)
+        ledger = self.ledger()
+        self.assertEqual(ledger.balance(IBAN_1), 15.5)
+        self.assertGreater(ledger.offset, first_offset)
+
+    def test_rebuild_when_history_is_rewritten(self):
+        self.write_transactions([{"IBAN": IBAN_1, "amount": "-10.00"}])
+        self.assertEqual(self.ledger().balance(IBAN_1), -10.0)
+        self.write_transactions([{"IBAN": IBAN_1, "amount": "+99.00"},
+                                 {"IBAN": IBAN_1, "amount": "+1.00"}])
+        self.assertEqual(self.ledger().balance(IBAN_1), 100.0)
+
+    def test_rebuild_when_edited_in_place(self):
+        self.write_transactions([{"IBAN": IBAN_1, "amount": "+100.00"},
+                                 {"IBAN": IBAN_2, "amount": "+5.00"}])
+        self.assertEqual(self.ledger().balance(IBAN_1), 100.0)
+        mtime_ns = os.stat(self.transactions_path).st_mtime_ns
+        # same size, and the bytes right before the offset are unchanged
+        self.write_transactions([{"IBAN": IBAN_1, "amount": "+900.00"},
+                                 {"IBAN": IBAN_2, "amount": "+5.00"}])
+        os.utime(self.transactions_path, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+        self.assertEqual(self.ledger().balance(IBAN_1), 900.0)
+
+    def test_rebuild_when_replaced(self):
+        others = [{"IBAN": IBAN_2, "amount": "+5.00"}] * 3
+        self.write_transactions([{"IBAN": IBAN_1, "amount": "+100.00"}] + others)
+        self.assertEqual(self.ledger().balance(IBAN_1), 100.0)
+        stat = os.stat(self.transactions_path)
+        replacement = os.path.join(self.tmp_dir.name, "replacement.json")
+        with open(replacement, "w", encoding="utf-8") as f:
+            json.dump([{"IBAN": IBAN_1, "amount": "+900.00"}] + others, f, indent=4)
+        # hold on to the old file so that its inode is not reused
+        os.link(self.transactions_path, os.path.join(self.tmp_dir.name, "old.json"))
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, self.transactions_path)
+        self.assertEqual(self.ledger().balance(IBAN_1), 900.0)
+
+    def test_invalid_amount_only_affects_its_iban(self):
+        self.write_transactions([{"IBAN": IBAN_1, "amount": "abc"},
+                                 {"IBAN": IBAN_2, "amount": "+5.00"}])
+        with self.assertRaises(AccountManagementException):
+            self.ledger().balance(IBAN_1)
+        self.assertEqual(self.ledger().balance(IBAN_2), 5.0)
+
+    def test_missing_file(self):
+        with self.assertRaises(AccountManagementException):
+            self.ledger().balance(IBAN_1)
+
+    def test_corrupted_file(self):
+        with open(self.transactions_path, "w", encoding="utf-8") as f:
+            f.write('[{"IBAN": "x", ')
+        with self.assertRaises(AccountManagementException):
+            self.ledger().balance(IBAN_1)
+
+    def test_not_a_list(self):
+        self.write_transactions({"IBAN": IBAN_1, "amount": "1.00"})
+        with self.assertRaises(AccountManagementException):
+            self.ledger().balance(IBAN_1)
+
+if __name__ == "__main__":
+    unittest.main()
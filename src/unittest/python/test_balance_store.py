@@ -0,0 +1,90 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money.balance_store import BalanceStore
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+def entry(iban, amount, date="2025-03-25"):
+    return {"iban": iban, "amount": amount, "date": date}
+
+class TestBalanceStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "balances.json")
+        self.write([])
+        self.store = BalanceStore(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, entries):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=4)
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_repeated_balance_is_written_once(self):
+        self.assertEqual(self.store.upsert([entry(IBAN, -9981.0)]), 1)
+        mtime = os.path.getmtime(self.path)
+        self.assertEqual(self.store.upsert([entry(IBAN, -9981.0)]), 0)
+        self.assertEqual(os.path.getmtime(self.path), mtime)
+        self.assertEqual(self.read(), [entry(IBAN, -9981.0)])
+
+    def test_same_day_is_replaced_and_new_day_is_appended(self):
+        self.store.upsert([entry(IBAN, 1.0), entry(IBAN_2, 2.0)])
+        self.store.upsert([entry(IBAN, 3.0)])
+        self.store.upsert([entry(IBAN, 4.0, "2025-03-26")])
+        self.store.upsert([entry(IBAN_2, 5.0, "2025-03-26")])
+        self.assertEqual(self.read(), [entry(IBAN, 3.0), entry(IBAN_2, 2.0),
+                                       entry(IBAN, 4.0, "2025-03-26"),
+                                       entry(IBAN_2, 5.0, "2025-03-26")])
+
+    def test_only_the_latest_run_is_read(self):
+        self.store.upsert([entry(f"ES{number:022d}", 1.0) for number in range(5)])
+        self.store.upsert([entry(IBAN, 2.0, "2025-03-26")])
+        # corrupting an entry before the latest run is not noticed by upserts
+        with open(self.path, "r+b") as f:
+            f.seek(10)
+            original = f.read(1)
+            f.seek(10)
+            f.write(b"x")
+        self.store.upsert([entry(IBAN, 3.0, "2025-03-26")])
+        with open(self.path, "r+b") as f:
+            f.seek(10)
+            f.write(original)
+        self.assertEqual(self.read()[-1], entry(IBAN, 3.0, "2025-03-26"))
+
+    def test_file_rewritten_by_someone_else(self):
+        self.store.upsert([entry(IBAN, 1.0)])
+        self.store.upsert([entry(IBAN, 2.0, "2025-03-26")])
+        self.write([entry(IBAN_2, 7.0, "2025-03-26")])
+        self.store.upsert([entry(IBAN, 2.0, "2025-03-26")])
+        self.assertEqual(self.read(), [entry(IBAN_2, 7.0, "2025-03-26"),
+                                       entry(IBAN, 2.0, "2025-03-26")])
+
+    def test_past_dates_are_merged(self):
+        self.store.upsert([entry(IBAN, 2.0, "2025-03-26")])
+        self.store.upsert([entry(IBAN, 1.0, "2025-03-24")])
+        self.assertEqual([e["date"] for e in self.read()], ["2025-03-24", "2025-03-26"])
+
+    def test_compact(self):
+        self.write([entry(IBAN, -9981.0)] * 5 + [entry(IBAN_2, 1.0), entry(IBAN, -1.0),
+                                                 entry(IBAN, 2.0, "2025-03-20"), {"note": 1}])
+        self.assertEqual(self.store.compact(), (9, 4))
+        self.assertEqual(self.read(), [{"note": 1}, entry(IBAN, 2.0, "2025-03-20"),
+                                       entry(IBAN, -1.0), entry(IBAN_2, 1.0)])
+
+    def test_missing_file(self):
+        os.remove(self.path)
+        with self.assertRaises(AccountManagementException):
+            self.store.upsert([entry(IBAN, 1.0)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+from uc3m_money.batch_validation import validate_ibans, parse_amounts, validate_deposits, \
+    validate_transfer_amounts, VALID, INVALID_IBAN, INVALID_CURRENCY, INVALID_AMOUNT_FORMAT, \
+    TOO_MANY_DECIMALS, AMOUNT_OUT_OF_RANGE
+from uc3m_money.account_manager import AccountManager
+from uc3m_money.amount_cents import float_to_cents
+
+VALID_IBAN = "ES9121000418450200051332"
+
+class TestBatchValidation(unittest.TestCase):
+
+    def test_ibans_match_scalar_validation(self):
+        ibans = [VALID_IBAN, "ES912100041845020005133", "ES91210004184502000513321",
+                 "DE9121000418450200051332", "ES91210004184502000513a2", "", "15"]
+        expected = [AccountManager.validate_iban(iban) for iban in ibans]
+        self.assertEqual(validate_ibans(ibans).tolist(), expected)
+
+    def test_parse_amounts_to_cents(self):
+        cents, errors = parse_amounts(["+2424.42", "-1280.06", "15", "1.5", "1.555", "abc",
+                                       "1.2.3", "", "+"])
+        self.assertEqual(cents.tolist(), [242442, -128006, 1500, 150, 0, 0, 0, 0, 0])
+        self.assertEqual(errors.tolist(), [VALID, VALID, VALID, VALID, TOO_MANY_DECIMALS,
+                                           INVALID_AMOUNT_FORMAT, INVALID_AMOUNT_FORMAT,
+                                           INVALID_AMOUNT_FORMAT, INVALID_AMOUNT_FORMAT])
+
+    def test_deposits(self):
+        cents, errors = validate_deposits(
+            [VALID_IBAN, VALID_IBAN, VALID_IBAN, VALID_IBAN, VALID_IBAN, "INVALID_IBAN"],
+            ["EUR 2500.00", "USD 100.00", "EUR 15000.00", "EUR -100.00", "EUR one hundred",
+             "EUR 100.00"])
+        self.assertEqual(cents.tolist(), [250000, 0, 0, 0, 0, 0])
+        self.assertEqual(errors.tolist(), [VALID, INVALID_CURRENCY, AMOUNT_OUT_OF_RANGE,
+                                           AMOUNT_OUT_OF_RANGE, INVALID_AMOUNT_FORMAT,
+                                           INVALID_IBAN])
+
+    def test_transfer_amounts(self):
+        cents, errors = validate_transfer_amounts([10.0, 10.01, 9999.99, 10000.0, 9.99,
+                                                   10000.01, 10.001, 15.2])
+        self.assertEqual(cents.tolist(), [1000, 1001, 999999, 1000000, 0, 0, 0, 1520])
+        self.assertEqual(errors.tolist(), [VALID, VALID, VALID, VALID, AMOUNT_OUT_OF_RANGE,
+                                           AMOUNT_OUT_OF_RANGE, TOO_MANY_DECIMALS, VALID])
+
+    def test_transfer_amounts_match_scalar_validation(self):
+        amounts = [10.0000000001, 0.1 + 0.2, 1e300, -10.0, float("nan"), float("inf"),
+                   12.345, 2424.42, 0.005 * 2000]
+        _, errors = validate_transfer_amounts(amounts)
+        for amount, error in zip(amounts, errors.tolist()):
+            try:
+                cents = float_to_cents(amount)
+            except ValueError:
+                self.assertEqual(error, TOO_MANY_DECIMALS, amount)
+                continue
+            self.assertEqual(error, VALID if 1000 <= cents <= 1000000 else AMOUNT_OUT_OF_RANGE,
+                             amount)
+
+    def test_empty_batch(self):
+        self.assertEqual(validate_ibans(np.array([], dtype=str)).tolist(), [])
+        self.assertEqual(parse_amounts([])[0].tolist(), [])
+
+if __name__ == "__main__":
+    unittest.main()
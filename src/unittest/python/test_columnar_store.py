@@ -0,0 +1,114 @@
+import unittest
+import os
+import json
+import tempfile
+import numpy as np
+from uc3m_money.columnar_store import ColumnarTransactions, export_transactions, MISSING_DATE
+from uc3m_money.storage import JsonStorage
+from uc3m_money.balance_ledger import BalanceLedger
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+IBAN_3 = "ES8658342044541216872704"
+
+def transaction(iban, amount, date=None):
+    record = {"IBAN": iban, "amount": amount}
+    if date is not None:
+        record["date"] = date
+    return record
+
+class TestColumnarStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp_dir.name, "transactions.json")
+        self.path = os.path.join(self.tmp_dir.name, "transactions.bin")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, transactions):
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump(transactions, f, indent=4)
+
+    def test_balances_match_the_json_file(self):
+        self.write([transaction(IBAN, "+100.10"), transaction(IBAN_2, "-5.05"),
+                    transaction(IBAN, "-0.20"), {"amount": "1.00"}, "not a record",
+                    transaction(IBAN_2, "2.00")])
+        # small batches so the columns are written in several pieces
+        self.assertEqual(export_transactions(self.json_path, self.path, batch_size=2), 4)
+        with ColumnarTransactions(self.path) as columnar:
+            self.assertEqual(len(columnar), 4)
+            self.assertEqual(columnar.balance(IBAN), 99.9)
+            self.assertEqual(columnar.balance(IBAN_2), -3.05)
+            self.assertIsNone(columnar.balance(IBAN_3))
+            self.assertEqual(columnar.balances(), {IBAN: 99.9, IBAN_2: -3.05})
+            self.assertEqual(columnar.balances([IBAN_2, IBAN_3]), {IBAN_2: -3.05})
+            self.assertTrue(columnar.is_current(self.json_path))
+            self.assertIsNone(columnar.dates)
+
+    def test_balances_of_a_list_match_the_ledger(self):
+        ibans = [f"ES{number:022d}" for number in range(50)]
+        self.write([transaction(ibans[number % 50], f"{number % 7 - 3}.{number % 100:02d}")
+                    for number in range(1000)])
+        export_transactions(self.json_path, self.path)
+        ledger = BalanceLedger(self.json_path, os.path.join(self.tmp_dir.name, "ledger.json"))
+        requested = ibans[::3] + [IBAN, ibans[0], "ES" + "9" * 30, "ZZ"]
+        with ColumnarTransactions(self.path) as columnar:
+            self.assertEqual(columnar.balances(requested), ledger.balances(requested))
+            self.assertEqual(columnar.balances(ibans), ledger.balances(None))
+            self.assertEqual(columnar.balances([]), {})
+
+    def test_invalid_amount_raises_only_for_its_iban(self):
+        self.write([transaction(IBAN, "abc"), transaction(IBAN_2, "1.00")])
+        export_transactions(self.json_path, self.path)
+        with ColumnarTransactions(self.path) as columnar:
+            self.assertEqual(columnar.balance(IBAN_2), 1.0)
+            with self.assertRaises(AccountManagementException) as cm:
+                columnar.balance(IBAN)
+            self.assertEqual(cm.exception.message, "Amount format in transactions file is invalid")
+            with self.assertRaises(AccountManagementException):
+                columnar.balances()
+
+    def test_dates_column(self):
+        self.write([transaction(IBAN, "1.00", "2025-03-25"), transaction(IBAN, "2.00")])
+        export_transactions(self.json_path, self.path, with_dates=True)
+        with ColumnarTransactions(self.path) as columnar:
+            self.assertEqual(list(columnar.dates),
+                             [np.datetime64("2025-03-25", "D").astype(int), MISSING_DATE])
+            self.assertEqual(columnar.balance(IBAN), 3.0)
+
+    def test_empty_file(self):
+        self.write([])
+        self.assertEqual(export_transactions(self.json_path, self.path), 0)
+        with ColumnarTransactions(self.path) as columnar:
+            self.assertEqual(columnar.balances(), {})
+            self.assertIsNone(columnar.balance(IBAN))
+
+    def test_invalid_file_raises(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a columnar file" * 10)
+        with self.assertRaises(AccountManagementException) as cm:
+            ColumnarTransactions(self.path)
+        self.assertEqual(cm.exception.message, "Columnar file format is invalid")
+
+    def test_missing_transactions_file_raises(self):
+        with self.assertRaises(AccountManagementException) as cm:
+            export_transactions(self.json_path, self.path)
+        self.assertEqual(cm.exception.message, "Transactions file not found")
+
+    def test_storage_uses_only_a_current_copy(self):
+        self.write([transaction(IBAN, "1.00")])
+        storage = JsonStorage(self.tmp_dir.name)
+        export_transactions(self.json_path, self.path)
+        # the ledger is not built while the copy is current
+        self.assertEqual(storage.balances([IBAN]), {IBAN: 1.0})
+        self.assertFalse(os.path.exists(storage.path(JsonStorage.LEDGER_FILE)))
+        storage.add_transactions([transaction(IBAN, "2.00")])
+        self.assertEqual(storage.balances([IBAN]), {IBAN: 3.0})
+        self.assertTrue(os.path.exists(storage.path(JsonStorage.LEDGER_FILE)))
+        storage.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import json
+import tempfile
+import threading
+from unittest import mock
+from uc3m_money.deposit_spool import DepositSpool, DONE_DIR, REJECTED_DIR, REASON_SUFFIX
+from uc3m_money.storage import JsonStorage
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+class TestDepositSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.inbox = os.path.join(self.tmp_dir.name, "inbox")
+        self.storage = JsonStorage.create(os.path.join(self.tmp_dir.name, "ledger"))
+        self.spool = DepositSpool(self.inbox, storage=self.storage, workers=2, batch_size=3,
+                                  poll_interval=0.01)
+
+    def tearDown(self):
+        self.spool.close()
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def drop(self, name, content):
+        with open(os.path.join(self.inbox, name), "w", encoding="utf-8") as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+
+    def saved_deposits(self):
+        path = self.storage.path(JsonStorage.DEPOSITS_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_files_are_saved_and_moved(self):
+        for number in range(5):
+            self.drop(f"deposit_{number}.json", {"IBAN": IBAN, "AMOUNT": f"EUR {10 + number}.00"})
+        self.drop("bad_iban.json", {"IBAN": "ES12", "AMOUNT": "EUR 10.00"})
+        self.drop("bad_json.json", "{not json")
+        self.drop("small.json", {"IBAN": IBAN_2, "AMOUNT": "EUR 5.00"})
+
+        self.assertEqual(self.spool.process_once(), 8)
+        self.assertEqual(sorted(d["deposit_amount"] for d in self.saved_deposits()),
+                         [10.0, 11.0, 12.0, 13.0, 14.0])
+        self.assertEqual(self.spool.pending(), [])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.inbox, DONE_DIR))),
+                         [f"deposit_{number}.json" for number in range(5)])
+        rejected_dir = os.path.join(self.inbox, REJECTED_DIR)
+        reasons = {}
+        for name in ("bad_iban.json", "bad_json.json", "small.json"):
+            self.assertTrue(os.path.exists(os.path.join(rejected_dir, name)))
+            with open(os.path.join(rejected_dir, name + REASON_SUFFIX), encoding="utf-8") as f:
+                reasons[name] = f.read().strip()
+        self.assertEqual(reasons, {"bad_iban.json": "The iban is invalid.",
+                                   "bad_json.json": "The file is not in JSON format.",
+                                   "small.json": "Amount must be >= 10.00"})
+
+        stats = self.spool.stats()
+        self.assertEqual((stats["files"], stats["accepted"], stats["rejected"]), (8, 5, 3))
+        self.assertGreater(stats["files_per_sec"], 0)
+
+    def test_files_unreadable_or_gone_after_listing(self):
+        self.drop("deposit.json", {"IBAN": IBAN, "AMOUNT": "EUR 10.00"})
+        self.drop("null.json", "null")
+        # reading a directory raises an OSError
+        os.mkdir(os.path.join(self.inbox, "folder.json"))
+        names = ["deposit.json", "folder.json", "gone.json", "null.json"]
+        with mock.patch.object(DepositSpool, "pending", return_value=names):
+            self.assertEqual(self.spool.process_once(), 4)
+        self.assertEqual(len(self.saved_deposits()), 1)
+        rejected_dir = os.path.join(self.inbox, REJECTED_DIR)
+        with open(os.path.join(rejected_dir, "folder.json" + REASON_SUFFIX),
+                  encoding="utf-8") as f:
+            self.assertEqual(f.read().strip(), "The file cannot be read.")
+        self.assertTrue(os.path.exists(os.path.join(rejected_dir, "null.json")))
+        stats = self.spool.stats()
+        self.assertEqual((stats["files"], stats["accepted"], stats["rejected"]), (3, 1, 2))
+
+    def test_unfinished_files_are_ignored(self):
+        self.drop(".deposit.json", {"IBAN": IBAN, "AMOUNT": "EUR 10.00"})
+        self.drop("deposit.json.tmp", {"IBAN": IBAN, "AMOUNT": "EUR 10.00"})
+        self.assertEqual(self.spool.process_once(), 0)
+        self.assertEqual(self.saved_deposits(), [])
+        self.assertEqual(self.spool.stats()["files_per_sec"], 0.0)
+
+    def test_reused_names_do_not_overwrite_done_files(self):
+        for _ in range(2):
+            self.drop("deposit.json", {"IBAN": IBAN, "AMOUNT": "EUR 10.00"})
+            self.spool.process_once()
+        self.assertEqual(sorted(os.listdir(os.path.join(self.inbox, DONE_DIR))),
+                         ["deposit.1.json", "deposit.json"])
+        self.assertEqual(len(self.saved_deposits()), 2)
+
+    def test_run_until_stopped(self):
+        thread = threading.Thread(target=self.spool.run)
+        thread.start()
+        try:
+            self.drop("deposit.json", {"IBAN": IBAN, "AMOUNT": "EUR 10.00"})
+            for _ in range(500):
+                if self.spool.stats()["files"]:
+                    break
+                threading.Event().wait(0.01)
+        finally:
+            self.spool.stop()
+            thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.spool.stats()["accepted"], 1)
+        self.assertEqual(len(self.saved_deposits()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import os
+import json
+import tempfile
+import multiprocessing
+from uc3m_money.file_storage import append_records, atomic_write_json
+from uc3m_money.json_stream import append_json_array
+from uc3m_money.transaction_log import TransactionLog
+from uc3m_money.transfer_index import TransferCodeIndex
+from uc3m_money.account_manager import AccountManager
+from uc3m_money.storage import JsonStorage
+from uc3m_money.account_management_exception import AccountManagementException
+
+PROCESSES = 4
+RECORDS_PER_PROCESS = 50
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+
+def append_worker(path, worker):
+    for n in range(RECORDS_PER_PROCESS):
+        append_records(path, [{"worker": worker, "n": n}])
+
+
+def transfer_worker(log_path, index_path, worker):
+    index = TransferCodeIndex(index_path, TransactionLog(log_path))
+    for n in range(RECORDS_PER_PROCESS):
+        index.add([{"transfer_code": f"{worker}-{n}"}])
+    index.close()
+
+
+def ledger_worker(data_dir, input_dir, worker):
+    """Makes deposits and transfers through the public entry points; every worker
+    also requests the same transfer, which only one of them may store"""
+    with AccountManager(data_dir) as manager:
+        for n in range(RECORDS_PER_PROCESS):
+            input_file = os.path.join(input_dir, f"deposit_{worker}_{n}.json")
+            with open(input_file, "w", encoding="utf-8") as f:
+                json.dump({"IBAN": IBAN, "AMOUNT": f"EUR {10 + n}.{worker:02d}"}, f)
+            manager.deposit_into_account(input_file)
+            manager.transfer_request(IBAN, IBAN_2, f"worker {worker} transfer {n}", "ORDINARY",
+                                     "01/01/2050", 10.0 + n)
+        try:
+            manager.transfer_request(IBAN, IBAN_2, "shared transfer", "URGENT", "01/01/2050",
+                                     100.0)
+        except AccountManagementException as exc:
+            assert exc.message == "Transfer already exists"
+
+
+def run_workers(target, *args):
+    workers = [multiprocessing.Process(target=target, args=args + (worker,))
+               for worker in range(PROCESSES)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+
+class TestFileStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "deposits.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_atomic_write_leaves_no_temporary_file(self):
+        atomic_write_json(self.path, [{"n": 1}])
+        self.assertEqual(self.read(), [{"n": 1}])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["deposits.json"])
+
+    def test_append_creates_the_file(self):
+        append_records(self.path, [{"n": 1}])
+        append_records(self.path, [{"n": 2}])
+        self.assertEqual(self.read(), [{"n": 1}, {"n": 2}])
+
+    def test_corrupted_file_is_not_overwritten(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('[{"n": 1}, {"n": ')
+        with self.assertRaises(AccountManagementException):
+            append_records(self.path, [{"n": 2}])
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), '[{"n": 1}, {"n": ')
+
+    def test_interrupted_append_is_rolled_back(self):
+        atomic_write_json(self.path, [{"n": 1}])
+        journal_path = self.path + ".journal"
+        append_json_array(self.path, [{"n": 2}], journal_path=journal_path)
+        # simulate a crash after the write but before the journal removal
+        with open(journal_path, "w", encoding="utf-8") as f:
+            json.dump({"offset": len(json.dumps([{"n": 1}], indent=4)) - 2, "tail": b"\n]".hex()}, f)
+        append_records(self.path, [{"n": 3}])
+        self.assertEqual(self.read(), [{"n": 1}, {"n": 3}])
+        self.assertFalse(os.path.exists(journal_path))
+
+    def test_concurrent_appends_lose_no_update(self):
+        atomic_write_json(self.path, [])
+        run_workers(append_worker, self.path)
+        records = self.read()
+        self.assertEqual(len(records), PROCESSES * RECORDS_PER_PROCESS)
+        self.assertEqual(len({(r["worker"], r["n"]) for r in records}), len(records))
+
+    def test_concurrent_transfers_lose_no_update(self):
+        log_path = os.path.join(self.tmp_dir.name, "log.jsonl")
+        index_path = os.path.join(self.tmp_dir.name, "log.idx")
+        run_workers(transfer_worker, log_path, index_path)
+        codes = [record["transfer_code"] for record in TransactionLog(log_path)]
+        self.assertEqual(len(codes), PROCESSES * RECORDS_PER_PROCESS)
+        self.assertEqual(len(set(codes)), len(codes))
+
+    def test_concurrent_deposits_and_transfer_requests_lose_no_update(self):
+        data_dir = os.path.join(self.tmp_dir.name, "ledger")
+        input_dir = os.path.join(self.tmp_dir.name, "input")
+        os.mkdir(input_dir)
+        JsonStorage.create(data_dir).close()
+        run_workers(ledger_worker, data_dir, input_dir)
+        with open(os.path.join(data_dir, JsonStorage.DEPOSITS_FILE), encoding="utf-8") as f:
+            deposits = json.load(f)
+        self.assertEqual(len(deposits), PROCESSES * RECORDS_PER_PROCESS)
+        self.assertEqual(len({d["deposit_amount"] for d in deposits}), len(deposits))
+        transfers = list(TransactionLog(os.path.join(data_dir, JsonStorage.TRANSFER_LOG)))
+        self.assertEqual(len(transfers), PROCESSES * RECORDS_PER_PROCESS + 1)
+        self.assertEqual(len({t["transfer_code"] for t in transfers}), len(transfers))
+        self.assertEqual(
+            sum(t["transfer_concept"] == "shared transfer" for t in transfers), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import threading
+from uc3m_money.group_commit import GroupCommitWriter
+from uc3m_money.account_management_exception import AccountManagementException
+
+class TestGroupCommitWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.committed = []
+        self.lock = threading.Lock()
+
+    def commit(self, records):
+        with self.lock:
+            self.committed.append(list(records))
+        return [record * 2 for record in records]
+
+    def submit_concurrently(self, writer, records):
+        results = {}
+        def worker(record):
+            try:
+                results[record] = writer.submit(record)
+            except AccountManagementException as exc:
+                results[record] = exc
+        threads = [threading.Thread(target=worker, args=(r,)) for r in records]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_records_are_grouped(self):
+        writer = GroupCommitWriter(self.commit, max_batch=16, max_delay=0.05)
+        results = self.submit_concurrently(writer, range(64))
+        writer.close()
+        self.assertEqual(results, {r: r * 2 for r in range(64)})
+        self.assertLess(writer.batches, 64)
+        self.assertTrue(all(len(batch) <= 16 for batch in self.committed))
+        self.assertEqual(sorted(r for batch in self.committed for r in batch), list(range(64)))
+
+    def test_single_record_is_committed_after_the_delay(self):
+        writer = GroupCommitWriter(self.commit, max_batch=16, max_delay=0.001)
+        self.assertEqual(writer.submit(21), 42)
+        writer.close()
+        self.assertEqual(self.committed, [[21]])
+
+    def test_returned_exception_is_raised_to_its_caller_only(self):
+        def commit(records):
+            return [AccountManagementException("rejected") if r == 3 else r for r in records]
+        writer = GroupCommitWriter(commit, max_batch=8, max_delay=0.05)
+        results = self.submit_concurrently(writer, range(6))
+        writer.close()
+        self.assertIsInstance(results[3], AccountManagementException)
+        self.assertEqual([results[r] for r in (0, 1, 2, 4, 5)], [0, 1, 2, 4, 5])
+
+    def test_failing_commit_is_raised_to_every_caller(self):
+        def commit(records):
+            raise AccountManagementException("disk full")
+        writer = GroupCommitWriter(commit, max_batch=8, max_delay=0.05)
+        results = self.submit_concurrently(writer, range(4))
+        writer.close()
+        self.assertTrue(all(isinstance(r, AccountManagementException) for r in results.values()))
+
+    def test_submit_after_close_is_rejected(self):
+        writer = GroupCommitWriter(self.commit)
+        writer.close()
+        with self.assertRaises(AccountManagementException):
+            writer.submit(1)
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(AccountManagementException):
+            GroupCommitWriter(self.commit, max_batch=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money.json_stream import iter_json_array, append_json_array
+from uc3m_money.account_management_exception import AccountManagementException
+
+class TestJsonStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "data.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_elements_across_chunks(self):
+        data = [{"IBAN": "ES8658342044541216872704", "amount": "-1280.06", "n": "ñ" * i}
+                for i in range(50)]
+        self.write(json.dumps(data, indent=4))
+        elements = [e for _, e in iter_json_array(self.path, chunk_size=7)]
+        self.assertEqual(elements, data)
+
+    def test_resume_from_offset(self):
+        data = [{"n": i} for i in range(10)]
+        self.write(json.dumps(data, indent=4))
+        offsets = [offset for offset, _ in iter_json_array(self.path)]
+        resumed = [e for _, e in iter_json_array(self.path, offsets[4], chunk_size=3)]
+        self.assertEqual(resumed, data[5:])
+
+    def test_empty_array(self):
+        self.write("[]")
+        self.assertEqual(list(iter_json_array(self.path)), [])
+
+    def test_empty_file(self):
+        self.write("")
+        with self.assertRaises(AccountManagementException):
+            list(iter_json_array(self.path))
+
+    def test_not_an_array(self):
+        self.write('{"n": 1}')
+        with self.assertRaises(AccountManagementException):
+            list(iter_json_array(self.path))
+
+    def test_truncated_file(self):
+        self.write('[{"n": 1}, {"n": ')
+        with self.assertRaises(AccountManagementException):
+            list(iter_json_array(self.path))
+
+    def test_append_keeps_indented_format(self):
+        self.write(json.dumps([], indent=4))
+        append_json_array(self.path, [{"n": 1}])
+        append_json_array(self.path, [{"n": 2}, {"n": [3, 4]}])
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps([{"n": 1}, {"n": 2}, {"n": [3, 4]}], indent=4))
+
+    def test_append_to_corrupted_file(self):
+        self.write('[{"n": 1}, {"n": ')
+        with self.assertRaises(AccountManagementException):
+            append_json_array(self.path, [{"n": 2}])
+
+if __name__ == "__main__":
+    unittest.main()
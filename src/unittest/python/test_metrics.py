@@ -0,0 +1,113 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money import metrics
+from uc3m_money.metrics import MetricsRegistry
+from uc3m_money.account_deposit import deposit_into_account
+from uc3m_money.account_balance import calculate_balance, balance_cache
+from uc3m_money.transfer_request import transfer_requests_bulk
+from uc3m_money.storage import JsonStorage, set_storage
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_prometheus_format(self):
+        registry = MetricsRegistry()
+        registry.increment(metrics.RECORDS_WRITTEN, 2, (("file", "Deposits"),))
+        registry.increment(metrics.RECORDS_WRITTEN, 3, (("file", "Deposits"),))
+        registry.increment(metrics.VALIDATION_FAILURES, 1, (("reason", 'a "quoted"\nreason'),))
+        registry.observe(metrics.STAGE_SECONDS, 0.5, (("stage", "load"),))
+        registry.observe(metrics.STAGE_SECONDS, 0.25, (("stage", "load"),))
+        self.assertEqual(registry.to_prometheus(),
+                         '# TYPE uc3m_money_records_written_total counter\n'
+                         'uc3m_money_records_written_total{file="Deposits"} 5\n'
+                         '# TYPE uc3m_money_validation_failures_total counter\n'
+                         'uc3m_money_validation_failures_total{reason="a \\"quoted\\"\\nreason"} 1\n'
+                         '# TYPE uc3m_money_stage_seconds summary\n'
+                         'uc3m_money_stage_seconds_count{stage="load"} 2\n'
+                         'uc3m_money_stage_seconds_sum{stage="load"} 0.75\n')
+        self.assertEqual(registry.counter(metrics.RECORDS_WRITTEN, file="Deposits"), 5)
+        self.assertEqual(registry.summary(metrics.STAGE_SECONDS, stage="load"), (2, 0.75))
+
+    def test_disabled_does_nothing(self):
+        metrics.set_sink(None)
+        self.assertFalse(metrics.enabled())
+        with metrics.timed("deposit", "load"):
+            metrics.increment(metrics.RECORDS_WRITTEN)
+        self.assertIsNone(metrics.get_sink())
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = JsonStorage(self.tmp_dir.name)
+        for file_name in (JsonStorage.TRANSACTIONS_FILE, JsonStorage.BALANCES_FILE,
+                          JsonStorage.DEPOSITS_FILE):
+            self.write(file_name, [])
+        set_storage(self.storage)
+        balance_cache().clear()
+        self.registry = metrics.enable()
+        self.registry.clear()
+
+    def tearDown(self):
+        metrics.set_sink(None)
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    def write(self, file_name, data):
+        path = os.path.join(self.tmp_dir.name, file_name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        return path
+
+    def test_deposit(self):
+        deposit_into_account(self.write("input.json", {"IBAN": IBAN, "AMOUNT": "EUR 100.00"}))
+        with self.assertRaises(AccountManagementException):
+            deposit_into_account(self.write("input.json", {"IBAN": IBAN, "AMOUNT": "USD 100.00"}))
+        for stage in ("load", "validate", "hash", "write"):
+            count = self.registry.summary(metrics.STAGE_SECONDS, operation="deposit", stage=stage)[0]
+            self.assertEqual(count, 1 if stage in ("hash", "write") else 2)
+        self.assertEqual(self.registry.counter(metrics.RECORDS_WRITTEN, file="Deposits"), 1)
+        self.assertGreater(self.registry.counter(metrics.BYTES_WRITTEN, file="Deposits"), 0)
+        self.assertGreater(self.registry.counter(metrics.BYTES_READ, file="Deposit input"), 0)
+        self.assertEqual(self.registry.counter(metrics.VALIDATION_FAILURES, operation="deposit",
+                                               reason="Currency must be EUR."), 1)
+
+    def test_transfer_duplicates(self):
+        transfer = (IBAN, IBAN_2, "metrics test transfer", "ORDINARY", "01/01/2050", 100.0)
+        results = transfer_requests_bulk([transfer, transfer, transfer[:5] + (1.0,)])
+        self.assertIsInstance(results[1], AccountManagementException)
+        self.assertEqual(self.registry.counter(metrics.RECORDS_WRITTEN, file="Transfers"), 1)
+        self.assertEqual(self.registry.counter(metrics.DUPLICATES, operation="transfer"), 1)
+        self.assertEqual(self.registry.counter(
+            metrics.VALIDATION_FAILURES, operation="transfer",
+            reason="Amount is not within the allowed range (10.00 to 10000.00)."), 1)
+
+    def test_failure_reasons_do_not_hold_the_input(self):
+        transfers = [(IBAN, IBAN_2, "metrics test transfer", f"TYPE{number}", "01/01/2050", 100.0)
+                     for number in range(100)]
+        results = transfer_requests_bulk(transfers)
+        self.assertEqual(results[7].message, "Invalid transfer type: TYPE7.")
+        self.assertEqual(self.registry.counter(metrics.VALIDATION_FAILURES, operation="transfer",
+                                               reason="Invalid transfer type."), 100)
+        self.assertEqual(self.registry.to_prometheus().count("validation_failures_total{"), 1)
+
+    def test_balance_scan(self):
+        self.write(JsonStorage.TRANSACTIONS_FILE,
+                   [{"IBAN": IBAN, "amount": "+10.00"}, {"IBAN": IBAN_2, "amount": "-5.00"}])
+        calculate_balance(IBAN)
+        self.assertEqual(self.registry.counter(metrics.RECORDS_SCANNED, file="Transactions"), 2)
+        self.assertEqual(self.registry.counter(metrics.RECORDS_WRITTEN, file="Balances"), 1)
+        self.assertEqual(self.registry.summary(metrics.STAGE_SECONDS, operation="balance",
+                                               stage="sum")[0], 1)
+        with self.assertRaises(AccountManagementException):
+            calculate_balance("ES00")
+        self.assertIn('uc3m_money_validation_failures_total{operation="balance",'
+                      'reason="IBAN is not valid"} 1', self.registry.to_prometheus())
+
+if __name__ == '__main__':
+    unittest.main()
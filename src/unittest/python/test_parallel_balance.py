@@ -0,0 +1,55 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money.parallel_balance import sum_transactions
+from uc3m_money.balance_ledger import BalanceLedger
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBANS = ["ES9121000418450200051332", "ES9820385778983000760236", "ES8658342044541216872704"]
+
+class TestSumTransactions(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, transactions, indent=4):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(transactions, f, indent=indent)
+        return path
+
+    def test_chunks_match_the_ledger(self):
+        transactions = [{"IBAN": IBANS[i % 3], "amount": f"{'-' if i % 4 else '+'}{i}.{i % 100:02d}",
+                         "details": {"note": "x\n  {" * (i % 2)}} for i in range(2000)]
+        path = self.write("transactions.json", transactions)
+        ledger = BalanceLedger(path, os.path.join(self.tmp_dir.name, "ledger.json"))
+        expected = {iban: round(amount * 100) for iban, amount in ledger.balances().items()}
+        for workers, chunk_size in ((1, 1000), (2, 1000), (2, 10 ** 9)):
+            cents, invalid = sum_transactions([path], workers, chunk_size)
+            self.assertEqual(cents, expected)
+            self.assertEqual(invalid, set())
+
+    def test_shards_and_compact_files(self):
+        first = self.write("a.json", [{"IBAN": IBANS[0], "amount": "+1.00"}] * 50)
+        second = self.write("b.json", [{"IBAN": IBANS[0], "amount": "2"},
+                                       {"IBAN": IBANS[1], "amount": "bad"}], indent=None)
+        empty = self.write("c.json", [])
+        cents, invalid = sum_transactions([first, second, empty], workers=2, chunk_size=100)
+        self.assertEqual(cents, {IBANS[0]: 5200, IBANS[1]: 0})
+        self.assertEqual(invalid, {IBANS[1]})
+
+    def test_corrupted_file(self):
+        path = os.path.join(self.tmp_dir.name, "bad.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('[\n    {"IBAN": "ES91", "amount": "1"},\n    {"IBAN": ')
+        with self.assertRaises(AccountManagementException):
+            sum_transactions([path], workers=1, chunk_size=10)
+        with self.assertRaises(AccountManagementException):
+            sum_transactions([os.path.join(self.tmp_dir.name, "missing.json")])
+
+if __name__ == "__main__":
+    unittest.main()
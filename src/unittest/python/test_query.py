@@ -0,0 +1,104 @@
+import unittest
+import os
+import json
+import tempfile
+from datetime import date, datetime, timezone
+from uc3m_money.query import RecordQuery
+from uc3m_money.storage import JsonStorage
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+IBAN_3 = "ES8658342044541216872704"
+
+def transfer(number, from_iban, to_iban, transfer_date):
+    return {"from_iban": from_iban, "to_iban": to_iban, "transfer_concept": f"query test {number}",
+            "transfer_type": "ORDINARY", "transfer_date": transfer_date, "transfer_amount": 10.0,
+            "time_stamp": 1742942110.0, "transfer_code": f"{number:032x}"}
+
+def deposit(number, to_iban, when):
+    return {"alg": "SHA-256", "type": "DEPOSIT", "to_iban": to_iban, "deposit_amount": 10.0,
+            "deposit_date": when.timestamp(), "deposit_signature": f"{number:064x}"}
+
+def utc(year, month, day, hour=0):
+    return datetime(year, month, day, hour, tzinfo=timezone.utc)
+
+class TestRecordQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = JsonStorage(self.tmp_dir.name)
+        with open(self.storage.path(JsonStorage.DEPOSITS_FILE), "w", encoding="utf-8") as f:
+            json.dump([], f)
+        self.transfers = [transfer(0, IBAN, IBAN_2, "01/03/2026"),
+                          transfer(1, IBAN, IBAN_3, "15/03/2026"),
+                          transfer(2, IBAN_2, IBAN, "31/03/2026"),
+                          transfer(3, IBAN, IBAN_2, "01/04/2026")]
+        self.deposits = [deposit(0, IBAN, utc(2026, 2, 28, 23)),
+                         deposit(1, IBAN, utc(2026, 3, 1)),
+                         deposit(2, IBAN_2, utc(2026, 3, 20)),
+                         deposit(3, IBAN, utc(2026, 3, 31, 23))]
+        self.storage.add_transfers(self.transfers)
+        self.storage.add_deposits(self.deposits)
+        self.query = RecordQuery(self.storage)
+
+    def tearDown(self):
+        self.query.close()
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def test_transfers_by_iban_and_date(self):
+        self.assertEqual(list(self.query.transfers(from_iban=IBAN)),
+                         [self.transfers[0], self.transfers[1], self.transfers[3]])
+        self.assertEqual(list(self.query.transfers(from_iban=IBAN, start="01/03/2026",
+                                                   end=date(2026, 3, 31))),
+                         self.transfers[:2])
+        self.assertEqual(list(self.query.transfers(to_iban=IBAN_2, start="02/03/2026")),
+                         [self.transfers[3]])
+        self.assertEqual(list(self.query.transfers(start="15/03/2026", end="31/03/2026")),
+                         self.transfers[1:3])
+        self.assertEqual(list(self.query.transfers(from_iban=IBAN_3)), [])
+
+    def test_deposits_in_a_month(self):
+        march = list(self.query.deposits(to_iban=IBAN, start=date(2026, 3, 1),
+                                         end=date(2026, 3, 31)))
+        self.assertEqual(march, [self.deposits[1], self.deposits[3]])
+        self.assertEqual(list(self.query.deposits(end=utc(2026, 3, 1))), self.deposits[:2])
+        self.assertEqual(len(list(self.query.deposits())), 4)
+
+    def test_appended_records_are_indexed(self):
+        list(self.query.transfers())
+        new_transfer = transfer(4, IBAN_3, IBAN, "10/03/2026")
+        new_deposit = deposit(4, IBAN_3, utc(2026, 3, 10))
+        self.storage.add_transfers([new_transfer])
+        self.storage.add_deposits([new_deposit])
+        self.assertEqual(list(self.query.transfers(from_iban=IBAN_3)), [new_transfer])
+        self.assertEqual(list(self.query.deposits(to_iban=IBAN_3)), [new_deposit])
+
+    def test_index_is_persisted_and_rebuilt_if_the_file_changes(self):
+        list(self.query.deposits())
+        self.query.close()
+        self.query = RecordQuery(self.storage)
+        self.assertEqual(list(self.query.deposits(to_iban=IBAN_2)), [self.deposits[2]])
+        with open(self.storage.path(JsonStorage.DEPOSITS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.deposits[2:], f, indent=4)
+        self.assertEqual(list(self.query.deposits(to_iban=IBAN)), [self.deposits[3]])
+        self.assertTrue(os.path.exists(self.storage.path(JsonStorage.QUERY_INDEX)))
+
+    def test_log_shortened_after_the_query(self):
+        results = self.query.transfers()
+        log_path = self.storage.path(JsonStorage.TRANSFER_LOG)
+        with open(log_path, "rb") as f:
+            first_line = f.readline()
+        with open(log_path, "wb") as f:
+            f.write(first_line)
+        self.assertEqual(list(results), self.transfers[:1])
+
+    def test_invalid_bounds_raise(self):
+        with self.assertRaises(AccountManagementException):
+            self.query.transfers(start="2026-03-01")
+        with self.assertRaises(AccountManagementException):
+            self.query.deposits(start="yesterday")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from array import array
+from uc3m_money.account_deposit import AccountDeposit
+from uc3m_money.transfer_request import TransferRequest
+from uc3m_money.record_columns import DepositColumns, TransferColumns
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+class TestRecords(unittest.TestCase):
+
+    def test_deposit_signature_is_cached_until_a_field_changes(self):
+        deposit = AccountDeposit(IBAN, 100.0)
+        signature = deposit.deposit_signature
+        self.assertEqual(deposit.deposit_signature, signature)
+        self.assertEqual(deposit.to_json()["deposit_signature"], signature)
+        deposit.deposit_amount = 200.0
+        self.assertNotEqual(deposit.deposit_signature, signature)
+        self.assertEqual(deposit.to_json()["deposit_amount"], 200.0)
+
+    def test_deposit_amount_strings(self):
+        self.assertEqual(AccountDeposit(IBAN, "10.50").deposit_cents, 1050)
+        self.assertEqual(AccountDeposit(IBAN, "1e3").deposit_cents, 100000)
+        for amount, message in (("10.555", "Amount must have 2 decimal places"),
+                                ("ten", "Invalid amount format"),
+                                ("9.99", "Amount must be >= 10.00")):
+            with self.assertRaises(AccountManagementException) as cm:
+                AccountDeposit(IBAN, amount)
+            self.assertEqual(cm.exception.message, message)
+
+    def test_transfer_amount_cents_follows_the_amount(self):
+        transfer = TransferRequest(IBAN, IBAN_2, "cents test", "ORDINARY", "01/01/2050", 10.5)
+        self.assertEqual(transfer.transfer_amount_cents, 1050)
+        transfer.transfer_amount = 20.25
+        self.assertEqual(transfer.transfer_amount_cents, 2025)
+        # cents worked out by the validator are kept until the amount changes
+        transfer = TransferRequest(IBAN, IBAN_2, "cents test", "ORDINARY", "01/01/2050",
+                                   10.5, 1050)
+        self.assertEqual((transfer.transfer_amount, transfer.transfer_amount_cents), (10.5, 1050))
+        transfer.transfer_amount = 30.0
+        self.assertEqual(transfer.transfer_amount_cents, 3000)
+
+    def test_records_have_no_instance_dict(self):
+        self.assertFalse(hasattr(AccountDeposit(IBAN, 100.0), "__dict__"))
+        transfer = TransferRequest(IBAN, IBAN_2, "slots test", "ORDINARY", "01/01/2050", 10.0)
+        self.assertFalse(hasattr(transfer, "__dict__"))
+        with self.assertRaises(AttributeError):
+            transfer.unknown_field = 1
+
+class TestRecordColumns(unittest.TestCase):
+
+    def test_deposits_round_trip(self):
+        deposits = [AccountDeposit(IBAN, 10.0 + number) for number in range(5)]
+        columns = DepositColumns(deposits)
+        self.assertEqual(len(columns), 5)
+        self.assertEqual(list(columns), [deposit.to_json() for deposit in deposits])
+        self.assertEqual(columns[-1], deposits[-1].to_json())
+        self.assertIsInstance(columns.column("deposit_amount"), array)
+        self.assertEqual(sum(columns.column("deposit_amount")), 60.0)
+        # the IBAN of every record is the same string object
+        self.assertIs(columns[0]["to_iban"], columns[4]["to_iban"])
+        with self.assertRaises(IndexError):
+            columns[5]  # pylint: disable=pointless-statement
+
+    def test_transfers_round_trip(self):
+        transfers = [TransferRequest(IBAN, IBAN_2, f"columns test {number}", "URGENT",
+                                     "01/01/2050", 10.5) for number in range(3)]
+        columns = TransferColumns()
+        columns.extend(transfer.to_json() for transfer in transfers)
+        self.assertEqual(list(columns), [transfer.to_json() for transfer in transfers])
+        self.assertEqual(columns.column("transfer_code"),
+                         [transfer.transfer_code for transfer in transfers])
+
+    def test_invalid_record_is_not_added(self):
+        columns = DepositColumns()
+        record = AccountDeposit(IBAN, 100.0).to_json()
+        for field, value in (("deposit_signature", "ABC"), ("deposit_amount", "100.0"),
+                             ("to_iban", None)):
+            with self.assertRaises(AccountManagementException) as cm:
+                columns.append(dict(record, **{field: value}))
+            self.assertEqual(cm.exception.message,
+                             "The record does not fit the DepositColumns columns")
+        self.assertEqual(len(columns), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+from uc3m_money.service import MoneyServer
+from uc3m_money.storage import JsonStorage, set_storage
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+class TestMoneyServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for file_name, content in ((JsonStorage.TRANSACTIONS_FILE, [{"IBAN": IBAN, "amount": "+12.50"}]),
+                                   (JsonStorage.BALANCES_FILE, [])):
+            with open(os.path.join(self.tmp_dir.name, file_name), "w", encoding="utf-8") as f:
+                json.dump(content, f)
+        set_storage(JsonStorage(self.tmp_dir.name))
+        self.server = MoneyServer(port=0, max_workers=2, max_pipeline=4)
+        await self.server.start()
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.server.close()
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    async def send(self, *lines):
+        for line in lines:
+            self.writer.write((line if isinstance(line, str) else json.dumps(line)).encode() + b"\n")
+        await self.writer.drain()
+        responses = [json.loads(await self.reader.readline()) for _ in lines]
+        return {response["id"]: response for response in responses}
+
+    async def test_pipelined_requests(self):
+        requests = [{"id": 1, "method": "calculate_balance", "params": {"iban": IBAN}},
+                    {"id": 2, "method": "deposit_into_account",
+                     "params": {"IBAN": IBAN, "AMOUNT": "EUR 100.00"}}]
+        requests += [{"id": 10 + i, "method": "transfer_request",
+                      "params": {"from_iban": IBAN, "to_iban": IBAN_2, "concept": f"service test {i}",
+                                 "transfer_type": "ORDINARY", "date": "01/01/2050", "amount": 20.0}}
+                     for i in range(8)]
+        responses = await self.send(*requests)
+        self.assertIs(responses[1]["result"], True)
+        self.assertEqual(len(responses[2]["result"]), 64)
+        for i in range(8):
+            self.assertEqual(len(responses[10 + i]["result"]), 32)
+
+    async def test_errors(self):
+        duplicate = {"id": 2, "method": "transfer_request",
+                     "params": {"from_iban": IBAN, "to_iban": IBAN_2, "concept": "service duplicate",
+                                "transfer_type": "ORDINARY", "date": "01/01/2050", "amount": 20.0}}
+        await self.send(duplicate)
+        responses = await self.send({"id": 1, "method": "calculate_balance", "params": {"iban": "ES00"}},
+                                    duplicate,
+                                    {"id": 3, "method": "unknown"},
+                                    {"id": 4, "method": "calculate_balance", "params": {}},
+                                    "not json")
+        self.assertEqual(responses[1]["error"], "IBAN is not valid")
+        self.assertEqual(responses[2]["error"], "Transfer already exists")
+        self.assertIn("Unknown method", responses[3]["error"])
+        self.assertIn("Missing parameter", responses[4]["error"])
+        self.assertIn(None, responses)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import json
+import tempfile
+from unittest import mock
+from uc3m_money import parallel_balance
+from uc3m_money.sharded_storage import ShardedStorage, shard_of
+from uc3m_money.storage import JsonStorage, storage_from_config
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBANS = ["ES9121000418450200051332", "ES9820385778983000760236", "ES8658342044541216872704",
+         "ES3559005439021242088295", "ES7620770024003102575766", "ES3000491500051234567892"]
+
+def transfer(from_iban, code):
+    return {"from_iban": from_iban, "to_iban": IBANS[0], "transfer_concept": "shard test",
+            "transfer_type": "ORDINARY", "transfer_date": "01/01/2050",
+            "transfer_amount": 10.0, "time_stamp": 0.0, "transfer_code": code}
+
+class TestShardedStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = ShardedStorage.json_shards(self.tmp_dir.name, 4)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def read_shard(self, number, file_name):
+        with open(self.storage.shards[number].path(file_name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_shard_is_stable(self):
+        self.assertEqual(shard_of(IBANS[0], 4), shard_of(IBANS[0], 4))
+        self.assertEqual({shard_of(iban, 1) for iban in IBANS}, {0})
+
+    def test_transactions_are_routed_and_summed(self):
+        self.storage.add_transactions([{"IBAN": iban, "amount": "+1.50"} for iban in IBANS] * 2)
+        for number in range(4):
+            stored = self.read_shard(number, JsonStorage.TRANSACTIONS_FILE)
+            self.assertTrue(all(shard_of(t["IBAN"], 4) == number for t in stored))
+        self.assertEqual(self.storage.balances([IBANS[0], IBANS[1]]), {IBANS[0]: 3.0, IBANS[1]: 3.0})
+        self.assertEqual(self.storage.balances(), {iban: 3.0 for iban in IBANS})
+        self.assertEqual(self.storage.recompute_balances([IBANS[2]], workers=1), {IBANS[2]: 3.0})
+
+    def test_recompute_sums_the_shards_at_once(self):
+        self.storage.add_transactions([{"IBAN": iban, "amount": "+1.50"} for iban in IBANS])
+        with mock.patch.object(parallel_balance, "sum_transactions",
+                               wraps=parallel_balance.sum_transactions) as summed:
+            self.assertEqual(self.storage.recompute_balances(workers=2),
+                             {iban: 1.5 for iban in IBANS})
+            self.assertEqual(self.storage.recompute_balances(iter(IBANS[:2]), workers=1),
+                             {IBANS[0]: 1.5, IBANS[1]: 1.5})
+        self.assertEqual(summed.call_count, 2)
+        self.assertEqual(len(summed.call_args_list[0].args[0]), 4)
+        self.assertEqual(len(summed.call_args_list[1].args[0]),
+                         len({shard_of(iban, 4) for iban in IBANS[:2]}))
+
+    def test_import_transactions(self):
+        path = os.path.join(self.tmp_dir.name, "import.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([{"IBAN": iban, "amount": "+2.00"} for iban in IBANS], f, indent=4)
+        self.storage.import_transactions(path, batch_size=4)
+        for number in range(4):
+            stored = self.read_shard(number, JsonStorage.TRANSACTIONS_FILE)
+            self.assertTrue(all(shard_of(t["IBAN"], 4) == number for t in stored))
+        self.assertEqual(self.storage.balances(), {iban: 2.0 for iban in IBANS})
+
+    def test_transfers_are_deduplicated(self):
+        self.storage.add_transfers([transfer(IBANS[0], "a")])
+        accepted = self.storage.add_transfers([transfer(IBANS[1], "b"), transfer(IBANS[0], "a"),
+                                               transfer(IBANS[2], "c")])
+        self.assertEqual([record["transfer_code"] for record in accepted], ["b", "c"])
+
+    def test_deposits_and_balances_are_routed(self):
+        self.storage.add_balances([{"iban": IBANS[3], "amount": 1.0, "date": "2025-03-25"}])
+        number = shard_of(IBANS[3], 4)
+        self.assertEqual(len(self.read_shard(number, JsonStorage.BALANCES_FILE)), 1)
+        self.storage.add_deposits([{"to_iban": IBANS[3], "deposit_amount": 10.0}])
+        self.assertEqual(len(self.read_shard(number, JsonStorage.DEPOSITS_FILE)), 1)
+
+    def test_shard_count_cannot_change(self):
+        with self.assertRaises(AccountManagementException):
+            ShardedStorage.json_shards(self.tmp_dir.name, 8)
+        storage = storage_from_config(f"sharded:4:{self.tmp_dir.name}")
+        self.assertEqual(len(storage.shards), 4)
+        storage.close()
+
+if __name__ == "__main__":
+    unittest.main()
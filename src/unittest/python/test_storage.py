@@ -0,0 +1,122 @@
+import unittest
+import os
+import json
+import tempfile
+from unittest import mock
+from uc3m_money.storage import (JsonStorage, get_storage, set_storage, storage_from_config,
+                                STORAGE_VARIABLE)
+from uc3m_money.sqlite_storage import SqliteStorage
+from uc3m_money.account_balance import calculate_balance
+from uc3m_money.transfer_request import transfer_request
+from uc3m_money.account_management_exception import AccountManagementException
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+def transfer(code, amount=10.0):
+    return {"from_iban": IBAN, "to_iban": IBAN_2, "transfer_concept": "storage test",
+            "transfer_type": "ORDINARY", "transfer_date": "01/01/2050",
+            "transfer_amount": amount, "time_stamp": 0.0, "transfer_code": code}
+
+class StorageContract:
+    """Tests run against every storage backend"""
+
+    def create_storage(self, directory):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = self.create_storage(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def test_transfers_skip_duplicates(self):
+        self.storage.add_transfers([transfer("a")])
+        accepted = self.storage.add_transfers([transfer("a"), transfer("b"), transfer("b")])
+        self.assertEqual([record["transfer_code"] for record in accepted], ["b"])
+
+    def test_balances(self):
+        self.storage.add_transactions([{"IBAN": IBAN, "amount": "+10.05"},
+                                       {"IBAN": IBAN, "amount": "-0.10"},
+                                       {"IBAN": IBAN_2, "amount": "2"}])
+        self.assertEqual(self.storage.balances([IBAN, "ES0000000000000000000000"]),
+                         {IBAN: 9.95})
+        self.assertEqual(self.storage.balances(), {IBAN: 9.95, IBAN_2: 2.0})
+
+    def test_invalid_amount(self):
+        self.storage.add_transactions([{"IBAN": IBAN, "amount": "ten"},
+                                       {"IBAN": IBAN_2, "amount": "2"}])
+        self.assertEqual(self.storage.balances([IBAN_2]), {IBAN_2: 2.0})
+        with self.assertRaises(AccountManagementException):
+            self.storage.balances([IBAN])
+
+    def test_import_transactions(self):
+        path = os.path.join(self.tmp_dir.name, "import.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([{"IBAN": IBAN, "amount": "+1.50"}] * 3, f, indent=4)
+        self.storage.import_transactions(path, batch_size=2)
+        self.assertEqual(self.storage.balances([IBAN]), {IBAN: 4.5})
+
+class TestJsonStorage(StorageContract, unittest.TestCase):
+
+    def create_storage(self, directory):
+        for file_name in (JsonStorage.TRANSACTIONS_FILE, JsonStorage.BALANCES_FILE):
+            with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+                json.dump([], f)
+        return JsonStorage(directory)
+
+    def test_balances_are_appended(self):
+        self.storage.add_balances([{"iban": IBAN, "amount": 1.5, "date": "2025-03-25"}])
+        with open(self.storage.path(JsonStorage.BALANCES_FILE), encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [{"iban": IBAN, "amount": 1.5, "date": "2025-03-25"}])
+
+class TestSqliteStorage(StorageContract, unittest.TestCase):
+
+    def create_storage(self, directory):
+        return SqliteStorage(os.path.join(directory, "test.db"))
+
+    def test_wal_mode(self):
+        with open(os.path.join(self.tmp_dir.name, "test.db"), "rb") as f:
+            header = f.read(20)
+        # file format versions 2 mean WAL
+        self.assertEqual(header[18:20], b"\x02\x02")
+
+    def test_package_functions_use_the_storage(self):
+        set_storage(self.storage)
+        try:
+            self.storage.add_transactions([{"IBAN": IBAN, "amount": "+25.00"}])
+            self.assertTrue(calculate_balance(IBAN))
+            code = transfer_request(IBAN, IBAN_2, "sqlite storage test", "ORDINARY",
+                                    "01/01/2050", 15.0)
+            with self.assertRaises(AccountManagementException):
+                transfer_request(IBAN, IBAN_2, "sqlite storage test", "ORDINARY",
+                                 "01/01/2050", 15.0)
+            self.assertEqual(len(code), 32)
+        finally:
+            set_storage(None)
+        self.storage = self.create_storage(self.tmp_dir.name)
+
+class TestStorageConfig(unittest.TestCase):
+
+    def test_from_config(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            storage = storage_from_config("sqlite:" + os.path.join(tmp_dir, "config.db"))
+            self.assertIsInstance(storage, SqliteStorage)
+            storage.close()
+        self.assertIsInstance(storage_from_config("json"), JsonStorage)
+        with self.assertRaises(AccountManagementException):
+            storage_from_config("csv")
+
+    def test_environment_variable(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            set_storage(None)
+            with mock.patch.dict(os.environ, {STORAGE_VARIABLE: "json:" + tmp_dir}):
+                storage = get_storage()
+            self.assertEqual(storage.data_dir, os.path.abspath(tmp_dir))
+            self.assertIs(get_storage(), storage)
+            set_storage(None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import os
+import json
+import tempfile
+from uc3m_money.transaction_log import TransactionLog
+from uc3m_money.account_management_exception import AccountManagementException
+
+class TestTransactionLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp_dir.name, "log.jsonl")
+        self.json_path = os.path.join(self.tmp_dir.name, "legacy.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_append_and_read_back(self):
+        log = TransactionLog(self.log_path)
+        log.append({"transfer_code": "a"})
+        log.append_many([{"transfer_code": "b"}, {"transfer_code": "c"}])
+        self.assertEqual([r["transfer_code"] for r in log], ["a", "b", "c"])
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_sync_batching(self):
+        log = TransactionLog(self.log_path, sync_every=3)
+        log.append({"n": 1})
+        log.append({"n": 2})
+        self.assertEqual(log.pending, 2)
+        log.append({"n": 3})
+        self.assertEqual(log.pending, 0)
+        log.append({"n": 4})
+        log.sync()
+        self.assertEqual(log.pending, 0)
+
+    def test_invalid_sync_every(self):
+        with self.assertRaises(AccountManagementException):
+            TransactionLog(self.log_path, sync_every=0)
+
+    def test_torn_last_line_is_ignored(self):
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            f.write('{"n": 1}\n{"n": ')
+        self.assertEqual(list(TransactionLog(self.log_path)), [{"n": 1}])
+
+    def test_append_drops_torn_tail(self):
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            f.write('{"n": 1}\n{"n": 2}')
+        log = TransactionLog(self.log_path)
+        self.assertEqual(list(log), [{"n": 1}])
+        log.append({"n": 3})
+        self.assertEqual(list(log), [{"n": 1}, {"n": 3}])
+
+    def test_corrupted_line_raises(self):
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            f.write('not json\n{"n": 1}\n')
+        with self.assertRaises(AccountManagementException):
+            list(TransactionLog(self.log_path))
+
+    def test_migration_is_one_shot(self):
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump([{"n": 1}, {"n": 2}], f, indent=4)
+        log = TransactionLog(self.log_path)
+        self.assertEqual(log.migrate_from(self.json_path), 2)
+        self.assertEqual(log.migrate_from(self.json_path), 0)
+        self.assertEqual(list(log), [{"n": 1}, {"n": 2}])
+
+    def test_corrupted_legacy_file_is_not_migrated(self):
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            f.write('[{"n": 1}, {"n": ')
+        log = TransactionLog(self.log_path)
+        with self.assertRaises(AccountManagementException) as cm:
+            log.migrate_from(self.json_path)
+        self.assertEqual(cm.exception.message, "Transfers file is empty or corrupted")
+        self.assertFalse(os.path.exists(self.log_path))
+        self.assertFalse(os.path.exists(self.log_path + ".tmp"))
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump([{"n": 1}], f)
+        self.assertEqual(log.migrate_from(self.json_path), 1)
+        self.assertEqual(list(log), [{"n": 1}])
+
+    def test_empty_legacy_file_is_migrated_as_empty(self):
+        open(self.json_path, "w", encoding="utf-8").close()
+        log = TransactionLog(self.log_path)
+        self.assertEqual(log.migrate_from(self.json_path), 0)
+        self.assertTrue(os.path.exists(self.log_path))
+
+if __name__ == "__main__":
+    unittest.main()
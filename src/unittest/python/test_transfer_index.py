@@ -0,0 +1,61 @@
+import unittest
+import os
+import tempfile
+from uc3m_money.transaction_log import TransactionLog
+from uc3m_money.transfer_index import TransferCodeIndex
+from uc3m_money.account_management_exception import AccountManagementException
+
+class TestTransferCodeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log = TransactionLog(os.path.join(self.tmp_dir.name, "log.jsonl"))
+        self.index_path = os.path.join(self.tmp_dir.name, "log.idx")
+        self.index = TransferCodeIndex(self.index_path, self.log)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_add_and_lookup(self):
+        self.index.add([{"transfer_code": "a"}, {"transfer_code": "b"}])
+        self.assertIn("a", self.index)
+        self.assertNotIn("c", self.index)
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(len(list(self.log)), 2)
+
+    def test_duplicate_is_rejected_and_not_written(self):
+        self.index.add([{"transfer_code": "a"}])
+        with self.assertRaises(AccountManagementException):
+            self.index.add([{"transfer_code": "b"}, {"transfer_code": "a"}])
+        self.assertNotIn("b", self.index)
+        self.assertEqual(len(list(self.log)), 1)
+
+    def test_add_new_skips_stored_and_repeated_codes(self):
+        self.index.add([{"transfer_code": "a"}])
+        accepted = self.index.add_new([{"transfer_code": "a"}, {"transfer_code": "b"},
+                                       {"transfer_code": "b"}, {"transfer_code": "c"}])
+        self.assertEqual([r["transfer_code"] for r in accepted], ["b", "c"])
+        self.assertEqual([r["transfer_code"] for r in self.log], ["a", "b", "c"])
+
+    def test_catch_up_with_records_appended_outside_the_index(self):
+        self.log.append({"transfer_code": "a"})
+        self.assertIn("a", self.index)
+        with self.assertRaises(AccountManagementException):
+            self.index.add([{"transfer_code": "a"}])
+
+    def test_index_is_persistent(self):
+        self.index.add([{"transfer_code": "a"}])
+        self.index.close()
+        self.index = TransferCodeIndex(self.index_path, self.log)
+        self.assertIn("a", self.index)
+
+    def test_rebuild_when_log_is_replaced(self):
+        self.index.add([{"transfer_code": "a"}, {"transfer_code": "b"}])
+        os.remove(self.log.path)
+        self.log.append({"transfer_code": "c"})
+        self.assertNotIn("a", self.index)
+        self.assertIn("c", self.index)
+
+if __name__ == "__main__":
+    unittest.main()
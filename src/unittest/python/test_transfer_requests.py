@@ -1,6 +1,11 @@
 import unittest
 import re
-from uc3m_money.transfer_request import transfer_request
+import tempfile
+import threading
+from uc3m_money.transfer_request import (transfer_request, transfer_requests_bulk,
+                                         start_group_commit, stop_group_commit)
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.storage import JsonStorage, set_storage
 
 VALID_IBAN = "ES9121000418450200051332"
 VALID_IBAN_2 = "ES9820385778983000760236"
@@ -149,3 +154,74 @@ class TestTransferRequest(unittest.TestCase):
         transfer_request("ES9121000418450200051061", "ES9121000418450200051062", "text validd", "ORDINARY", "01/01/2026", 10.0)
         with self.assertRaises(Exception):
             transfer_request("ES9121000418450200051061", "ES9121000418450200051062", "text validd", "ORDINARY", "01/01/2026", 10.0)
+
+
+class TestTransferRequestsBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        set_storage(JsonStorage(self.tmp_dir.name))
+
+    def tearDown(self):
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    def test_batch_with_invalid_and_duplicate_transfers(self):
+        transfer = {"from_iban": "ES9121000418450200051101", "to_iban": "ES9121000418450200051102",
+                    "concept": "bulk transfer valid", "transfer_type": "ORDINARY",
+                    "date": "01/01/2050", "amount": 10.0}
+        results = transfer_requests_bulk([
+            ("ES9121000418450200051103", "ES9121000418450200051104", "bulk transfer valid", "URGENT", "02/02/2050", 20.5),
+            transfer,
+            ("ES9121000418450200051105", "15", "bulk transfer valid", "ORDINARY", "31/12/2050", 15.2),
+            transfer,
+            ("ES9121000418450200051106",)])
+        self.assertEqual(len(results), 5)
+        self.assertTrue(is_valid_md5(results[0]))
+        self.assertTrue(is_valid_md5(results[1]))
+        self.assertNotEqual(results[0], results[1])
+        self.assertEqual(results[2].message, "To IBAN is not valid")
+        # only the second copy of transfer is the duplicate within the batch
+        self.assertEqual(results[3].message, "Transfer already exists")
+        self.assertEqual(results[4].message, "Transfer does not have the expected fields")
+        # a second submission of the same batch is rejected against the history
+        again = transfer_requests_bulk([transfer])
+        self.assertEqual(again[0].message, "Transfer already exists")
+
+    def test_empty_batch(self):
+        self.assertEqual(transfer_requests_bulk([]), [])
+
+
+class TestTransferGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        set_storage(JsonStorage(self.tmp_dir.name))
+        start_group_commit(max_batch=8, max_delay=0.05)
+
+    def tearDown(self):
+        stop_group_commit()
+        set_storage(None)
+        self.tmp_dir.cleanup()
+
+    def test_concurrent_transfers_with_duplicate(self):
+        results = []
+        lock = threading.Lock()
+        def worker(account):
+            try:
+                result = transfer_request(f"ES91210004184502000512{account:02d}", VALID_IBAN,
+                                          "group commit test", "URGENT", "03/03/2050", 50.0)
+            except AccountManagementException as exc:
+                result = exc
+            with lock:
+                results.append(result)
+        # account 0 is requested twice, so exactly one of them is a duplicate
+        threads = [threading.Thread(target=worker, args=(a,)) for a in [0] + list(range(6))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        codes = [r for r in results if is_valid_md5(r)]
+        self.assertEqual(len(codes), 6)
+        self.assertEqual(len(set(codes)), 6)
+        self.assertEqual(sum(isinstance(r, AccountManagementException) for r in results), 1)
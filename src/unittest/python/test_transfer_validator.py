@@ -0,0 +1,81 @@
+import unittest
+from datetime import datetime
+from uc3m_money.account_management_exception import AccountManagementException
+from uc3m_money.transfer_validator import TransferValidator
+
+IBAN = "ES9121000418450200051332"
+IBAN_2 = "ES9820385778983000760236"
+
+class FakeClock:
+
+    def __init__(self, moment):
+        self.now = moment.timestamp()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.now
+
+class TestTransferValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(datetime(2030, 6, 15, 23, 59, 59))
+        self.validator = TransferValidator(self.clock)
+
+    def assertRejected(self, message, *args):
+        with self.assertRaises(AccountManagementException) as cm:
+            self.validator.check(*args)
+        self.assertEqual(cm.exception.message, message)
+
+    def test_valid_transfer_returns_cents(self):
+        self.assertEqual(self.validator.check(IBAN, IBAN_2, "Monthly rent payment", "URGENT",
+                                              "15/06/2030", 1234.56), 123456)
+
+    def test_today_rolls_over_at_midnight(self):
+        self.assertEqual(self.validator.today(), 20300615)
+        self.assertEqual(self.validator.check_date("15/06/2030"), 20300615)
+        self.clock.now += 1
+        self.assertEqual(self.validator.today(), 20300616)
+        with self.assertRaises(AccountManagementException) as cm:
+            self.validator.check_date("15/06/2030")
+        self.assertEqual(cm.exception.message, "Transfer date must be today or in the future.")
+        # and back if the clock is set back
+        self.clock.now -= 1
+        self.assertEqual(self.validator.today(), 20300615)
+
+    def test_calendar_dates(self):
+        self.assertEqual(self.validator.check_date("29/02/2032"), 20320229)
+        for date in ("29/02/2031", "31/04/2031", "00/01/2031", "01/13/2031",
+                     "٠١/٠١/٢٠٣١"):
+            with self.assertRaises(AccountManagementException) as cm:
+                self.validator.check_date(date)
+            self.assertEqual(cm.exception.message, "Invalid date. Must be a valid calendar date.")
+        for date in ("1/01/2031", "01-01-2031", "01/01/20311", "01/01/203a"):
+            with self.assertRaises(AccountManagementException) as cm:
+                self.validator.check_date(date)
+            self.assertTrue(cm.exception.message.startswith("Invalid date format."))
+
+    def test_field_errors_in_order(self):
+        self.assertRejected("From IBAN is not valid", "ES12", "ES12", "a", "x", 1, 1)
+        self.assertRejected("Invalid concept. Must be 10-30 chars with at least two words.",
+                            IBAN, IBAN_2, "rent!", "x", 1, 1)
+        self.assertRejected("Concept must not contain special characters.",
+                            IBAN, IBAN_2, "rent payment!", "x", 1, 1)
+        self.assertRejected("Invalid transfer type: x.", IBAN, IBAN_2, "rent payment", "x", 1, 1)
+        self.assertRejected("Year must be between 2025 and 2050.",
+                            IBAN, IBAN_2, "rent payment", "ORDINARY", "01/01/2051", 1)
+        self.assertRejected("Amount must be a float",
+                            IBAN, IBAN_2, "rent payment", "ORDINARY", "01/01/2031", 10)
+        for amount in (10.005, float("nan"), float("inf")):
+            self.assertRejected("Amount must have up to two decimal places.",
+                                IBAN, IBAN_2, "rent payment", "ORDINARY", "01/01/2031", amount)
+        self.assertRejected("Amount is not within the allowed range (10.00 to 10000.00).",
+                            IBAN, IBAN_2, "rent payment", "ORDINARY", "01/01/2031", 9.99)
+
+    def test_clock_is_read_once_per_check(self):
+        for _ in range(3):
+            self.validator.check_date("01/01/2031")
+        self.assertEqual(self.clock.calls, 3)
+
+if __name__ == '__main__':
+    unittest.main()